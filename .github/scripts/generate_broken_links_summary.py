@@ -3,25 +3,496 @@
 @author: Peter Kahn
 @contact: peter@swirl.today
 @description: This script processes a CSV file containing URL check results, generates a fixed CSV file, and creates a summary report. Used in URL check processing.
+              With --check it first produces that CSV itself by checking the URLs in the repo's Markdown concurrently.
 '''
 
 import argparse
+import asyncio
+import glob
+import heapq
+import re
 import sys
 import os
 import csv
+import http.client
 import logging
+import random
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit
 
 # Get the script name without the .py extension
 script_name = os.path.basename(__file__).split('.')[0]
 
+# Rows listed per histogram in the --stream summary
+HISTOGRAM_ROWS = 10
+
+# URLs tracked for the --stream top list, per listed URL
+TOP_CAPACITY_FACTOR = 4
+
+# Markdown scanned by --check, relative to --root
+DEFAULT_CHECK_FILES = ['README.md', 'doc/*.md', 'migration/README.MD', 'updaters/**/README.md']
+
+# Repository root: this script lives in .github/scripts
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"'`()\[\]{}|\\^]+")
+URL_TRAILING_CHARS = '.,;:!?*_~'
+
+# Some servers reject requests without a browser-like user agent
+CHECK_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; swirl-url-check)'}
+
+# Responses worth retrying; anything else < 400 passes and >= 400 fails
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Longest wait before a retry, whether from backoff or a server's Retry-After
+MAX_RETRY_DELAY = 60
+
+# Redirects followed per request by the fallback checker (without aiohttp)
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# CSV rows per executemany() when ingesting into the --db store
+INGEST_BATCH = 1000
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checks (
+    url TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    result TEXT NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (url, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS checks_by_run ON checks (run_id, result);
+CREATE TABLE IF NOT EXISTS url_status (
+    url TEXT PRIMARY KEY,
+    last_result TEXT NOT NULL,
+    last_checked TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS url_status_by_checked ON url_status (last_result, last_checked);
+CREATE INDEX IF NOT EXISTS url_status_by_failures ON url_status (consecutive_failures);
+"""
+
+def utc_now():
+    # Fixed-width UTC timestamps compare correctly as strings
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class UrlStore:
+    """
+    SQLite history of URL checks (--db): one row per run, one per URL and run, and the
+    latest status, HTTP validators and failure streak per URL.
+    """
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(STORE_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def fresh_urls(self, ttl):
+        """URLs that passed a check within the last ttl seconds."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=ttl)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        rows = self.conn.execute(
+            "SELECT url FROM url_status WHERE last_result = 'passed' AND last_checked >= ?", (cutoff,))
+        return {url for url, in rows}
+
+    def validators(self):
+        """{url: (etag, last_modified)} for conditional re-checks."""
+        rows = self.conn.execute(
+            "SELECT url, etag, last_modified FROM url_status WHERE etag IS NOT NULL OR last_modified IS NOT NULL")
+        return {url: (etag, last_modified) for url, etag, last_modified in rows}
+
+    def ingest(self, csv_path, validators=None, cached=()):
+        """
+        Record one run from a url,result,filename CSV in a single transaction. A URL listed by
+        several files counts once (failed if any row failed). URLs in cached were not re-checked
+        this run, so their last_checked is left alone.
+        """
+        upsert_check = (
+            "INSERT INTO checks (url, run_id, result, cached) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (url, run_id) DO UPDATE SET "
+            "result = CASE WHEN excluded.result = 'failed' THEN 'failed' ELSE checks.result END")
+        now = utc_now()
+        rows = 0
+        with self.conn, open(csv_path, 'r', encoding='utf-8') as f:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (started_at, source) VALUES (?, ?)", (now, csv_path)).lastrowid
+            batch = []
+            for i, row in enumerate(csv.reader(f)):
+                if i == 0 or len(row) != 3:
+                    continue
+                url, result, _ = row
+                batch.append((url, run_id, result, url in cached))
+                if len(batch) >= INGEST_BATCH:
+                    self.conn.executemany(upsert_check, batch)
+                    rows += len(batch)
+                    batch = []
+            self.conn.executemany(upsert_check, batch)
+            rows += len(batch)
+
+            self.conn.execute(
+                "INSERT INTO url_status (url, last_result, last_checked, consecutive_failures) "
+                "SELECT url, result, ?, result = 'failed' FROM checks "
+                "WHERE run_id = ? AND result IN ('passed', 'failed') AND NOT cached "
+                "ON CONFLICT (url) DO UPDATE SET "
+                "last_result = excluded.last_result, last_checked = excluded.last_checked, "
+                "consecutive_failures = CASE WHEN excluded.last_result = 'failed' "
+                "THEN url_status.consecutive_failures + 1 ELSE 0 END",
+                (now, run_id))
+            if validators:
+                self.conn.executemany(
+                    "UPDATE url_status SET etag = ?, last_modified = ? WHERE url = ?",
+                    [(etag, last_modified, url) for url, (etag, last_modified) in validators.items()])
+        return run_id, rows
+
+    def failing(self, runs):
+        """(url, consecutive failures, last checked) of URLs that failed the last `runs` checks or more."""
+        return self.conn.execute(
+            "SELECT url, consecutive_failures, last_checked FROM url_status "
+            "WHERE consecutive_failures >= ? ORDER BY consecutive_failures DESC, url", (runs,)).fetchall()
+
+def url_domain(url):
+    try:
+        return urlsplit(url.strip()).hostname or '(no domain)'
+    except ValueError:
+        return '(invalid url)'
+
+def write_histogram(summary, title, column, counter):
+    summary.write(f"\n### {title}\n")
+    summary.write(f"| {column} | Failed |\n|---|---|\n")
+    for key, count in counter.most_common(HISTOGRAM_ROWS):
+        summary.write(f"| {key} | {count} |\n")
+    if len(counter) > HISTOGRAM_ROWS:
+        summary.write(f"\n_{len(counter) - HISTOGRAM_ROWS} more not shown._\n")
+
+class TopFailures:
+    """
+    Bounded top-n of failed URLs by failed rows (files linking to them), with the Space-Saving
+    algorithm: at most n * TOP_CAPACITY_FACTOR URLs are tracked. When a new URL arrives and the table
+    is full, it replaces the URL with the lowest count and inherits that count as its error bound, so
+    counts are exact until the first replacement and never under-estimated afterwards.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.capacity = max(1, n * TOP_CAPACITY_FACTOR)
+        self.entries = {}  # url -> [count, error, first filename]
+        self.replaced = 0
+
+    def add(self, url, filename):
+        entry = self.entries.get(url)
+        if entry is not None:
+            entry[0] += 1
+            return
+        error = 0
+        if len(self.entries) >= self.capacity:
+            victim = min(self.entries, key=lambda key: self.entries[key][0])
+            error = self.entries.pop(victim)[0]
+            self.replaced += 1
+        self.entries[url] = [error + 1, error, filename]
+
+    def top(self):
+        """[(url, count, error, first filename)], most failed rows first."""
+        ranked = heapq.nlargest(self.n, self.entries.items(), key=lambda item: (item[1][0], -item[1][1]))
+        return [(url, count, error, filename) for url, (count, error, filename) in ranked]
+
+def extract_urls(root, patterns):
+    """Return {url: [filename, ...]} for every http(s) URL in the matching files, in first-seen order."""
+    urls = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+            filename = os.path.relpath(path, root)
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    for match in URL_PATTERN.findall(line):
+                        url = match.rstrip(URL_TRAILING_CHARS)
+                        files = urls.setdefault(url, [])
+                        if filename not in files:
+                            files.append(filename)
+    return urls
+
+def retry_after_seconds(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def retry_delay(backoff, retry, retry_after=None):
+    """Exponential backoff with jitter before retry number retry (0-based); a Retry-After wins if longer."""
+    step = backoff * 2 ** retry
+    delay = step / 2 + random.uniform(0, step / 2)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return min(delay, MAX_RETRY_DELAY)
+
+def conditional_headers(validators, url):
+    etag, last_modified = validators.get(url, (None, None))
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
+
+async def check_all(urls, fetch, args, logger, validators=None):
+    """
+    Check each URL once: HEAD first, then GET (some servers do not support HEAD).
+    fetch(method, url, headers) returns (status, etag, last_modified, retry_after); at most
+    args.concurrency checks run at a time. Errors, 429 and 5xx are retried after an exponential
+    backoff with jitter (args.backoff, doubled per retry) or the server's Retry-After. Known validators are sent as conditional headers, so an unchanged
+    page answers 304. Returns ({url: result}, {url: (etag, last_modified)}).
+    """
+    validators = validators or {}
+    limit = asyncio.Semaphore(args.concurrency)
+    results = {}
+    seen_validators = {}
+
+    async def attempt(method, url):
+        for i in range(args.retries + 1):
+            if i:
+                delay = retry_delay(args.backoff, i - 1, retry_after)
+                logger.debug(f"Retrying {method} {url} in {delay:.1f}s (status {status})")
+                await asyncio.sleep(delay)
+            try:
+                status, etag, last_modified, retry_after = await fetch(
+                    method, url, conditional_headers(validators, url))
+            except Exception as e:
+                logger.debug(f"{method} {url}: {type(e).__name__}: {e}")
+                status, etag, last_modified, retry_after = None, None, None, None
+            if status is not None and status not in RETRY_STATUSES:
+                break
+        return status, etag, last_modified
+
+    async def check(url):
+        async with limit:
+            status, etag, last_modified = await attempt('HEAD', url)
+            if status is None or status >= 400:
+                status, etag, last_modified = await attempt('GET', url)
+        results[url] = 'passed' if status is not None and status < 400 else 'failed'
+        if results[url] == 'failed':
+            logger.debug(f"Failed: {url} (status {status})")
+        elif status != 304 and (etag or last_modified):
+            seen_validators[url] = (etag, last_modified)
+
+    await asyncio.gather(*(check(url) for url in urls))
+    return results, seen_validators
+
+async def check_with_aiohttp(urls, args, logger, aiohttp, validators):
+    # One pooled, keep-alive session: limit caps open connections overall, limit_per_host per host
+    connector = aiohttp.TCPConnector(limit=args.concurrency, limit_per_host=args.per_host, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=CHECK_HEADERS) as session:
+        async def fetch(method, url, headers):
+            async with session.request(method, url, headers=headers, allow_redirects=True) as response:
+                return (response.status, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                        retry_after_seconds(response.headers.get('Retry-After')))
+
+        return await check_all(urls, fetch, args, logger, validators)
+
+class ConnectionPool:
+    """
+    Idle keep-alive http.client connections per (scheme, host, port), shared by the fallback checker's
+    threads. Callers hold the per-host semaphore, so at most args.per_host connections exist per host.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return (connection, reused): an idle connection to key if there is one, else a new one."""
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self.connect(key), False
+
+    def connect(self, key):
+        scheme, host, port = key
+        conn_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return conn_class(host, port, timeout=self.timeout)
+
+    def put(self, key, conn):
+        with self.lock:
+            self.idle.setdefault(key, []).append(conn)
+
+    def close(self):
+        with self.lock:
+            for conns in self.idle.values():
+                for conn in conns:
+                    conn.close()
+            self.idle.clear()
+
+def send(conn, method, target, headers):
+    conn.request(method, target, headers={**CHECK_HEADERS, **headers})
+    response = conn.getresponse()
+    response.read()  # drain the body so the connection can be reused
+    return response
+
+def pooled_request(pool, method, url, headers):
+    """
+    One request over a pooled keep-alive connection, without following redirects. Returns
+    (status, etag, last_modified, retry_after, location).
+    """
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.hostname, parts.port)
+    target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+    conn, reused = pool.get(key)
+    try:
+        response = send(conn, method, target, headers)
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        if not reused:
+            raise
+        # The server closed the idle connection; try once on a new one
+        conn = pool.connect(key)
+        try:
+            response = send(conn, method, target, headers)
+        except BaseException:
+            conn.close()
+            raise
+    if response.will_close:
+        conn.close()
+    else:
+        pool.put(key, conn)
+    return (response.status, response.getheader('ETag'), response.getheader('Last-Modified'),
+            retry_after_seconds(response.getheader('Retry-After')), response.getheader('Location'))
+
+async def check_with_http_client(urls, args, logger, validators):
+    # Fallback without aiohttp: blocking http.client requests in a thread pool, with per-host keep-alive
+    # connections. Redirects are followed here, so every hop holds its own host's semaphore.
+    loop = asyncio.get_running_loop()
+    host_limits = {}
+    pool = ConnectionPool(args.timeout)
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            async def fetch(method, url, headers):
+                for _ in range(MAX_REDIRECTS + 1):
+                    host_limit = host_limits.setdefault(url_domain(url), asyncio.Semaphore(args.per_host))
+                    async with host_limit:
+                        status, etag, last_modified, retry_after, location = await loop.run_in_executor(
+                            executor, pooled_request, pool, method, url, headers)
+                    if status not in REDIRECT_STATUSES or not location:
+                        return status, etag, last_modified, retry_after
+                    url = urljoin(url, location)
+                    if status == 303:
+                        method = 'GET'
+                return None, None, None, None
+
+            return await check_all(urls, fetch, args, logger, validators)
+    finally:
+        pool.close()
+
+def check_urls(args, logger, store=None):
+    """
+    Check the URLs in the repo's Markdown and write them to args.filespec as url,result,filename rows.
+    With a store, URLs that passed within args.ttl are not re-checked. Returns (new validators, cached URLs).
+    """
+    patterns = args.paths or DEFAULT_CHECK_FILES
+    urls = extract_urls(args.root, patterns)
+    excludes = [pattern for pattern in args.exclude.split(',') if pattern]
+    to_check = [url for url in urls if not any(pattern in url for pattern in excludes)]
+
+    cached = set()
+    validators = {}
+    if store is not None:
+        if args.ttl > 0:
+            cached = store.fresh_urls(args.ttl) & set(to_check)
+            to_check = [url for url in to_check if url not in cached]
+        validators = store.validators()
+
+    logger.info(f"Found {len(urls)} unique URLs in {', '.join(patterns)}; checking {len(to_check)}, "
+                f"{len(cached)} verified within --ttl (concurrency {args.concurrency}, {args.per_host} per host)")
+
+    try:
+        import aiohttp
+    except ImportError:
+        aiohttp = None
+        logger.info("aiohttp is not installed; checking with http.client in threads")
+
+    if aiohttp is not None:
+        results, new_validators = asyncio.run(check_with_aiohttp(to_check, args, logger, aiohttp, validators))
+    else:
+        results, new_validators = asyncio.run(check_with_http_client(to_check, args, logger, validators))
+    failed = sum(1 for result in results.values() if result == 'failed')
+    results.update((url, 'passed') for url in cached)
+
+    with open(args.filespec, 'w', encoding='utf-8', newline='') as f:
+        csv_o = csv.writer(f)
+        csv_o.writerow(['URL', 'result', 'filename'])
+        for url, files in urls.items():
+            result = results.get(url, 'excluded')
+            for filename in files:
+                csv_o.writerow([url, result, filename])
+
+    logger.info(f"Checked {len(to_check)} URLs, {failed} failed; wrote {args.filespec}")
+    return new_validators, cached
+
 def main(argv):
     parser = argparse.ArgumentParser(description="Fix CSV file for loading into SQLite3")
     parser.add_argument('filespec', help="path to a csv file to fix")
     parser.add_argument('-o', '--output', help="path to a new csv file - otherwise, _fixed is appended to filespec")
+    parser.add_argument('--stream', action='store_true',
+                        help="keep only counters, per-domain/per-file histograms and a bounded --top list of failed "
+                             "URLs in memory; every failure is written to the failures file as it is read")
+    parser.add_argument('--top', type=int, default=50, metavar='N',
+                        help="--stream: list the N failed URLs with the most failed rows (files linking to them), "
+                             "and the first N unhandled lines; with --failing-runs, at most N URLs (default: 50)")
+    parser.add_argument('--failures-output',
+                        help="path of the --stream failures csv - otherwise, _failures is appended to filespec")
+    parser.add_argument('--check', action='store_true',
+                        help="check the URLs in the repo's Markdown first and write the results to filespec")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="--check: repository root (default: %(default)s)")
+    parser.add_argument('--paths', nargs='+',
+                        help=f"--check: files or globs to scan, relative to --root (default: {' '.join(DEFAULT_CHECK_FILES)})")
+    parser.add_argument('--exclude', default='',
+                        help="--check: comma-separated substrings; matching URLs are reported as excluded")
+    parser.add_argument('--concurrency', type=int, default=32,
+                        help="--check: URLs checked at the same time (default: 32)")
+    parser.add_argument('--per-host', type=int, default=4,
+                        help="--check: connections per host (default: 4)")
+    parser.add_argument('--timeout', type=float, default=10, help="--check: seconds per request (default: 10)")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="--check: retries after errors, 429 and 5xx (default: 2)")
+    parser.add_argument('--backoff', type=float, default=1.0,
+                        help="--check: seconds before the first retry, doubled for each further retry, with "
+                             "jitter; a longer Retry-After from the server is honoured (default: 1)")
+    parser.add_argument('--db', help="SQLite file to record each run in (per-URL status, history, failure streaks)")
+    parser.add_argument('--ttl', type=int, default=86400,
+                        help="--check --db: do not re-check URLs that passed within this many seconds; "
+                             "0 re-checks all (default: 86400)")
+    parser.add_argument('--failing-runs', type=int, metavar='N',
+                        help="--db: list URLs that failed N or more consecutive runs in the log and summary")
+    parser.add_argument('--log-level',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                        help="log level for fix_csv.log and stdout (default: INFO with --stream, else DEBUG)")
     args = parser.parse_args()
+    if args.log_level is None:
+        args.log_level = 'INFO' if args.stream else 'DEBUG'
 
     # Configure logging to write to both a file and the console
-    logging.basicConfig(level=logging.DEBUG,
+    logging.basicConfig(level=getattr(logging, args.log_level),
                         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                         handlers=[
                             logging.FileHandler('fix_csv.log'),
@@ -29,6 +500,15 @@ def main(argv):
                         ])
     logger = logging.getLogger(script_name)
 
+    store = UrlStore(args.db) if args.db else None
+    validators, cached = {}, set()
+
+    if args.check:
+        if not args.filespec.endswith(".csv"):
+            logger.error("File must be .csv")
+            return False
+        validators, cached = check_urls(args, logger, store)
+
     if not os.path.exists(args.filespec):
         logger.error(f"File not found: {args.filespec}")
         return False
@@ -45,6 +525,38 @@ def main(argv):
     summary_file = args.filespec[:-4] + '_summary.md'
     logger.info(f"Reading {args.filespec}, Output Files: [Fixed Csv: {outfile}, Summary: {summary_file}]")
 
+    if args.stream:
+        failures_file = args.failures_output or args.filespec[:-4] + '_failures.csv'
+        ok = summarize_stream(args, outfile, summary_file, failures_file, logger)
+    else:
+        ok = summarize(args, outfile, summary_file, logger)
+
+    if ok and store is not None:
+        ok = record_run(args, store, summary_file, logger, validators, cached)
+    return ok
+
+def record_run(args, store, summary_file, logger, validators, cached):
+    """Ingest args.filespec into the --db store and report failure streaks."""
+    try:
+        run_id, rows = store.ingest(args.filespec, validators, cached)
+        logger.info(f"Recorded run {run_id} ({rows} rows) in {args.db}")
+
+        if args.failing_runs:
+            failing = store.failing(args.failing_runs)
+            logger.info(f"{len(failing)} URLs failed {args.failing_runs} or more consecutive runs")
+            with open(summary_file, 'a', encoding='utf-8') as summary:
+                summary.write(f"\n### Failing for {args.failing_runs}+ Consecutive Runs: {len(failing)}\n")
+                for url, streak, last_checked in failing[:args.top]:
+                    summary.write(f"* {url} ({streak} runs, last checked {last_checked})\n")
+    except (sqlite3.Error, OSError) as e:
+        logger.error(f"Could not record the run in {args.db}: {e}")
+        return False
+    finally:
+        store.close()
+    return True
+
+def summarize(args, outfile, summary_file, logger):
+    """Default mode: every failed URL and unhandled line is kept and listed in the summary."""
     passed_count = 0
     excluded_count = 0
     failed_count = 0
@@ -100,6 +612,98 @@ def main(argv):
         logger.error(f"An error occurred: {e}")
         return False
 
+    return True
+
+def summarize_stream(args, outfile, summary_file, failures_file, logger):
+    """
+    Same fixed CSV and counts as the default mode, but memory stays bounded:
+    failures are spilled to failures_file as they are read, and only
+    histograms, a TopFailures list of args.top URLs and the first args.top unhandled lines are kept.
+    """
+    logger.info(f"Streaming summary, Failures: {failures_file}, Top: {args.top}")
+
+    counts = Counter()
+    failed_domains = Counter()
+    failed_files = Counter()
+    top_failed = TopFailures(args.top)
+    first_unhandled = []
+    i = 0
+
+    try:
+        with open(args.filespec, 'r', encoding='utf-8') as fi, \
+                open(outfile, 'w', encoding='utf-8') as fo, \
+                open(failures_file, 'w', encoding='utf-8', newline='') as ff:
+            csv_i = csv.reader(fi)
+            csv_o = csv.writer(fo, quoting=csv.QUOTE_NONNUMERIC)
+            csv_f = csv.writer(ff)
+            csv_f.writerow(['line', 'result', 'url', 'filename'])
+
+            for i, row in enumerate(csv_i):
+                if i == 0:
+                    csv_o.writerow(row)
+                    continue
+
+                if len(row) != 3:
+                    counts['unhandled'] += 1
+                    csv_f.writerow([i, 'unhandled', ','.join(row), ''])
+                    if len(first_unhandled) < args.top:
+                        first_unhandled.append(f"Line {i}: {row}")
+                    continue
+
+                url, result, filename = row
+                if result in ('passed', 'excluded', 'failed'):
+                    counts[result] += 1
+                else:
+                    counts['unhandled'] += 1
+                    csv_f.writerow([i, result, url, filename])
+                    if len(first_unhandled) < args.top:
+                        first_unhandled.append(f"Line {i}: {row}")
+
+                if result == 'failed':
+                    failed_domains[url_domain(url)] += 1
+                    failed_files[filename] += 1
+                    csv_f.writerow([i, result, url, filename])
+                    top_failed.add(url, filename)
+
+                csv_o.writerow([url, result, filename])
+
+        logger.info(f"Finished processing CSV with {i} lines and Passed: {counts['passed']}, "
+                    f"Excluded: {counts['excluded']}, Failed: {counts['failed']}, Unhandled: {counts['unhandled']}")
+
+        with open(summary_file, 'w', encoding='utf-8') as summary:
+            summary.write("## URL Check Summary\n")
+            summary.write(f"*Passed:* {counts['passed']}\n")
+            summary.write(f"*Excluded:* {counts['excluded']}\n")
+            summary.write(f"*Failed:* {counts['failed']}\n")
+            summary.write(f"*Unhandled Lines:* {counts['unhandled']}\n")
+
+            if counts['failed'] > 0:
+                write_histogram(summary, "Failures by Domain", "Domain", failed_domains)
+                write_histogram(summary, "Failures by File", "File", failed_files)
+                top = top_failed.top()
+                if top:
+                    summary.write(f"\n### Most Failed URLs (top {len(top)} of {counts['failed']} failed rows):\n")
+                    for url, count, error, filename in top:
+                        bound = f", at least {count - error}" if error else ""
+                        summary.write(f"* {url} ({count} failed rows{bound}; first in {filename})\n")
+                    if top_failed.replaced:
+                        summary.write("\n_More URLs failed than were tracked; counts are upper bounds._\n")
+
+            if first_unhandled:
+                summary.write(f"\n### Unhandled Lines (first {len(first_unhandled)} of {counts['unhandled']}):\n")
+                summary.write("* " + "\n* ".join(first_unhandled) + "\n")
+
+            if counts['failed'] + counts['unhandled'] > 0:
+                summary.write(f"\nAll failed and unhandled lines: `{os.path.basename(failures_file)}`\n")
+
+        logger.info(f"Summary stored {summary_file}")
+
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        return False
+
+    return True
+
 if __name__ == "__main__":
     main(sys.argv)
 
@@ -0,0 +1,225 @@
+import argparse
+import csv
+import logging
+import random
+
+import pytest
+
+import generate_broken_links_summary as summary_script
+from generate_broken_links_summary import TopFailures, UrlStore, summarize, summarize_stream
+
+LOGGER = logging.getLogger('test')
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['url', 'result', 'filename'])
+        writer.writerows(rows)
+    return str(path)
+
+
+def read_csv(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = UrlStore(str(tmp_path / 'urls.sqlite'))
+    yield store
+    store.close()
+
+
+def status(store, url):
+    return store.conn.execute(
+        "SELECT last_result, consecutive_failures, etag, last_modified FROM url_status WHERE url = ?",
+        (url,)).fetchone()
+
+
+# ---------------------------------------------------------------
+# UrlStore
+# ---------------------------------------------------------------
+
+def test_ingest_counts_a_url_once_failed_if_any_row_failed(tmp_path, store):
+    path = write_csv(tmp_path / 'run.csv', [
+        ['https://a.example/', 'passed', 'README.md'],
+        ['https://a.example/', 'failed', 'doc/setup.md'],
+        ['https://b.example/', 'passed', 'README.md'],
+        ['https://c.example/', 'excluded', 'README.md'],
+        ['not', 'a row'],
+    ])
+    run_id, rows = store.ingest(path)
+
+    assert rows == 4
+    checks = dict(store.conn.execute("SELECT url, result FROM checks WHERE run_id = ?", (run_id,)))
+    assert checks == {
+        'https://a.example/': 'failed',
+        'https://b.example/': 'passed',
+        'https://c.example/': 'excluded',
+    }
+    assert status(store, 'https://a.example/')[:2] == ('failed', 1)
+    assert status(store, 'https://b.example/')[:2] == ('passed', 0)
+    # Excluded URLs get no status
+    assert status(store, 'https://c.example/') is None
+
+
+def test_failure_streaks(tmp_path, store):
+    for down, flaky in [('failed', 'failed'), ('failed', 'failed'), ('failed', 'passed')]:
+        store.ingest(write_csv(tmp_path / 'run.csv', [
+            ['https://down.example/', down, 'README.md'],
+            ['https://flaky.example/', flaky, 'README.md'],
+        ]))
+
+    failing = store.failing(2)
+    assert [(url, streak) for url, streak, _ in failing] == [('https://down.example/', 3)]
+    assert status(store, 'https://flaky.example/')[:2] == ('passed', 0)
+    assert store.failing(4) == []
+
+
+def test_cached_urls_keep_their_status(tmp_path, store):
+    store.ingest(write_csv(tmp_path / 'run.csv', [['https://a.example/', 'passed', 'README.md']]))
+    store.conn.execute("UPDATE url_status SET last_checked = '2000-01-01T00:00:00Z'")
+
+    run_id, _ = store.ingest(write_csv(tmp_path / 'run.csv', [['https://a.example/', 'passed', 'README.md']]),
+                             cached={'https://a.example/'})
+
+    assert store.conn.execute("SELECT cached FROM checks WHERE run_id = ?", (run_id,)).fetchone() == (1,)
+    assert store.conn.execute("SELECT last_checked FROM url_status").fetchone() == ('2000-01-01T00:00:00Z',)
+    assert store.fresh_urls(3600) == set()
+
+
+def test_fresh_urls_and_validators(tmp_path, store):
+    store.ingest(write_csv(tmp_path / 'run.csv', [
+        ['https://a.example/', 'passed', 'README.md'],
+        ['https://b.example/', 'failed', 'README.md'],
+    ]), validators={'https://a.example/': ('"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT')})
+
+    assert store.fresh_urls(3600) == {'https://a.example/'}
+    assert store.validators() == {'https://a.example/': ('"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT')}
+
+
+def test_ingest_batches(tmp_path, store, monkeypatch):
+    monkeypatch.setattr(summary_script, 'INGEST_BATCH', 3)
+    rows = [[f'https://{i}.example/', 'passed', 'README.md'] for i in range(10)]
+    _, count = store.ingest(write_csv(tmp_path / 'run.csv', rows))
+    assert count == 10
+    assert store.conn.execute("SELECT COUNT(*) FROM url_status").fetchone() == (10,)
+
+
+def test_store_persists_across_opens(tmp_path):
+    path = str(tmp_path / 'urls.sqlite')
+    csv_path = write_csv(tmp_path / 'run.csv', [['https://a.example/', 'failed', 'README.md']])
+    for _ in range(2):
+        store = UrlStore(path)
+        store.ingest(csv_path)
+        store.close()
+
+    store = UrlStore(path)
+    assert [(url, streak) for url, streak, _ in store.failing(1)] == [('https://a.example/', 2)]
+    assert store.conn.execute("SELECT COUNT(*) FROM runs").fetchone() == (2,)
+    store.close()
+
+
+# ---------------------------------------------------------------
+# TopFailures
+# ---------------------------------------------------------------
+
+def test_top_failures_exact_within_capacity():
+    top = TopFailures(2)
+    for url in ['a', 'b', 'b', 'c', 'c', 'c', 'd']:
+        top.add(url, f'{url}.md')
+
+    assert top.top() == [('c', 3, 0, 'c.md'), ('b', 2, 0, 'b.md')]
+    assert top.replaced == 0
+
+
+def test_top_failures_is_bounded_and_finds_heavy_hitters():
+    rng = random.Random(7)
+    # Space-Saving keeps every URL with more than len(rows) / capacity rows
+    rows = [f'heavy{i}' for i in range(5) for _ in range(600 - i * 50)]
+    rows += [f'rare{i}' for i in range(3000)]
+    rng.shuffle(rows)
+
+    top = TopFailures(5)
+    for url in rows:
+        top.add(url, 'README.md')
+        assert len(top.entries) <= 5 * summary_script.TOP_CAPACITY_FACTOR
+
+    ranked = top.top()
+    assert {url for url, _, _, _ in ranked} == {f'heavy{i}' for i in range(5)}
+    for url, count, error, _ in ranked:
+        true_count = rows.count(url)
+        assert count - error <= true_count <= count
+    assert top.replaced > 0
+
+
+# ---------------------------------------------------------------
+# summarize_stream
+# ---------------------------------------------------------------
+
+ROWS = [
+    ['https://a.example/', 'passed', 'README.md'],
+    ['https://down.example/x', 'failed', 'README.md'],
+    ['https://down.example/x', 'failed', 'doc/setup.md'],
+    ['https://down.example/y', 'failed', 'doc/setup.md'],
+    ['https://other.example/', 'excluded', 'README.md'],
+    ['https://odd.example/', 'timeout', 'README.md'],
+]
+
+
+def run_stream(tmp_path, rows, top=10):
+    filespec = write_csv(tmp_path / 'results.csv', rows)
+    args = argparse.Namespace(filespec=filespec, top=top)
+    paths = [str(tmp_path / name) for name in ('fixed.csv', 'summary.md', 'failures.csv')]
+    assert summarize_stream(args, *paths, LOGGER)
+    return paths
+
+
+def test_summarize_stream(tmp_path):
+    fixed, summary_file, failures = run_stream(tmp_path, ROWS)
+
+    assert read_csv(fixed) == [['url', 'result', 'filename']] + ROWS
+    assert read_csv(failures)[1:] == [
+        ['2', 'failed', 'https://down.example/x', 'README.md'],
+        ['3', 'failed', 'https://down.example/x', 'doc/setup.md'],
+        ['4', 'failed', 'https://down.example/y', 'doc/setup.md'],
+        ['6', 'timeout', 'https://odd.example/', 'README.md'],
+    ]
+
+    with open(summary_file, encoding='utf-8') as f:
+        summary = f.read()
+    for line in ['*Passed:* 1', '*Excluded:* 1', '*Failed:* 3', '*Unhandled Lines:* 1',
+                 '| down.example | 3 |', '| doc/setup.md | 2 |',
+                 '### Most Failed URLs (top 2 of 3 failed rows):',
+                 '* https://down.example/x (2 failed rows; first in README.md)',
+                 '`failures.csv`']:
+        assert line in summary
+    assert summary.index('down.example/x (2') < summary.index('down.example/y (1')
+    assert 'upper bounds' not in summary
+
+
+def test_summarize_stream_matches_default_counts(tmp_path):
+    fixed, summary_file, _ = run_stream(tmp_path, ROWS)
+    args = argparse.Namespace(filespec=str(tmp_path / 'results.csv'))
+    default_fixed, default_summary = str(tmp_path / 'd_fixed.csv'), str(tmp_path / 'd_summary.md')
+    assert summarize(args, default_fixed, default_summary, LOGGER)
+
+    assert read_csv(fixed) == read_csv(default_fixed)
+    with open(summary_file, encoding='utf-8') as f, open(default_summary, encoding='utf-8') as d:
+        assert f.read().split('\n')[:5] == d.read().split('\n')[:5]
+
+
+def test_summarize_stream_bounds_lists(tmp_path):
+    rows = [[f'https://{i % 7}.example/', 'failed', f'{i}.md'] for i in range(100)]
+    rows += [['broken'], ['https://z.example/', 'weird', 'README.md'], ['x', 'y', 'z', 'w']]
+    _, summary_file, failures = run_stream(tmp_path, rows, top=1)
+
+    assert len(read_csv(failures)) == 1 + 103
+    with open(summary_file, encoding='utf-8') as f:
+        summary = f.read()
+    assert '### Most Failed URLs (top 1 of 100 failed rows):' in summary
+    assert '| 0.example | 15 |' in summary
+    assert '_More URLs failed than were tracked; counts are upper bounds._' in summary
+    assert '### Unhandled Lines (first 1 of 3):' in summary
+    assert '_90 more not shown._' in summary
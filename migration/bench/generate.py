@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+################################################################################
+# generate.py
+# Fill a TEST database with synthetic Authenticators, SearchProviders and
+# AIProviders for benchmarking the migration phases.
+#
+# Example usage (from /app, against a throwaway database):
+# PYTHONPATH=. python ./migration/bench/generate.py --rows 10000
+# PYTHONPATH=. python ./migration/bench/generate.py --rows 1000000 --blob-size 4096
+# PYTHONPATH=. python ./migration/bench/generate.py --rows 10000 --connectors 0
+# PYTHONPATH=. python ./migration/bench/generate.py --clear
+#
+# Values are derived from each model's current fields (type, max_length,
+# choices, null/default), so the data stays valid as the models change.
+#
+# Like real tenants, most providers are clones of a few preloaded connectors:
+# their JSON fields (query_mappings, result_mappings, config, ...) repeat one
+# of --connectors template values, and only --unique-ratio of the rows get
+# values of their own. This is what extract --dedup-blobs and translate's
+# per-blob validation cache are meant for.
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "swirl_server.settings")
+django.setup()
+
+from swirl.models import AIProvider, Authenticator, SearchProvider  # type: ignore
+
+# Every generated row's name starts with this, so --clear only removes them
+NAME_PREFIX = "bench-"
+
+OBJECT_TYPES = {
+    "authenticators": Authenticator,
+    "search_providers": SearchProvider,
+    "ai_providers": AIProvider,
+}
+
+TEXT_TYPES = {"CharField", "TextField", "SlugField"}
+INTEGER_TYPES = {
+    "IntegerField",
+    "BigIntegerField",
+    "SmallIntegerField",
+    "PositiveIntegerField",
+    "PositiveBigIntegerField",
+    "PositiveSmallIntegerField",
+}
+
+
+def log(msg: str) -> None:
+    print(f"[generate.py] {msg}", file=sys.stderr)
+
+
+def random_text(rng, length: int) -> str:
+    return "".join(rng.choices(string.ascii_letters + string.digits + " ", k=length))
+
+
+def json_blob(rng, size: int) -> dict:
+    """A nested JSON object whose serialized size is roughly size bytes."""
+    blob = {"query_mappings": {}, "tags": [], "notes": ""}
+    remaining = size
+    i = 0
+    while remaining > 64:
+        key = f"key_{i}"
+        value = random_text(rng, min(48, remaining - 16))
+        if i % 3 == 0:
+            blob["query_mappings"][key] = value
+        elif i % 3 == 1:
+            blob["tags"].append(value)
+        else:
+            blob["notes"] += value
+        remaining -= len(key) + len(value) + 8
+        i += 1
+    return blob
+
+
+class ConnectorBlobs:
+    """
+    JSON field values for generated rows: per model and field, a pool of
+    `connectors` template values that rows share, plus a `unique_ratio`
+    share of rows with a value of their own.
+    """
+
+    def __init__(self, rng, blob_size: int, connectors: int, unique_ratio: float):
+        self.rng = rng
+        self.blob_size = blob_size
+        self.connectors = connectors
+        self.unique_ratio = unique_ratio
+        self.templates = {}
+
+    def value(self, field, index: int) -> dict:
+        if not self.connectors or self.rng.random() < self.unique_ratio:
+            return json_blob(self.rng, self.blob_size)
+        key = (field.model.__name__, field.name)
+        templates = self.templates.get(key)
+        if templates is None:
+            templates = [
+                json_blob(self.rng, self.blob_size) for _ in range(self.connectors)
+            ]
+            self.templates[key] = templates
+        return templates[index % self.connectors]
+
+
+def field_value(field, index: int, rng, blobs, owner):
+    """Return a value for field, or raise LookupError to leave it unset."""
+    internal_type = field.get_internal_type()
+
+    if field.primary_key or getattr(field, "auto_now", False) or \
+            getattr(field, "auto_now_add", False):
+        raise LookupError
+    if field.is_relation:
+        if field.name == "owner" or field.related_model is get_user_model():
+            return owner
+        if field.null:
+            return None
+        raise SystemExit(
+            f"Cannot generate {field.model.__name__}.{field.name}: required "
+            f"relation to {field.related_model.__name__}."
+        )
+    if field.choices:
+        values = [value for value, _ in field.flatchoices]
+        return values[index % len(values)]
+
+    if internal_type == "JSONField":
+        return blobs.value(field, index)
+    if internal_type == "URLField":
+        return f"https://bench.example.com/{index}/search"
+    if internal_type == "EmailField":
+        return f"bench{index}@example.com"
+    if internal_type in TEXT_TYPES:
+        length = 32 if internal_type != "TextField" else 200
+        if field.max_length:
+            length = min(length, field.max_length)
+        return random_text(rng, length)
+    if internal_type == "BooleanField":
+        return index % 2 == 0
+    if internal_type in INTEGER_TYPES:
+        return index % 100
+    if internal_type == "FloatField":
+        return rng.random()
+
+    if field.has_default():
+        raise LookupError
+    if field.null:
+        return None
+    raise SystemExit(
+        f"Cannot generate {field.model.__name__}.{field.name}: unsupported "
+        f"required {internal_type}."
+    )
+
+
+def build_instance(model_cls, fields, index: int, rng, blobs, owner):
+    values = {}
+    for field in fields:
+        if field.name == "name":
+            continue
+        try:
+            values[field.name] = field_value(field, index, rng, blobs, owner)
+        except LookupError:
+            pass
+    name = f"{NAME_PREFIX}{model_cls.__name__.lower()}-{index:07d}"
+    return model_cls(name=name, **values)
+
+
+def generate(model_cls, rows: int, blobs, batch_size: int, rng, owner):
+    fields = [
+        f for f in model_cls._meta.concrete_fields
+        if not getattr(f, "many_to_many", False)
+    ]
+    start = model_cls.objects.filter(name__startswith=NAME_PREFIX).count()
+    started = time.perf_counter()
+
+    created = 0
+    while created < rows:
+        count = min(batch_size, rows - created)
+        first = start + created
+        batch = [
+            build_instance(model_cls, fields, first + i, rng, blobs, owner)
+            for i in range(count)
+        ]
+        with transaction.atomic():
+            model_cls.objects.bulk_create(batch, batch_size=batch_size)
+        created += count
+
+    elapsed = time.perf_counter() - started
+    log(f"{model_cls.__name__}: created {created} rows in {elapsed:.1f}s")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Generate synthetic Swirl objects in the configured database for "
+            "migration benchmarks. Use a throwaway database."
+        )
+    )
+    parser.add_argument(
+        "objects",
+        nargs="*",
+        help="Object types to generate (default: all of "
+             "authenticators, search_providers, ai_providers)",
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        default=1000,
+        help="Rows to add per object type (default: 1000)",
+    )
+    parser.add_argument(
+        "--blob-size",
+        dest="blob_size",
+        type=int,
+        default=512,
+        help="Approximate serialized size in bytes of each JSON field "
+             "(default: 512)",
+    )
+    parser.add_argument(
+        "--connectors",
+        type=int,
+        default=20,
+        help="Preloaded connector templates whose JSON values the rows clone; "
+             "0 gives every row values of its own (default: 20)",
+    )
+    parser.add_argument(
+        "--unique-ratio",
+        dest="unique_ratio",
+        type=float,
+        default=0.1,
+        help="Share of rows with JSON values of their own instead of a "
+             "template's (default: 0.1)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=1000,
+        help="Rows per bulk INSERT (default: 1000)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed, for reproducible data (default: 0)",
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help=f"Delete previously generated rows (names starting with "
+             f"{NAME_PREFIX!r}) and exit",
+    )
+    args = parser.parse_args()
+
+    for name in args.objects:
+        if name not in OBJECT_TYPES:
+            parser.error(
+                f"Unknown object type '{name}'. "
+                f"Valid options: {', '.join(OBJECT_TYPES)}"
+            )
+    if args.rows < 0 or args.batch_size < 1 or args.blob_size < 0:
+        parser.error("--rows, --batch-size and --blob-size must not be negative.")
+    if args.connectors < 0 or not 0 <= args.unique_ratio <= 1:
+        parser.error("--connectors must not be negative and --unique-ratio "
+                     "must be between 0 and 1.")
+    return args
+
+
+def main():
+    args = parse_args()
+    selected = args.objects or list(OBJECT_TYPES)
+
+    if args.clear:
+        for key in selected:
+            model_cls = OBJECT_TYPES[key]
+            generated = model_cls.objects.filter(name__startswith=NAME_PREFIX)
+            deleted, _ = generated.delete()
+            log(f"{model_cls.__name__}: deleted {deleted} generated rows")
+        return
+
+    User = get_user_model()
+    owner = (
+        User.objects.filter(username="admin").first()
+        or User.objects.filter(is_superuser=True).first()
+    )
+    if owner is None:
+        raise SystemExit("No admin or superuser found to own the generated rows.")
+
+    rng = random.Random(args.seed)
+    blobs = ConnectorBlobs(rng, args.blob_size, args.connectors, args.unique_ratio)
+    for key in selected:
+        generate(OBJECT_TYPES[key], args.rows, blobs, args.batch_size, rng, owner)
+
+
+if __name__ == "__main__":
+    main()
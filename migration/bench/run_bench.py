@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+################################################################################
+# run_bench.py
+# Time the migration phases against the configured (TEST) database and
+# compare them with stored baselines.
+#
+# Example usage (from /app, with PYTHONPATH=.):
+# python ./migration/bench/run_bench.py --generate 10000
+# python ./migration/bench/run_bench.py --save-baseline
+# python ./migration/bench/run_bench.py --check-baseline
+# python ./migration/bench/run_bench.py --phases extract translate \
+#     --extract-args "--stream --compress zstd" --translate-args "--stream -j 4"
+#
+# Each phase runs as its own process, exactly as extract.sh / translate.sh /
+# load.sh would run it. Peak RSS comes from wait4() on that process, so it
+# includes any worker processes the phase itself waited for. The artifacts
+# go to a temporary directory (--work-dir), never ./migration/extract.json
+# or load.json, so pending migration files are left alone.
+#
+# --check-baseline needs a baseline recorded on the same machine with
+# --save-baseline (migration/bench/baselines.json is not checked in).
+#
+# Does not import Django; load.py modifies the database it points at.
+
+import argparse
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_DIR = os.path.dirname(BENCH_DIR)
+PROJECT_DIR = os.path.dirname(MIGRATION_DIR)
+
+sys.path.insert(0, MIGRATION_DIR)
+
+from migration_io import iter_payload  # noqa: E402
+
+PHASES = ("extract", "translate", "load")
+
+# phase -> (script, default args, input/output args given the work
+# directory, artifact counted as its rows, artifact reported as its output);
+# artifact names are relative to the work directory
+PHASE_SPECS = {
+    "extract": (
+        "extract.py",
+        ["-a"],
+        lambda work: ["-o", work],
+        "extract.json",
+        "extract.json",
+    ),
+    "translate": (
+        "translate.py",
+        [],
+        lambda work: [
+            "-i", os.path.join(work, "extract.json"),
+            "-o", os.path.join(work, "load.json"),
+        ],
+        "load.json",
+        "load.json",
+    ),
+    "load": (
+        "load.py",
+        [],
+        lambda work: ["-i", os.path.join(work, "load.json")],
+        "load.json",
+        None,
+    ),
+}
+
+DEFAULT_BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+DEFAULT_THRESHOLD = 0.20
+
+# Metrics compared against the baseline, and whether higher is better
+CHECKED_METRICS = {
+    "rows_per_s": True,
+    "peak_rss_kb": False,
+}
+
+
+def log(msg: str) -> None:
+    print(f"[run_bench.py] {msg}", file=sys.stderr)
+
+
+def count_records(path: str) -> int:
+    return sum(1 for key, _ in iter_payload(path) if key != "deleted")
+
+
+def run_measured(cmd):
+    """Run cmd from the project dir; return (exit code, wall seconds, peak RSS KB)."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (".", env.get("PYTHONPATH")) if p
+    )
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=PROJECT_DIR, env=env)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - started
+    # wait4() reaped the child; stop Popen from waiting for it again
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is in kilobytes on Linux
+    return proc.returncode, wall, usage.ru_maxrss
+
+
+def run_phase(phase: str, extra_args, work_dir: str) -> dict:
+    script, default_args, io_args, rows_name, output_name = PHASE_SPECS[phase]
+    rows_path = os.path.join(work_dir, rows_name)
+    output_path = os.path.join(work_dir, output_name) if output_name else None
+    cmd = [sys.executable, os.path.join("migration", script)]
+    cmd += extra_args if extra_args is not None else default_args
+    cmd += io_args(work_dir)
+
+    log(f"Running {phase}: {' '.join(shlex.quote(c) for c in cmd)}")
+    code, wall, peak_rss_kb = run_measured(cmd)
+    if code != 0:
+        raise SystemExit(f"{phase} failed with exit code {code}")
+
+    rows = count_records(rows_path)
+    result = {
+        "rows": rows,
+        "wall_s": round(wall, 3),
+        "rows_per_s": round(rows / wall, 1) if wall > 0 else None,
+        "peak_rss_kb": peak_rss_kb,
+        "output_bytes": os.path.getsize(output_path) if output_path else None,
+    }
+    log(
+        f"{phase}: {rows} rows in {wall:.2f}s "
+        f"({result['rows_per_s']} rows/s), peak RSS {peak_rss_kb / 1024:.1f} MiB"
+        + (f", output {result['output_bytes']} bytes" if output_path else "")
+    )
+    return result
+
+
+def check_baseline(results: dict, baseline: dict, threshold: float):
+    """Return a list of regression messages (empty if none)."""
+    regressions = []
+    for phase, measured in results.items():
+        reference = baseline.get("phases", {}).get(phase)
+        if reference is None:
+            log(f"No baseline for {phase}; not checked.")
+            continue
+        for metric, higher_is_better in CHECKED_METRICS.items():
+            base = reference.get(metric)
+            value = measured.get(metric)
+            if not base or value is None:
+                continue
+            change = (value - base) / base
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append(
+                    f"{phase} {metric}: {value} vs baseline {base} "
+                    f"({change:+.0%}, threshold {threshold:.0%})"
+                )
+    return regressions
+
+
+def print_table(results: dict) -> None:
+    print(f"{'phase':<10} {'rows':>9} {'wall_s':>9} {'rows/s':>11} "
+          f"{'peak_rss_MiB':>13} {'output_bytes':>13}")
+    for phase, r in results.items():
+        output = r["output_bytes"] if r["output_bytes"] is not None else "-"
+        print(
+            f"{phase:<10} {r['rows']:>9} {r['wall_s']:>9.2f} "
+            f"{r['rows_per_s'] or 0:>11.1f} {r['peak_rss_kb'] / 1024:>13.1f} "
+            f"{output:>13}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark extract.py, translate.py and load.py against the "
+            "configured database. Use a throwaway database: load modifies it."
+        )
+    )
+    parser.add_argument(
+        "--phases",
+        nargs="+",
+        choices=PHASES,
+        default=list(PHASES),
+        help="Phases to run, in order (default: all three)",
+    )
+    for phase in PHASES:
+        script, default_args, _, _, _ = PHASE_SPECS[phase]
+        parser.add_argument(
+            f"--{phase}-args",
+            dest=f"{phase}_args",
+            type=shlex.split,
+            default=None,
+            help=f"Arguments for {script} "
+                 f"(default: {' '.join(default_args) or 'none'}); input and "
+                 "output paths in the work directory are added",
+        )
+    parser.add_argument(
+        "--work-dir",
+        dest="work_dir",
+        help="Directory for the phases' extract.json and load.json, kept "
+             "after the run (default: a temporary directory, removed "
+             "afterwards). translate and load without extract need an "
+             "extract.json / load.json there.",
+    )
+    parser.add_argument(
+        "--generate",
+        type=int,
+        metavar="ROWS",
+        help="First add ROWS synthetic rows per object type with generate.py "
+             "(not timed)",
+    )
+    parser.add_argument(
+        "--blob-size",
+        dest="blob_size",
+        type=int,
+        default=512,
+        help="JSON field size for --generate (default: 512)",
+    )
+    parser.add_argument(
+        "--connectors",
+        type=int,
+        default=20,
+        help="Connector templates the --generate rows clone their JSON "
+             "values from; 0 makes every value unique (default: 20)",
+    )
+    parser.add_argument(
+        "--results",
+        dest="results_path",
+        help="Also write the measurements to this JSON file",
+    )
+    parser.add_argument(
+        "--baseline",
+        dest="baseline_path",
+        default=DEFAULT_BASELINE_PATH,
+        help=f"Baseline file (default: {DEFAULT_BASELINE_PATH})",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        dest="save_baseline",
+        action="store_true",
+        help="Store this run's measurements as the baseline",
+    )
+    parser.add_argument(
+        "--check-baseline",
+        dest="check_baseline",
+        action="store_true",
+        help="Exit with status 1 if rows/s or peak RSS of any phase is worse "
+             "than the baseline by more than the threshold. Needs a baseline "
+             "recorded on this machine with --save-baseline.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="Allowed regression as a fraction, e.g. 0.2 for 20%% (default: "
+             f"the baseline file's, else {DEFAULT_THRESHOLD})",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Fail before spending a benchmark run on a check that cannot happen
+    if args.check_baseline and not os.path.exists(args.baseline_path):
+        raise SystemExit(
+            f"No baseline at {args.baseline_path}. Baselines are "
+            "machine-specific and not checked in: record one on this machine "
+            "with --save-baseline (same phases and arguments) first."
+        )
+
+    if args.generate:
+        cmd = [
+            sys.executable,
+            os.path.join("migration", "bench", "generate.py"),
+            "--rows",
+            str(args.generate),
+            "--blob-size",
+            str(args.blob_size),
+            "--connectors",
+            str(args.connectors),
+        ]
+        code, wall, _ = run_measured(cmd)
+        if code != 0:
+            raise SystemExit(f"generate.py failed with exit code {code}")
+        log(f"Generated {args.generate} rows per object type in {wall:.1f}s")
+
+    if args.work_dir:
+        work_dir = os.path.abspath(args.work_dir)
+    else:
+        work_dir = tempfile.mkdtemp(prefix="migration-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    log(f"Writing phase artifacts to {work_dir}")
+    results = {}
+    try:
+        for phase in args.phases:
+            results[phase] = run_phase(
+                phase, getattr(args, f"{phase}_args"), work_dir
+            )
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_table(results)
+
+    run = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "phases": results,
+    }
+    if args.results_path:
+        with open(args.results_path, "w") as f:
+            json.dump(run, f, indent=2)
+        log(f"Wrote results to {args.results_path}")
+
+    if args.check_baseline:
+        with open(args.baseline_path, "r") as f:
+            baseline = json.load(f)
+        threshold = args.threshold
+        if threshold is None:
+            threshold = baseline.get("threshold", DEFAULT_THRESHOLD)
+
+        regressions = check_baseline(results, baseline, threshold)
+        if regressions:
+            for message in regressions:
+                log(f"REGRESSION {message}")
+            raise SystemExit(1)
+        log(f"No regressions beyond {threshold:.0%} against {args.baseline_path}")
+
+    if args.save_baseline:
+        run["threshold"] = (
+            args.threshold if args.threshold is not None else DEFAULT_THRESHOLD
+        )
+        with open(args.baseline_path, "w") as f:
+            json.dump(run, f, indent=2)
+        log(f"Saved baseline to {args.baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+################################################################################
+# convert.py
+# Convert a migration artifact (extract.json, load.json) between the JSON,
+# JSON Lines and msgpack layouts, e.g. to inspect a binary file:
+#
+# python ./migration/convert.py ./migration/extract.json ./migration/extract_readable.json
+# python ./migration/convert.py ./migration/load.json ./migration/load.msgpack
+# python ./migration/convert.py in.json out.bin --to msgpack --compress zstd
+#
+# The input layout and compression are detected from the file contents. The
+# output layout comes from --to or else the output file's extension. Records
+# are converted one at a time. Deduplicated values (--dedup-blobs) are
+# resolved on read and only deduplicated again with --dedup-blobs. Does not
+# need Django.
+
+import argparse
+import os
+import sys
+
+from migration_io import (
+    COMPRESSION_SUFFIXES,
+    COMPRESSIONS,
+    FORMATS,
+    AtomicArtifactWriter,
+    artifact_format,
+    iter_payload,
+    open_writer,
+)
+
+
+def log(msg: str) -> None:
+    print(f"[convert.py] {msg}", file=sys.stderr)
+
+
+def format_from_path(path: str) -> str:
+    """Guess the output layout from the extension, ignoring .gz/.zst."""
+    base = path
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if suffix and base.endswith(suffix):
+            base = base[: -len(suffix)]
+    extension = os.path.splitext(base)[1].lstrip(".").lower()
+    return extension if extension in FORMATS else "json"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Convert a migration artifact between the json, jsonl and msgpack "
+            "layouts."
+        )
+    )
+    parser.add_argument("input_path", help="Artifact to read (any layout)")
+    parser.add_argument("output_path", help="File to write")
+    parser.add_argument(
+        "--to",
+        dest="output_format",
+        choices=FORMATS,
+        help="Output layout (default: from the output file extension, "
+             "else json)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default="none",
+        help="Compress the output (default: none)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON without indentation",
+    )
+    parser.add_argument(
+        "--dedup-blobs",
+        dest="dedup_blobs",
+        action="store_true",
+        help="Store large repeated JSON values once, referenced by hash",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.input_path):
+        raise SystemExit(f"Input file not found: {args.input_path}")
+
+    output_format = args.output_format or format_from_path(args.output_path)
+    input_format = artifact_format(args.input_path)
+    log(f"Converting {args.input_path} ({input_format}) to {output_format}")
+
+    output_dir = os.path.dirname(args.output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    counts = {}
+    with AtomicArtifactWriter(
+        [args.output_path],
+        compress=args.compress,
+        binary=output_format == "msgpack",
+    ) as f:
+        writer = open_writer(
+            f, output_format, dedup_blobs=args.dedup_blobs, compact=args.compact
+        )
+        for key, record in iter_payload(args.input_path):
+            writer.write(key, record)
+            counts[key] = counts.get(key, 0) + 1
+        writer.close()
+    if args.dedup_blobs:
+        log(f"Deduplicated: {writer.encoder.summary()}")
+
+    summary = ", ".join(f"{count} {key}" for key, count in counts.items())
+    log(f"Wrote {summary or 'no records'} to {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
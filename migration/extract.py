@@ -6,21 +6,46 @@
 # python ./migration/extract_objects.py authenticators -n 'Azure'
 # python ./migration/extract_objects.py search_providers ai_providers -n '^OpenAI'
 # python ./migration/extract_objects.py -a -n 'SharePoint'
+# python ./migration/extract_objects.py -a --stream
+# python ./migration/extract_objects.py -a --jobs 3
+# python ./migration/extract_objects.py -a --incremental
+# python ./migration/extract_objects.py -a --copy --stream
 
 
 import argparse
+import hashlib
 import json
 import os
 import re
+import shutil
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import django
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "swirl_server.settings")
 django.setup()
 
 from swirl.models import AIProvider, Authenticator, SearchProvider  # type: ignore
 
+from migration_io import (
+    BLOBS_KEY,
+    COMPRESSION_SUFFIXES,
+    COMPRESSIONS,
+    DELETED_KEY,
+    AtomicArtifactWriter,
+    BlobDedupWriter,
+    BlobEncoder,
+    JsonlWriter,
+    MsgpackWriter,
+)
+from migration_metrics import Metrics, add_metrics_arguments
+
 # Define per-model sensitive fields
 SENSITIVE_FIELDS = {
     "Authenticator": {
@@ -46,6 +71,20 @@ SENSITIVE_FIELDS = {
     },
 }
 
+# Backends where the --name regex can be evaluated by the database
+DB_REGEX_VENDORS = {"postgresql", "sqlite"}
+
+# Python regex syntax that PostgreSQL interprets differently or rejects:
+# letter escapes other than \d \s \w (and negations), \n, \t, and any
+# (?...) construct except non-capturing groups.
+_NON_PORTABLE_REGEX = re.compile(r"\\[A-CE-RT-VX-Za-ce-mo-ru-vx-z0-9]|\(\?(?!:)")
+
+# Timestamp used as the per-model high-water mark in --incremental mode.
+# It is in SENSITIVE_FIELDS, so it is read for bookkeeping but never exported.
+WATERMARK_FIELD = "date_updated"
+
+MANIFEST_VERSION = 1
+
 # Map CLI object type names -> (Model, payload_key)
 OBJECT_TYPES = {
     "authenticators": (Authenticator, "authenticators"),
@@ -58,12 +97,22 @@ def log(msg: str) -> None:
     print(f"[extract_objects.py] {msg}", file=sys.stderr)
 
 
-def serialize_instance(obj):
-    model_name = obj.__class__.__name__
-    sensitive = SENSITIVE_FIELDS.get(model_name, set())
+# Configured from --metrics-out/--profile/--quiet in main()
+METRICS = Metrics("extract", log)
+
+
+def build_field_plan(model_cls):
+    """
+    Return the names of the fields to export for model_cls.
+
+    Computed once per model: only concrete, local, non-relational fields that
+    are not listed in SENSITIVE_FIELDS. Used as a .values() projection so only
+    these columns are fetched and no model instances are built.
+    """
+    sensitive = SENSITIVE_FIELDS.get(model_cls.__name__, set())
 
-    data = {}
-    for field in obj._meta.get_fields():
+    fields = []
+    for field in model_cls._meta.get_fields():
         # Only dump concrete, local, non-relational fields
         if not getattr(field, "concrete", False):
             continue
@@ -71,33 +120,300 @@ def serialize_instance(obj):
             continue
         if field.is_relation:
             continue
-
-        name = field.name
-        if name in sensitive:
+        if field.name in sensitive:
             continue
+        fields.append(field.name)
+
+    return fields
+
+
+def is_portable_regex(pattern: str) -> bool:
+    """
+    True if pattern only uses syntax that Python and PostgreSQL regexes
+    interpret the same way (no escapes such as \\b or \\Z, no (?...) groups
+    other than (?:...)).
+    """
+    return _NON_PORTABLE_REGEX.search(pattern) is None
+
+
+def apply_name_filter(qs, pattern, mode="auto"):
+    """
+    Push the --name regex into the query where the backend supports it.
+
+    Returns (queryset, where) with where being "db" or "python". SQLite runs
+    Django's REGEXP with Python's re module, so it always matches exactly;
+    PostgreSQL is only used for patterns that mean the same thing there.
+    Rows are still re-checked in Python, so a DB-side filter can only reduce
+    the number of rows fetched, never add matches.
+    """
+    if pattern is None or mode == "python":
+        return qs, "python"
+
+    vendor = connections[qs.db].vendor
+    push_down = mode == "db" or (
+        vendor in DB_REGEX_VENDORS
+        and (vendor != "postgresql" or is_portable_regex(pattern))
+    )
+    if push_down:
+        return qs.filter(name__regex=pattern), "db"
+
+    return qs, "python"
+
+
+def name_matches(row: dict, name_regex) -> bool:
+    if name_regex is None:
+        return True
+    name = row.get("name", "")
+    if not isinstance(name, str):
+        name = str(name)
+    return name_regex.search(name) is not None
+
+
+class _CopyLineSink:
+    """
+    File-like target for COPY ... TO STDOUT that hands every complete line to
+    callback as it arrives, so the table is never buffered whole.
+    """
+
+    def __init__(self, callback):
+        self._callback = callback
+        self._pending = b""
 
-        data[name] = getattr(obj, name)
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        *lines, self._pending = (self._pending + bytes(data)).split(b"\n")
+        for line in lines:
+            self._callback(line.decode("utf-8"))
 
-    return data
+    def close(self):
+        if self._pending:
+            self._callback(self._pending.decode("utf-8"))
+            self._pending = b""
 
 
-def export_queryset(qs, name_regex=None):
+def copy_rows(qs, fields, on_row):
     """
-    Export objects from queryset, optionally filtering by name regex.
+    Read the projected fields of qs with PostgreSQL COPY ... TO STDOUT and call
+    on_row(dict) for every row. Returns False, without reading anything, if
+    the query cannot be expressed as a parameterless COPY.
+
+    The ORM compiles the projection (same columns, table and ordering as
+    .values()); each row travels as one row_to_json() text value, so jsonb
+    columns arrive as nested JSON and NULLs as null, like the ORM path.
+    """
+    select_sql, params = qs.values(*fields).query.sql_with_params()
+    if params:
+        return False
+
+    by_column = {qs.model._meta.get_field(name).column: name for name in fields}
+    sql = (
+        "COPY (SELECT row_to_json(t)::text FROM (" + select_sql + ") t) "
+        "TO STDOUT WITH (FORMAT csv)"
+    )
+
+    def handle(line):
+        # A JSON object always contains quotes, so CSV quotes the field and
+        # doubles its inner quotes.
+        if line.startswith('"'):
+            line = line[1:-1].replace('""', '"')
+        values = json.loads(line)
+        on_row({by_column.get(column, column): value
+                for column, value in values.items()})
+
+    connection = connections[qs.db]
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        sink = _CopyLineSink(handle)
+        if hasattr(raw, "copy_expert"):
+            # psycopg2
+            raw.copy_expert(sql, sink)
+        else:
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                for data in copy:
+                    sink.write(data)
+        sink.close()
+    return True
+
+
+def iter_rows(qs, fields, name_regex=None, chunk_size=500):
+    """Yield projected rows of qs that match name_regex, in chunks."""
+    for row in qs.values(*fields).iterator(chunk_size=chunk_size):
+        if name_matches(row, name_regex):
+            yield row
+
+
+def export_queryset(qs, fields, name_regex=None, use_copy=False):
+    """
+    Export rows from queryset as dicts of the projected fields, optionally
+    filtering by name regex.
     name_regex: compiled regex or None
+    use_copy: read with PostgreSQL COPY (only without a name filter)
     """
     results = []
-    for obj in qs:
-        if name_regex is not None:
-            name = getattr(obj, "name", "")
-            if not isinstance(name, str):
-                name = str(name)
-            if not name_regex.search(name):
-                continue
-        results.append(serialize_instance(obj))
+    if use_copy and copy_rows(qs, fields, results.append):
+        return results
+    for row in qs.values(*fields):
+        if not name_matches(row, name_regex):
+            continue
+        results.append(row)
     return results
 
 
+def stream_queryset(qs, fields, writer, payload_key, name_regex=None,
+                    chunk_size=500, use_copy=False):
+    """
+    Stream rows from queryset straight into writer, one record at a time.
+
+    Uses chunked (server-side cursor where supported) iteration, or COPY when
+    use_copy is set, so memory use stays flat regardless of the number of
+    rows. Returns the number written.
+    """
+    count = 0
+
+    def write(row):
+        nonlocal count
+        writer.write(payload_key, row)
+        count += 1
+
+    if use_copy and copy_rows(qs, fields, write):
+        return count
+
+    for row in iter_rows(qs, fields, name_regex, chunk_size):
+        write(row)
+    return count
+
+
+def record_hash(record: dict) -> str:
+    """Stable content hash of an exported record."""
+    blob = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def model_has_field(model_cls, field_name: str) -> bool:
+    try:
+        model_cls._meta.get_field(field_name)
+        return True
+    except Exception:
+        return False
+
+
+class ExtractManifest:
+    """
+    Bookkeeping for --incremental extracts, kept next to extract.json.
+
+    Per payload key it stores the highest WATERMARK_FIELD value seen and a
+    content hash per exported row (keyed by primary key), so a re-run only
+    exports rows created or changed since, plus tombstones for rows that
+    disappeared. A manifest recorded with a different --name pattern
+    describes a different row set, so it is discarded and a full extract is
+    taken instead.
+    """
+
+    def __init__(self, path: str, name_pattern):
+        self.path = path
+        self.tombstones = []
+        self.data = {
+            "version": MANIFEST_VERSION,
+            "name_pattern": name_pattern,
+            "models": {},
+        }
+
+        if not os.path.exists(path):
+            log(f"No manifest at {path}; taking a full extract.")
+            return
+
+        with open(path, "r") as f:
+            existing = json.load(f)
+
+        if existing.get("version") != MANIFEST_VERSION:
+            log(f"Manifest {path} has an unknown version; taking a full extract.")
+        elif existing.get("name_pattern") != name_pattern:
+            log(
+                f"Manifest {path} was recorded for name filter "
+                f"{existing.get('name_pattern')!r}; taking a full extract."
+            )
+        else:
+            self.data = existing
+
+    def iter_changed(self, model_cls, payload_key, qs, fields, name_regex,
+                     chunk_size=500):
+        """
+        Yield the rows of qs that are new or changed since the last run and
+        queue tombstones for rows that no longer exist (or no longer match).
+        Updates the in-memory manifest; call save() once the output is safe.
+        """
+        state = self.data["models"].setdefault(
+            payload_key, {"watermark": None, "records": {}}
+        )
+        known = state["records"]
+        pk_name = model_cls._meta.pk.name
+        has_watermark = model_has_field(model_cls, WATERMARK_FIELD)
+
+        # Which rows match right now: one narrow query over pk and name
+        current = {}
+        for row in qs.values(pk_name, "name").iterator(chunk_size=chunk_size):
+            if name_matches(row, name_regex):
+                current[str(row[pk_name])] = row[pk_name]
+
+        # Candidates: rows touched at or after the watermark, plus rows the
+        # manifest has never seen (covers clock skew and imported rows).
+        # Ties at the watermark are re-read and dropped by hash below.
+        watermark = parse_datetime(state["watermark"] or "")
+        candidates = qs
+        if has_watermark and watermark is not None and known:
+            unseen = [pk for key, pk in current.items() if key not in known]
+            candidates = qs.filter(
+                Q(**{f"{WATERMARK_FIELD}__gte": watermark}) | Q(pk__in=unseen)
+            )
+
+        query_fields = list(fields)
+        for extra in (pk_name, WATERMARK_FIELD if has_watermark else None):
+            if extra and extra not in query_fields:
+                query_fields.append(extra)
+
+        newest = watermark
+        changed = 0
+        for row in candidates.values(*query_fields).iterator(chunk_size=chunk_size):
+            key = str(row[pk_name])
+            if key not in current:
+                # Deleted or renamed out of the filter since the first query
+                continue
+
+            if has_watermark:
+                stamp = row[WATERMARK_FIELD]
+                if stamp is not None and (newest is None or stamp > newest):
+                    newest = stamp
+
+            record = {name: row[name] for name in fields}
+            digest = record_hash(record)
+            entry = known.get(key)
+            if entry is not None and entry["hash"] == digest:
+                continue
+
+            known[key] = {"name": record.get("name"), "hash": digest}
+            changed += 1
+            yield record
+
+        for key in [key for key in known if key not in current]:
+            self.tombstones.append(
+                {"type": payload_key, "id": key, "name": known.pop(key)["name"]}
+            )
+
+        state["watermark"] = newest.isoformat() if newest is not None else None
+        log(
+            f"  incremental: {changed} new/changed, "
+            f"{sum(1 for t in self.tombstones if t['type'] == payload_key)} "
+            f"deleted since last run."
+        )
+
+    def save(self) -> None:
+        with AtomicArtifactWriter([self.path]) as f:
+            json.dump(self.data, f, indent=2)
+        log(f"Manifest updated at {self.path}")
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description=(
@@ -126,8 +442,103 @@ def parse_args():
         help="Optional regex to filter objects by their name field. "
              "Only matching records will be exported.",
     )
+    parser.add_argument(
+        "--name-filter",
+        dest="name_filter",
+        choices=("auto", "db", "python"),
+        default="auto",
+        help="Where to evaluate --name: 'auto' pushes the regex into the "
+             "query on SQLite and (for portable patterns) PostgreSQL, "
+             "'db' always does, 'python' filters fetched rows "
+             "(default: auto)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        dest="output_dir",
+        default="./migration",
+        help="Directory for extract.json, its descriptively named copy and "
+             "the --incremental manifest (default: ./migration)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON without indentation (JSON Lines output from "
+             "--stream is always compact)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default="none",
+        help="Compress the output (zstd needs the 'zstandard' package). "
+             "translate.py and load.py decompress transparently "
+             "(default: none)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream records to disk as JSON Lines while reading the database "
+             "in chunks, keeping memory flat regardless of row count. "
+             "translate.py and load.py detect this format automatically.",
+    )
+    parser.add_argument(
+        "--msgpack",
+        action="store_true",
+        help="Write the binary msgpack layout instead of JSON, streamed like "
+             "--stream (needs the 'msgpack' package). translate.py and "
+             "load.py detect it automatically; convert.py turns it into JSON.",
+    )
+    parser.add_argument(
+        "--dedup-blobs",
+        dest="dedup_blobs",
+        action="store_true",
+        help="Store large JSON values that repeat across records (e.g. "
+             "query_mappings of cloned providers) once and refer to them by "
+             "hash. translate.py and load.py resolve them automatically.",
+    )
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        help="On PostgreSQL, read full tables with COPY ... TO STDOUT instead "
+             "of the ORM. Only applies without -n/--name and --incremental; "
+             "other backends fall back to the ORM.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only export rows created or changed since the previous "
+             "--incremental run, plus tombstones for deleted rows. State is "
+             "kept in ./migration/extract.manifest.json.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Extract up to N object types concurrently, each on its own "
+             "database connection, then merge them into one extract "
+             "(default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=500,
+        help="Rows fetched per database round-trip in --stream mode "
+             "(default: 500)",
+    )
+    add_metrics_arguments(parser)
     args = parser.parse_args()
 
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be a positive integer.")
+    if args.jobs < 1:
+        parser.error("--jobs must be a positive integer.")
+    if args.incremental and args.jobs > 1:
+        parser.error("--incremental cannot be combined with --jobs.")
+    if args.msgpack and args.jobs > 1:
+        parser.error("--msgpack cannot be combined with --jobs.")
+
     if not args.all and not args.objects:
         parser.error(
             "You must specify either -a/--all or at least one object type "
@@ -137,8 +548,162 @@ def parse_args():
     return args
 
 
+def prepare_queryset(model_cls, args):
+    """Return (queryset, fields) for model_cls with the name filter applied."""
+    fields = build_field_plan(model_cls)
+    qs, where = apply_name_filter(
+        model_cls.objects.all(), args.name_pattern, mode=args.name_filter
+    )
+    if args.name_pattern:
+        log(f"  name filter for {model_cls.__name__} evaluated in: {where}")
+    return qs, fields
+
+
+def json_dump_kwargs(args) -> dict:
+    if args.compact:
+        return {"separators": (",", ":")}
+    return {"indent": 2}
+
+
+def extract_shard(key, args, name_regex, shard_path):
+    """
+    Extract one object type into shard_path and return (record count,
+    seconds taken).
+
+    Runs in a worker thread; Django connections are per-thread, so every
+    worker uses (and finally closes) its own DB connection and counts its
+    own queries into METRICS. The shard holds bare JSONL record lines in
+    --stream mode, otherwise the JSON list for the payload key, ready to be
+    spliced into the payload by merge_shards().
+    """
+    model_cls, payload_key = OBJECT_TYPES[key]
+    started = time.perf_counter()
+    try:
+        with METRICS.thread_db():
+            log(f"[{payload_key}] Exporting from model {model_cls.__name__}...")
+            qs, fields = prepare_queryset(model_cls, args)
+            # Each shard deduplicates on its own, so it stays self-contained
+            encoder = BlobEncoder() if args.dedup_blobs else None
+            with open(shard_path, "w", encoding="utf-8") as f:
+                if args.stream:
+                    writer = JsonlWriter(f, header=False)
+                    if encoder is not None:
+                        writer = BlobDedupWriter(writer, encoder)
+                    count = stream_queryset(
+                        qs,
+                        fields,
+                        writer,
+                        payload_key,
+                        name_regex=name_regex,
+                        chunk_size=args.chunk_size,
+                        use_copy=args.use_copy,
+                    )
+                else:
+                    exported = export_queryset(
+                        qs, fields, name_regex=name_regex, use_copy=args.use_copy
+                    )
+                    count = len(exported)
+                    if encoder is not None:
+                        exported = [encoder.encode(record) for record in exported]
+                    json.dump(exported, f, **json_dump_kwargs(args))
+            log(f"[{payload_key}]  -> {count} objects exported.")
+            if encoder is not None:
+                log(f"[{payload_key}]  -> {encoder.summary()}")
+            return count, time.perf_counter() - started
+    finally:
+        connections.close_all()
+
+
+def merge_shards(f, shards, args) -> None:
+    """
+    Write the per-type shards, in order, to f as a single extract with the
+    same layout a serial run produces. shards: list of (payload_key, path).
+    """
+    if args.stream:
+        JsonlWriter(f, blobs=args.dedup_blobs)
+        for _, path in shards:
+            with open(path, "r", encoding="utf-8") as shard:
+                shutil.copyfileobj(shard, f)
+        return
+
+    # Reproduce json.dump(payload, indent=2) by nesting each shard's lines
+    # one level deeper; compact shards are spliced in as-is.
+    f.write("{")
+    if args.dedup_blobs:
+        flag = json.dumps(BLOBS_KEY) + ":true"
+        f.write(flag if args.compact else "\n  " + flag.replace(":", ": "))
+    for i, (payload_key, path) in enumerate(shards):
+        if i or args.dedup_blobs:
+            f.write(",")
+        if args.compact:
+            f.write(json.dumps(payload_key) + ":")
+        else:
+            f.write("\n  " + json.dumps(payload_key) + ": ")
+        with open(path, "r", encoding="utf-8") as shard:
+            if args.compact:
+                shutil.copyfileobj(shard, f)
+            else:
+                for lineno, line in enumerate(shard):
+                    f.write(line if lineno == 0 else "  " + line)
+    f.write("}" if args.compact else "\n}")
+
+
+def extract_parallel(selected_keys, args, name_regex, output, migration_dir):
+    """Extract the selected types concurrently into shards, then merge."""
+    shard_dir = tempfile.mkdtemp(dir=migration_dir, prefix=".extract_shards.")
+    try:
+        shards = [
+            (OBJECT_TYPES[key][1], os.path.join(shard_dir, f"{key}.shard"))
+            for key in selected_keys
+        ]
+        workers = min(args.jobs, len(selected_keys))
+        log(f"Extracting {len(selected_keys)} object types with {workers} workers...")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(extract_shard, key, args, name_regex, path)
+                for key, (_, path) in zip(selected_keys, shards)
+            ]
+            # Re-raise the first worker error, if any
+            results = [future.result() for future in futures]
+
+        log("Merging shards...")
+        with output as f:
+            merge_shards(f, shards, args)
+
+        # Recorded in the main thread, after the workers have finished
+        for key, (count, seconds) in zip(selected_keys, results):
+            model_name = OBJECT_TYPES[key][0].__name__
+            METRICS.add_model_seconds(model_name, seconds)
+            METRICS.add_rows(model_name, count)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+
+def copy_fast_path_enabled(args) -> bool:
+    """Decide once whether --copy can be honoured for this run."""
+    if not args.copy:
+        return False
+    if args.name_pattern or args.incremental:
+        log("--copy only applies to full dumps; using the ORM.")
+        return False
+    vendor = connections[DEFAULT_DB_ALIAS].vendor
+    if vendor != "postgresql":
+        log(f"--copy needs PostgreSQL (backend is {vendor}); using the ORM.")
+        return False
+    log("Using PostgreSQL COPY fast path.")
+    return True
+
+
 def main():
     args = parse_args()
+    METRICS.configure(args)
+    with METRICS.run():
+        run(args)
+
+
+def run(args):
+    args.use_copy = copy_fast_path_enabled(args)
 
     # Compile name regex if provided
     name_regex = None
@@ -169,16 +734,6 @@ def main():
 
     log(f"Selected object types to extract: {', '.join(selected_keys)}")
 
-    payload = {}
-
-    for key in selected_keys:
-        model_cls, payload_key = OBJECT_TYPES[key]
-        log(f"Exporting {payload_key} from model {model_cls.__name__}...")
-        qs = model_cls.objects.all()
-        exported = export_queryset(qs, name_regex=name_regex)
-        payload[payload_key] = exported
-        log(f"  -> {len(exported)} objects exported.")
-
     # -----------------------------
     # Dynamic output filename logic
     # -----------------------------
@@ -192,27 +747,125 @@ def main():
         slug = re.sub(r"[^A-Za-z0-9]+", "-", args.name_pattern).strip("-")
         if slug:
             name_part = f"__name_{slug}"
+    if args.incremental:
+        name_part += "__delta"
 
-    base_filename = f"extract_{type_part}{name_part}.json"
+    if args.msgpack:
+        extension = "msgpack"
+    else:
+        extension = "jsonl" if args.stream else "json"
+    extension += COMPRESSION_SUFFIXES[args.compress]
+    base_filename = f"extract_{type_part}{name_part}.{extension}"
 
-    migration_dir = "./migration"
+    migration_dir = args.output_dir
     os.makedirs(migration_dir, exist_ok=True)
 
     descriptive_path = os.path.join(migration_dir, base_filename)
+    # The canonical name stays extract.json in every mode; translate/load
+    # detect the layout and compression from the file contents.
     canonical_path = os.path.join(migration_dir, "extract.json")
 
-    # Write descriptive file
-    with open(descriptive_path, "w") as f:
-        json.dump(payload, f, indent=2)
+    # Serialize once to a temp file, then atomically publish both names from
+    # it, so an interrupted run never leaves a truncated extract.json behind.
+    output = AtomicArtifactWriter(
+        [descriptive_path, canonical_path],
+        compress=args.compress,
+        binary=args.msgpack,
+    )
 
-    # Also update canonical extract.json so translate/load don't need to change
-    # (just copy the same content)
-    with open(canonical_path, "w") as f:
-        json.dump(payload, f, indent=2)
+    delta = None
+    if args.incremental:
+        delta = ExtractManifest(
+            os.path.join(migration_dir, "extract.manifest.json"),
+            args.name_pattern,
+        )
+
+    if args.jobs > 1 and len(selected_keys) > 1:
+        with METRICS.phase("extract"):
+            extract_parallel(selected_keys, args, name_regex, output, migration_dir)
+    elif args.stream or args.msgpack:
+        # Records go to disk as they are serialized; nothing is accumulated.
+        with METRICS.phase("extract"), output as f:
+            if args.msgpack:
+                writer = MsgpackWriter(f, blobs=args.dedup_blobs)
+            else:
+                writer = JsonlWriter(f, blobs=args.dedup_blobs)
+            if args.dedup_blobs:
+                writer = BlobDedupWriter(writer)
+            for key in selected_keys:
+                model_cls, payload_key = OBJECT_TYPES[key]
+                log(
+                    f"Streaming {payload_key} from model {model_cls.__name__} "
+                    f"(chunk size {args.chunk_size})..."
+                )
+                with METRICS.model(model_cls.__name__):
+                    qs, fields = prepare_queryset(model_cls, args)
+                    if delta is not None:
+                        count = 0
+                        for row in delta.iter_changed(
+                            model_cls, payload_key, qs, fields, name_regex,
+                            chunk_size=args.chunk_size,
+                        ):
+                            writer.write(payload_key, row)
+                            count += 1
+                    else:
+                        count = stream_queryset(
+                            qs,
+                            fields,
+                            writer,
+                            payload_key,
+                            name_regex=name_regex,
+                            chunk_size=args.chunk_size,
+                            use_copy=args.use_copy,
+                        )
+                METRICS.add_rows(model_cls.__name__, count)
+                log(f"  -> {count} objects exported.")
+
+            if delta is not None:
+                for tombstone in delta.tombstones:
+                    writer.write(DELETED_KEY, tombstone)
+            if args.dedup_blobs:
+                log(f"Deduplicated: {writer.encoder.summary()}")
+    else:
+        payload = {}
+
+        for key in selected_keys:
+            model_cls, payload_key = OBJECT_TYPES[key]
+            log(f"Exporting {payload_key} from model {model_cls.__name__}...")
+            with METRICS.phase("extract"), METRICS.model(model_cls.__name__):
+                qs, fields = prepare_queryset(model_cls, args)
+                if delta is not None:
+                    exported = list(
+                        delta.iter_changed(
+                            model_cls, payload_key, qs, fields, name_regex
+                        )
+                    )
+                else:
+                    exported = export_queryset(
+                        qs, fields, name_regex=name_regex, use_copy=args.use_copy
+                    )
+            METRICS.add_rows(model_cls.__name__, len(exported))
+            payload[payload_key] = exported
+            log(f"  -> {len(exported)} objects exported.")
+
+        if delta is not None:
+            payload[DELETED_KEY] = delta.tombstones
+
+        if args.dedup_blobs:
+            encoder = BlobEncoder()
+            payload = encoder.encode_payload(payload)
+            log(f"Deduplicated: {encoder.summary()}")
+
+        with METRICS.phase("write"), output as f:
+            json.dump(payload, f, **json_dump_kwargs(args))
 
     log(f"Wrote extract data to {descriptive_path}")
     log(f"Canonical extract updated at {canonical_path}")
 
+    # Only advance the manifest once the delta it describes is on disk
+    if delta is not None:
+        delta.save()
+
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,19 @@
 #!/usr/bin/env python
 import argparse
+import hashlib
 import json
 import os
 import sys
+from datetime import datetime
+from datetime import timezone as dt_timezone
 
 import django
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import CASCADE, DO_NOTHING
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
 
 # -------------------------------------------------------------------
 # Django setup
@@ -25,11 +32,29 @@ django.setup()
 
 from swirl.models import AIProvider, Authenticator, SearchProvider  # type: ignore
 
+from migration_io import DELETED_KEY, AtomicArtifactWriter, load_payload
+from migration_metrics import Metrics, add_metrics_arguments
+
+# payload key -> model
+LOAD_MODELS = {
+    "authenticators": Authenticator,
+    "search_providers": SearchProvider,
+    "ai_providers": AIProvider,
+}
+
+# Progress journal for --chunk-size / --resume
+JOURNAL_VERSION = 1
+DEFAULT_JOURNAL_PATH = "./migration/load.journal.json"
+
 
 def log(msg: str) -> None:
     print(f"[load.py] {msg}", file=sys.stderr)
 
 
+# Configured from --metrics-out/--profile/--quiet in main()
+METRICS = Metrics("load", log)
+
+
 # -------------------------------------------------------------------
 # Helpers
 # -------------------------------------------------------------------
@@ -65,6 +90,641 @@ def model_has_field(model_cls, field_name: str) -> bool:
         return False
 
 
+def tombstone_names(tombstones):
+    """Group tombstones into {payload key: set of names}."""
+    names_by_type = {}
+    for tombstone in tombstones:
+        name = tombstone.get("name")
+        if name is not None:
+            names_by_type.setdefault(tombstone.get("type"), set()).add(name)
+    return names_by_type
+
+
+def apply_tombstones(tombstones) -> None:
+    """
+    Delete the rows named in an incremental extract's tombstones.
+    Matching is by name, since primary keys differ between databases.
+    """
+    for payload_key, names in tombstone_names(tombstones).items():
+        model_cls = LOAD_MODELS.get(payload_key)
+        if model_cls is None:
+            log(f"Ignoring tombstones for unknown object type {payload_key!r}.")
+            continue
+        deleted, _ = model_cls.objects.filter(name__in=names).delete()
+        log(
+            f"Applied {len(names)} {model_cls.__name__} tombstones "
+            f"({deleted} rows deleted, including cascades)."
+        )
+
+
+def prepare_records(model_cls, records, owner=None):
+    """
+    Split records into (name, defaults) pairs, as update_or_create() takes
+    them. Records without a name are skipped; owner is assigned when given.
+    """
+    prepared = []
+    for rec in records:
+        data_copy = dict(rec)
+        name = data_copy.pop("name", None)
+        if not name:
+            METRICS.detail(
+                "missing_name", f"Skipping {model_cls.__name__} with missing name."
+            )
+            continue
+        if owner is not None:
+            # Always assign owner to admin at load time
+            data_copy["owner"] = owner
+        prepared.append((name, data_copy))
+    return prepared
+
+
+def upsert_rows(model_cls, prepared):
+    """Create or update one row at a time. Returns (created, updated)."""
+    created_count = 0
+    updated_count = 0
+    for name, defaults in prepared:
+        obj, created = model_cls.objects.update_or_create(
+            name=name,
+            defaults=defaults,
+        )
+        if created:
+            created_count += 1
+        else:
+            updated_count += 1
+    return created_count, updated_count
+
+
+def bulk_upsert(model_cls, prepared, batch_size):
+    """
+    Same result and counts as upsert_rows(), in a handful of queries:
+    existing rows are fetched by name in one query, then new rows go through
+    bulk_create() and changed rows through bulk_update(), batch_size at a time.
+
+    A name that appears more than once counts as created once and updated
+    afterwards, and later values win, exactly as with repeated
+    update_or_create() calls. save() is not called, so auto_now fields are
+    set here and post_save signals are not sent.
+    """
+    names = {name for name, _ in prepared}
+    existing = {}
+    for obj in model_cls.objects.filter(name__in=names):
+        if obj.name in existing:
+            raise model_cls.MultipleObjectsReturned(
+                f"More than one {model_cls.__name__} is named {obj.name!r}."
+            )
+        existing[obj.name] = obj
+
+    # name -> merged defaults, in first-seen order
+    to_create = {}
+    to_update = {}
+    created_count = 0
+    updated_count = 0
+    for name, defaults in prepared:
+        if name in existing:
+            to_update.setdefault(name, {}).update(defaults)
+            updated_count += 1
+        elif name in to_create:
+            to_create[name].update(defaults)
+            updated_count += 1
+        else:
+            to_create[name] = dict(defaults)
+            created_count += 1
+
+    model_cls.objects.bulk_create(
+        [model_cls(name=name, **defaults) for name, defaults in to_create.items()],
+        batch_size=batch_size,
+    )
+
+    if to_update:
+        auto_now_fields = [
+            f.name
+            for f in model_cls._meta.concrete_fields
+            if getattr(f, "auto_now", False)
+        ]
+        now = timezone.now()
+        update_fields = set(auto_now_fields)
+        objs = []
+        for name, defaults in to_update.items():
+            obj = existing[name]
+            for field_name, value in defaults.items():
+                setattr(obj, field_name, value)
+            for field_name in auto_now_fields:
+                setattr(obj, field_name, now)
+            update_fields.update(defaults)
+            objs.append(obj)
+        model_cls.objects.bulk_update(
+            objs, sorted(update_fields), batch_size=batch_size
+        )
+
+    return created_count, updated_count
+
+
+def load_target(payload_key, records, admin_user):
+    """
+    Return (payload_key, model_cls, records, owner, log note) for one model.
+    SearchProviders and AIProviders are always owned by the admin user after
+    load; Authenticators keep whatever the record says.
+    """
+    model_cls = LOAD_MODELS[payload_key]
+    if model_cls is Authenticator or not model_has_field(model_cls, "owner"):
+        return payload_key, model_cls, records, None, ""
+    return (
+        payload_key,
+        model_cls,
+        records,
+        admin_user,
+        " (owner set to admin where applicable)",
+    )
+
+
+def compared_fields(model_cls, prepared):
+    """
+    Fields to compare for change detection: every field set by the records,
+    except auto_now fields, which save() overwrites anyway.
+    """
+    fields = {}
+    for _, defaults in prepared:
+        for key in defaults:
+            if key not in fields:
+                fields[key] = model_cls._meta.get_field(key)
+    return [
+        (key, field)
+        for key, field in fields.items()
+        if not getattr(field, "auto_now", False)
+    ]
+
+
+def comparable_value(field, value):
+    """Normalize a value from load.json or the DB so equal values hash equal."""
+    if field.is_relation:
+        value = getattr(value, "pk", value)
+    else:
+        try:
+            value = field.to_python(value)
+        except ValidationError:
+            pass
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        value = value.astimezone(dt_timezone.utc)
+    return value
+
+
+def content_hash(fields, values: dict, by_attname: bool = False) -> str:
+    """
+    Stable hash of the compared fields of one record (keyed by field name)
+    or one DB row (keyed by attname, as values() returns it).
+    """
+    normalized = {}
+    for key, field in fields:
+        source_key = field.attname if by_attname else key
+        if source_key in values:
+            normalized[field.attname] = comparable_value(field, values[source_key])
+    encoded = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def current_rows(model_cls, prepared, fields):
+    """The existing rows for the prepared names, in one query: {name: row}."""
+    names = {name for name, _ in prepared}
+    attnames = [field.attname for _, field in fields]
+    rows = model_cls.objects.filter(name__in=names).values("name", *attnames)
+    return {row["name"]: row for row in rows}
+
+
+def classify_records(model_cls, prepared, current=None):
+    """
+    Compare prepared records with the current rows.
+    Returns (records to write, created, updated, unchanged); a record counts
+    as unchanged when every field it sets already has that value. Repeated
+    names are always written, as update_or_create() would.
+    """
+    fields = compared_fields(model_cls, prepared)
+    if current is None:
+        current = current_rows(model_cls, prepared, fields)
+
+    changed = []
+    created = 0
+    updated = 0
+    unchanged = 0
+    seen = set()
+    for name, defaults in prepared:
+        if name in seen:
+            changed.append((name, defaults))
+            updated += 1
+            continue
+        seen.add(name)
+
+        row = current.get(name)
+        if row is None:
+            changed.append((name, defaults))
+            created += 1
+            continue
+
+        row_hash = content_hash(fields, row, by_attname=True)
+        if content_hash(fields, defaults) == row_hash:
+            unchanged += 1
+        else:
+            changed.append((name, defaults))
+            updated += 1
+    return changed, created, updated, unchanged
+
+
+def upsert_records(args, model_cls, records, owner):
+    """Upsert records; returns (created, updated, unchanged)."""
+    model_name = model_cls.__name__
+    with METRICS.model(model_name):
+        prepared = prepare_records(model_cls, records, owner)
+
+        unchanged = 0
+        if args.skip_unchanged:
+            prepared, _, _, unchanged = classify_records(model_cls, prepared)
+
+        if args.bulk:
+            created, updated = bulk_upsert(model_cls, prepared, args.batch_size)
+        else:
+            created, updated = upsert_rows(model_cls, prepared)
+
+    METRICS.add_rows(model_name, len(records))
+    METRICS.add_rows(model_name, created, "created")
+    METRICS.add_rows(model_name, updated, "updated")
+    METRICS.add_rows(model_name, unchanged, "unchanged")
+    return created, updated, unchanged
+
+
+def processed_message(args, model_cls, created, updated, unchanged, note) -> str:
+    counts = f"created={created}, updated={updated}"
+    if args.skip_unchanged:
+        counts += f", unchanged={unchanged}"
+    return f"Processed {model_cls.__name__}s: {counts}{note}."
+
+
+def fast_delete_blockers(model_cls):
+    """
+    Reasons why rows of model_cls cannot be removed with a plain DELETE:
+    relations whose on_delete Django handles in Python, delete signal
+    listeners, and multi-table inheritance parents. Empty if none.
+    """
+    blockers = []
+    for rel in model_cls._meta.related_objects:
+        # Reverse many-to-many relations have no on_delete; their join rows
+        # are removed by the ORM
+        if rel.many_to_many:
+            blockers.append(
+                f"many-to-many {rel.related_model.__name__}.{rel.field.name}"
+            )
+        elif rel.on_delete is not DO_NOTHING:
+            blockers.append(
+                f"{rel.related_model.__name__}.{rel.field.name} "
+                f"on_delete={rel.on_delete.__name__}"
+            )
+    for field in model_cls._meta.local_many_to_many:
+        blockers.append(f"many-to-many field {field.name}")
+    for signal, signal_name in (
+        (pre_delete, "pre_delete"),
+        (post_delete, "post_delete"),
+    ):
+        if signal.has_listeners(model_cls):
+            blockers.append(f"{signal_name} listeners")
+    if model_cls._meta.parents:
+        blockers.append("multi-table inheritance")
+    return blockers
+
+
+def truncate_cascade_models(model_cls):
+    """
+    Models whose tables a PostgreSQL TRUNCATE ... CASCADE of model_cls would
+    also empty, when that removes exactly what deleting every model_cls row
+    through the ORM removes; None otherwise.
+
+    That holds when each reverse relation is a non-null CASCADE foreign key
+    from a model that qualifies in turn (all of its rows go with ours), and
+    each many-to-many uses an auto-created join table (every join row points
+    at one of our rows). Delete signal listeners and inheritance parents
+    anywhere in the chain disqualify the model.
+    """
+    cascaded = []
+    pending = [model_cls]
+    seen = {model_cls}
+    while pending:
+        model = pending.pop()
+        if model._meta.parents:
+            return None
+        if pre_delete.has_listeners(model) or post_delete.has_listeners(model):
+            return None
+        related = []
+        for rel in model._meta.related_objects:
+            if rel.many_to_many:
+                related.append(rel.through)
+            elif rel.on_delete is CASCADE and not rel.field.null:
+                related.append(rel.related_model)
+            else:
+                return None
+        for field in model._meta.local_many_to_many:
+            related.append(field.remote_field.through)
+        for other in related:
+            if other not in seen:
+                seen.add(other)
+                cascaded.append(other)
+                pending.append(other)
+    return cascaded
+
+
+def delete_all(model_cls, load_count: int, fast: bool = False) -> bool:
+    """
+    Delete every row of model_cls. With fast=True and nothing that needs
+    Python-side handling (see fast_delete_blockers()), a single DELETE is
+    issued and its row count reported, instead of the ORM collecting every
+    instance first. On PostgreSQL, a model whose only blockers are cascades
+    that TRUNCATE ... CASCADE reproduces (see truncate_cascade_models()) is
+    truncated instead.
+
+    Returns True if a fast path was used.
+    """
+    model_name = model_cls.__name__
+    if fast:
+        connection = connections[model_cls.objects.db]
+        quote = connection.ops.quote_name
+        blockers = fast_delete_blockers(model_cls)
+        if not blockers:
+            table = quote(model_cls._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {table}")
+                deleted = cursor.rowcount
+            log(
+                f"Deleted {deleted} existing {model_name}s with a single DELETE "
+                f"(load file has {load_count})."
+            )
+            return True
+
+        cascaded = None
+        if connection.vendor == "postgresql":
+            cascaded = truncate_cascade_models(model_cls)
+        if cascaded is not None:
+            # PostgreSQL reports no row count for TRUNCATE
+            tables = [model_cls._meta.db_table]
+            tables += [model._meta.db_table for model in cascaded]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"TRUNCATE {', '.join(quote(t) for t in tables)} CASCADE"
+                )
+            also = ""
+            if cascaded:
+                also = f" and {', '.join(tables[1:])}"
+            log(
+                f"Truncated existing {model_name}s{also} "
+                f"(load file has {load_count})."
+            )
+            return True
+
+        log(
+            f"Cannot fast-delete {model_name}s ({'; '.join(blockers)}); "
+            "using the regular delete."
+        )
+
+    count = model_cls.objects.count()
+    log(
+        f"Deleting {count} existing {model_name}s "
+        f"(load file has {load_count})."
+    )
+    model_cls.objects.all().delete()
+    return False
+
+
+def delete_decisions(args, src_auths, src_sps, src_ais):
+    """Return (delete_auth, delete_sp, delete_ai) for -d and its per-model flags."""
+    delete_existing = args.delete_existing
+
+    # Decide which models are eligible for deletion
+    any_specific_flags = args.delete_auth or args.delete_sp or args.delete_ai
+
+    # Only delete a model if:
+    #   - global delete is enabled (-d/--delete), AND
+    #   - either its specific flag is set, OR no specific flags were set at all, AND
+    #   - there is at least one object of that type in the load file
+    delete_auth = (
+        delete_existing
+        and (args.delete_auth or not any_specific_flags)
+        and len(src_auths) > 0
+    )
+    delete_sp = (
+        delete_existing
+        and (args.delete_sp or not any_specific_flags)
+        and len(src_sps) > 0
+    )
+    delete_ai = (
+        delete_existing
+        and (args.delete_ai or not any_specific_flags)
+        and len(src_ais) > 0
+    )
+    return delete_auth, delete_sp, delete_ai
+
+
+def delete_step(args, src_auths, src_sps, src_ais, tombstones) -> None:
+    """Optional per-model deletes and tombstones; runs before any upsert."""
+    delete_existing = args.delete_existing
+    delete_auth, delete_sp, delete_ai = delete_decisions(
+        args, src_auths, src_sps, src_ais
+    )
+
+    # --------------------------------------------------------------
+    # Optional delete step (per-model)
+    # --------------------------------------------------------------
+    if delete_existing:
+        log("Delete flag is set; applying per-model delete rules.")
+        deleted_models = []
+        fast_models = []
+        for model_cls, wanted, load_count, label in (
+            (Authenticator, delete_auth, len(src_auths), "auths"),
+            (SearchProvider, delete_sp, len(src_sps), "SPs"),
+            (AIProvider, delete_ai, len(src_ais), "AIs"),
+        ):
+            if not wanted:
+                log(
+                    f"Not deleting {model_cls.__name__}s "
+                    f"(either no delete flag for {label}, or load file has none)."
+                )
+                continue
+            deleted_models.append(model_cls.__name__)
+            if delete_all(model_cls, load_count, fast=args.fast_delete):
+                fast_models.append(model_cls.__name__)
+
+        if args.fast_delete and deleted_models and not fast_models:
+            log(
+                "--fast-delete did not apply to any model; "
+                f"{', '.join(deleted_models)} all used the regular delete."
+            )
+    else:
+        log("Delete flag not set; existing objects will be updated or created.")
+
+    # --------------------------------------------------------------
+    # Tombstones from an incremental extract. Applied before the upsert,
+    # so a row deleted and re-created under the same name at the source
+    # ends up present.
+    # --------------------------------------------------------------
+    if tombstones:
+        if args.apply_deletions:
+            apply_tombstones(tombstones)
+        else:
+            log(
+                f"Load file lists {len(tombstones)} objects deleted at the "
+                "source; use --apply-deletions to delete them here."
+            )
+
+
+def file_fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LoadJournal:
+    """
+    Progress of a --chunk-size load: whether the delete step has been
+    committed and how many records of each payload key have been committed.
+    Tied to the load file by its content hash, so --resume cannot continue a
+    load of a different file.
+    """
+
+    def __init__(self, path: str, load_path: str, resume: bool):
+        self.path = path
+        fingerprint = file_fingerprint(load_path)
+        self.data = {
+            "version": JOURNAL_VERSION,
+            "input": load_path,
+            "fingerprint": fingerprint,
+            "deletes_done": False,
+            "committed": {},
+            "completed": False,
+        }
+
+        if not resume:
+            if os.path.exists(path):
+                log(
+                    f"Starting a new journal at {path}; use --resume to "
+                    "continue the previous load."
+                )
+            self.save()
+            return
+
+        if not os.path.exists(path):
+            raise SystemExit(f"Cannot resume: no journal at {path}")
+
+        with open(path, "r") as f:
+            existing = json.load(f)
+
+        if existing.get("version") != JOURNAL_VERSION:
+            raise SystemExit(f"Cannot resume: journal {path} has an unknown version")
+        if existing.get("fingerprint") != fingerprint:
+            raise SystemExit(
+                f"Cannot resume: journal {path} was recorded for a different "
+                f"load file ({existing.get('input')}). Run without --resume to "
+                "start over."
+            )
+        self.data = existing
+        log(
+            f"Resuming from journal {path}: delete step "
+            f"{'done' if self.data['deletes_done'] else 'pending'}, committed "
+            + ", ".join(f"{k}={v}" for k, v in self.data["committed"].items())
+        )
+
+    def committed(self, payload_key: str) -> int:
+        return self.data["committed"].get(payload_key, 0)
+
+    def mark_deletes_done(self) -> None:
+        self.data["deletes_done"] = True
+        self.save()
+
+    def mark_committed(self, payload_key: str, count: int) -> None:
+        self.data["committed"][payload_key] = count
+        self.save()
+
+    def mark_completed(self) -> None:
+        self.data["completed"] = True
+        self.save()
+
+    def save(self) -> None:
+        with AtomicArtifactWriter([self.path]) as f:
+            json.dump(self.data, f, indent=2)
+
+
+def load_in_chunks(args, targets, run_delete_step) -> None:
+    """
+    Commit the delete step, then every --chunk-size records, in separate
+    transactions, recording progress in the journal after each commit.
+
+    A chunk committed just before a crash, but not yet journaled, is loaded
+    again on --resume. Upserts are keyed by name, so that only turns some
+    "created" counts into "updated".
+    """
+    journal = LoadJournal(args.journal_path, args.load_path, args.resume)
+    if journal.data["completed"]:
+        log(
+            f"Journal {args.journal_path} records this load as completed; "
+            "nothing to do."
+        )
+        return
+
+    if journal.data["deletes_done"]:
+        log("Delete step was committed by a previous run; skipping it.")
+    else:
+        with METRICS.phase("delete"), transaction.atomic():
+            run_delete_step()
+        journal.mark_deletes_done()
+
+    for payload_key, model_cls, records, owner, note in targets:
+        start = journal.committed(payload_key)
+        if start:
+            log(f"Skipping {start} {model_cls.__name__}s committed by a previous run.")
+
+        totals = [0, 0, 0]
+        for offset in range(start, len(records), args.chunk_size):
+            chunk = records[offset:offset + args.chunk_size]
+            with METRICS.phase("upsert"), transaction.atomic():
+                counts = upsert_records(args, model_cls, chunk, owner)
+            journal.mark_committed(payload_key, offset + len(chunk))
+            totals = [total + count for total, count in zip(totals, counts)]
+
+        log(processed_message(args, model_cls, *totals, note))
+
+    journal.mark_completed()
+    log(f"All chunks committed; journal at {args.journal_path}")
+
+
+def dry_run(args, targets, src_auths, src_sps, src_ais, tombstones) -> None:
+    """
+    Report what a load with these options would do, per model, without
+    writing anything: one count/select query per model.
+    """
+    delete_flags = dict(
+        zip(LOAD_MODELS, delete_decisions(args, src_auths, src_sps, src_ais))
+    )
+    tombstoned = tombstone_names(tombstones) if args.apply_deletions else {}
+
+    log("Dry run: the database will not be modified.")
+    for payload_key, model_cls, records, owner, note in targets:
+        prepared = prepare_records(model_cls, records, owner)
+
+        if delete_flags[payload_key]:
+            deleted = model_cls.objects.count()
+            current = {}
+        else:
+            fields = compared_fields(model_cls, prepared)
+            current = current_rows(model_cls, prepared, fields)
+            names = tombstoned.get(payload_key, set())
+            deleted = 0
+            if names:
+                deleted = model_cls.objects.filter(name__in=names).count()
+            for name in names:
+                current.pop(name, None)
+
+        _, created, updated, unchanged = classify_records(model_cls, prepared, current)
+        log(
+            f"{model_cls.__name__}s: created={created}, updated={updated}, "
+            f"unchanged={unchanged}, deleted={deleted}"
+        )
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description=(
@@ -98,6 +758,73 @@ def parse_args():
             "for deletion, but only if that type appears in the load file."
         ),
     )
+    parser.add_argument(
+        "--fast-delete",
+        dest="fast_delete",
+        action="store_true",
+        help="With -d/--delete: remove rows with one set-based DELETE per "
+             "model when no cascades or delete signals are involved, or a "
+             "TRUNCATE ... CASCADE on PostgreSQL when every cascade is one it "
+             "reproduces (checked per model; falls back to the regular delete "
+             "otherwise).",
+    )
+    parser.add_argument(
+        "--apply-deletions",
+        dest="apply_deletions",
+        action="store_true",
+        help="Delete objects listed as deleted in an incremental extract "
+             "(matched by name). Without this flag they are only reported.",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        dest="skip_unchanged",
+        action="store_true",
+        help="Compare each record with the current row (one query per model, "
+             "or per chunk) and only write records that differ.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        help="Print per-model created/updated/unchanged/deleted counts for "
+             "this load without modifying the database.",
+    )
+    parser.add_argument(
+        "--bulk",
+        dest="bulk",
+        action="store_true",
+        help="Upsert with bulk_create/bulk_update in batches instead of one "
+             "update_or_create() per record (same created/updated counts).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=500,
+        help="Rows per INSERT/UPDATE statement with --bulk (default: 500).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=None,
+        help="Commit every N records in its own transaction (after the "
+             "delete step, which commits separately) and record progress in "
+             "the journal. Default: one transaction for the whole load.",
+    )
+    parser.add_argument(
+        "--journal",
+        dest="journal_path",
+        default=DEFAULT_JOURNAL_PATH,
+        help=f"Progress journal for --chunk-size (default: {DEFAULT_JOURNAL_PATH})",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="With --chunk-size: continue after the last committed chunk "
+             "recorded in the journal. The load file must be unchanged.",
+    )
     parser.add_argument(
         "--delete-auth",
         dest="delete_auth",
@@ -122,7 +849,11 @@ def parse_args():
              "before load (only if at least one AI provider is present "
              "in the load file).",
     )
-    return parser.parse_args()
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if args.resume and not args.chunk_size:
+        parser.error("--resume requires --chunk-size")
+    return args
 
 
 # -------------------------------------------------------------------
@@ -131,18 +862,25 @@ def parse_args():
 
 def main():
     args = parse_args()
+    METRICS.configure(args)
+    with METRICS.run():
+        run(args)
+
+
+def run(args):
     load_path = args.load_path
-    delete_existing = args.delete_existing
 
     if not os.path.exists(load_path):
         raise SystemExit(f"Load file not found: {load_path}")
 
-    with open(load_path, "r") as f:
-        data = json.load(f)
+    # Accepts both the JSON layout and the streamed JSONL layout
+    with METRICS.phase("read"):
+        data = load_payload(load_path)
 
     src_auths = data.get("authenticators", [])
     src_sps = data.get("search_providers", [])
     src_ais = data.get("ai_providers", [])
+    tombstones = data.get(DELETED_KEY, [])
 
     log(
         f"Preparing to load "
@@ -154,165 +892,36 @@ def main():
 
     admin_user = get_admin_user()
 
-    # Decide which models are eligible for deletion
-    any_specific_flags = args.delete_auth or args.delete_sp or args.delete_ai
-
-    # Only delete a model if:
-    #   - global delete is enabled (-d/--delete), AND
-    #   - either its specific flag is set, OR no specific flags were set at all, AND
-    #   - there is at least one object of that type in the load file
-    delete_auth = (
-        delete_existing
-        and (args.delete_auth or not any_specific_flags)
-        and len(src_auths) > 0
-    )
-    delete_sp = (
-        delete_existing
-        and (args.delete_sp or not any_specific_flags)
-        and len(src_sps) > 0
-    )
-    delete_ai = (
-        delete_existing
-        and (args.delete_ai or not any_specific_flags)
-        and len(src_ais) > 0
+    targets = (
+        load_target("authenticators", src_auths, admin_user),
+        load_target("search_providers", src_sps, admin_user),
+        load_target("ai_providers", src_ais, admin_user),
     )
 
-    with transaction.atomic():
-        # --------------------------------------------------------------
-        # Optional delete step (per-model)
-        # --------------------------------------------------------------
-        if delete_existing:
-            log("Delete flag is set; applying per-model delete rules.")
-            if delete_auth:
-                auth_count = Authenticator.objects.count()
-                log(
-                    f"Deleting {auth_count} existing Authenticators "
-                    f"(load file has {len(src_auths)})."
-                )
-                Authenticator.objects.all().delete()
-            else:
-                log(
-                    "Not deleting Authenticators "
-                    f"(either no delete flag for auths, or load file has none)."
-                )
+    if args.dry_run:
+        with METRICS.phase("dry_run"):
+            dry_run(args, targets, src_auths, src_sps, src_ais, tombstones)
+        return
 
-            if delete_sp:
-                sp_count = SearchProvider.objects.count()
-                log(
-                    f"Deleting {sp_count} existing SearchProviders "
-                    f"(load file has {len(src_sps)})."
-                )
-                SearchProvider.objects.all().delete()
-            else:
-                log(
-                    "Not deleting SearchProviders "
-                    f"(either no delete flag for SPs, or load file has none)."
-                )
-
-            if delete_ai:
-                ai_count = AIProvider.objects.count()
-                log(
-                    f"Deleting {ai_count} existing AIProviders "
-                    f"(load file has {len(src_ais)})."
-                )
-                AIProvider.objects.all().delete()
-            else:
-                log(
-                    "Not deleting AIProviders "
-                    f"(either no delete flag for AIs, or load file has none)."
-                )
-        else:
-            log("Delete flag not set; existing objects will be updated or created.")
-
-        # --------------------------------------------------------------
-        # Upsert from load.json
-        # --------------------------------------------------------------
-
-        # Authenticators
-        created_auths = 0
-        updated_auths = 0
-
-        for a_data in src_auths:
-            data_copy = dict(a_data)
-            name = data_copy.pop("name", None)
-            if not name:
-                log("Skipping Authenticator with missing name.")
-                continue
-
-            obj, created = Authenticator.objects.update_or_create(
-                name=name,
-                defaults=data_copy,
-            )
-            if created:
-                created_auths += 1
-            else:
-                updated_auths += 1
-
-        log(
-            f"Processed Authenticators: created={created_auths}, "
-            f"updated={updated_auths}."
-        )
-
-        # SearchProviders
-        created_sps = 0
-        updated_sps = 0
-        sp_has_owner = model_has_field(SearchProvider, "owner")
-
-        for sp_data in src_sps:
-            data_copy = dict(sp_data)
-            name = data_copy.pop("name", None)
-            if not name:
-                log("Skipping SearchProvider with missing name.")
-                continue
-
-            if sp_has_owner:
-                # Always assign owner to admin at load time
-                data_copy["owner"] = admin_user
-
-            obj, created = SearchProvider.objects.update_or_create(
-                name=name,
-                defaults=data_copy,
-            )
-            if created:
-                created_sps += 1
-            else:
-                updated_sps += 1
-
-        log(
-            f"Processed SearchProviders: created={created_sps}, "
-            f"updated={updated_sps} "
-            f"(owner set to admin where applicable)."
-        )
-
-        # AIProviders
-        created_ais = 0
-        updated_ais = 0
-        ai_has_owner = model_has_field(AIProvider, "owner")
-
-        for ap_data in src_ais:
-            data_copy = dict(ap_data)
-            name = data_copy.pop("name", None)
-            if not name:
-                log("Skipping AIProvider with missing name.")
-                continue
-
-            if ai_has_owner:
-                data_copy["owner"] = admin_user
-
-            obj, created = AIProvider.objects.update_or_create(
-                name=name,
-                defaults=data_copy,
-            )
-            if created:
-                created_ais += 1
-            else:
-                updated_ais += 1
-
-        log(
-            f"Processed AIProviders: created={created_ais}, "
-            f"updated={updated_ais} "
-            f"(owner set to admin where applicable)."
+    if args.chunk_size:
+        load_in_chunks(
+            args,
+            targets,
+            lambda: delete_step(args, src_auths, src_sps, src_ais, tombstones),
         )
+    else:
+        # All or nothing: deletes and every upsert in one transaction
+        with transaction.atomic():
+            with METRICS.phase("delete"):
+                delete_step(args, src_auths, src_sps, src_ais, tombstones)
+
+            # ----------------------------------------------------------
+            # Upsert from load.json
+            # ----------------------------------------------------------
+            for payload_key, model_cls, records, owner, note in targets:
+                with METRICS.phase("upsert"):
+                    counts = upsert_records(args, model_cls, records, owner)
+                log(processed_message(args, model_cls, *counts, note))
 
     log("Load process completed successfully.")
 
@@ -0,0 +1,843 @@
+#!/usr/bin/env python
+################################################################################
+# migration_io.py
+# Shared readers/writers for the migration artifacts (extract.json, load.json).
+#
+# This module must NOT import Django: it is used by every phase and by helper
+# tooling that runs outside the Swirl image.
+#
+# Three on-disk layouts are supported:
+#   - JSON:    {"authenticators": [...], "search_providers": [...], ...}
+#   - JSONL:   a header line followed by one {"type": ..., "data": {...}} line
+#              per record, written as records are produced (streaming extract).
+#   - msgpack: MSGPACK_MAGIC, then length-prefixed msgpack frames: a file
+#              header, and per section a header map (type, schema version,
+#              field list) followed by one value array per record. Needs the
+#              optional `msgpack` package.
+# Readers detect the layout from the file contents, not the file name.
+#
+# In every layout, large JSON field values that repeat across records (e.g.
+# the query_mappings of cloned SearchProviders) may be deduplicated by
+# content hash: the first occurrence is {"$blob": <sha256>, "value": ...},
+# later ones just {"$blob": <sha256>}. Such files say so up front (a
+# "blobs" flag in the JSONL/msgpack header, a leading "$blobs": true entry
+# in the JSON layout), and only then do readers resolve references, so
+# values in other files are never mistaken for them. See BlobEncoder and
+# BlobResolver.
+#
+# Any layout may additionally be gzip or zstd compressed; readers detect
+# that from the leading magic bytes. zstd needs the optional `zstandard`
+# package.
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+# Payload sections, in the order the phases write them
+PAYLOAD_KEYS = ("authenticators", "search_providers", "ai_providers")
+
+# Section of an incremental extract listing rows deleted at the source since
+# the previous run: [{"type": <payload key>, "id": ..., "name": ...}, ...]
+DELETED_KEY = "deleted"
+
+JSONL_FORMAT = "swirl-migration-jsonl"
+JSONL_VERSION = 1
+
+# Exact prefix of the header line written by JsonlWriter; used for sniffing
+# without reading (potentially huge) first lines.
+JSONL_MAGIC = '{"format":"%s"' % JSONL_FORMAT
+
+MSGPACK_FORMAT = "swirl-migration-msgpack"
+MSGPACK_VERSION = 1
+
+# Version of the section layout (field list + positional value arrays)
+MSGPACK_SECTION_SCHEMA = 1
+
+# Leading bytes of a msgpack artifact; not valid UTF-8, so it can never be
+# mistaken for JSON
+MSGPACK_MAGIC = b"\x89SWMP\r\n"
+
+# Frame length prefix: 4-byte big-endian unsigned
+_FRAME_HEADER = struct.Struct(">I")
+
+# Output layouts, and the file extension each one uses
+FORMATS = ("json", "jsonl", "msgpack")
+FORMAT_EXTENSIONS = {"json": "json", "jsonl": "jsonl", "msgpack": "msgpack"}
+
+# Marker key of a deduplicated field value; reserved in records
+BLOB_KEY = "$blob"
+
+# Top-level entry of a JSON-layout payload holding deduplicated values (the
+# JSONL and msgpack headers carry a "blobs" flag instead). Readers of those
+# layouts yield (BLOBS_KEY, True) before the first record.
+BLOBS_KEY = "$blobs"
+
+# Field values (JSON objects/arrays) shorter than this when serialized are
+# always written inline; a reference costs about 80 bytes.
+BLOB_MIN_BYTES = 256
+
+# Length of a blob reference's hash (sha256, hex)
+BLOB_DIGEST_LEN = 64
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Linux ioctl for copy-on-write clones (btrfs, XFS with reflink, ...)
+FICLONE = 0x40049409
+
+
+def _require_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise SystemExit(
+            "zstd compression requires the 'zstandard' package "
+            "(pip install zstandard), or use gzip instead."
+        )
+    return zstandard
+
+
+def _require_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise SystemExit(
+            "The msgpack format requires the 'msgpack' package "
+            "(pip install msgpack); convert.py can turn the file into JSON "
+            "on a machine that has it."
+        )
+    return msgpack
+
+
+def open_artifact(path: str, binary: bool = False):
+    """
+    Open an artifact for reading as text (or bytes, with binary=True),
+    transparently decompressing gzip or zstd content.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        if binary:
+            return gzip.open(path, "rb")
+        return gzip.open(path, "rt", encoding="utf-8")
+    if magic == ZSTD_MAGIC:
+        zstandard = _require_zstandard()
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        if binary:
+            return io.BufferedReader(reader)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    if binary:
+        return open(path, "rb")
+    return open(path, "r", encoding="utf-8")
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _clone_file(src: str, dst: str) -> None:
+    """
+    Give dst the content of src without rewriting it where possible:
+    hardlink first, then a copy-on-write clone, then a plain copy.
+    """
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+
+    try:
+        import fcntl
+
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+
+    shutil.copyfile(src, dst)
+
+
+def publish_artifact(tmp_path: str, paths) -> None:
+    """
+    Atomically publish the finished file tmp_path under every name in paths.
+
+    The first name is an atomic rename of tmp_path; the others are cloned
+    from it and renamed into place, so readers never see a partial file.
+    """
+    first = paths[0]
+    os.replace(tmp_path, first)
+    for path in paths[1:]:
+        staging = f"{path}.{os.getpid()}.tmp"
+        if os.path.lexists(staging):
+            os.unlink(staging)
+        _clone_file(first, staging)
+        os.replace(staging, path)
+
+    for directory in {os.path.dirname(os.path.abspath(p)) for p in paths}:
+        _fsync_dir(directory)
+
+
+class AtomicArtifactWriter:
+    """
+    Context manager that serializes an artifact once, to a temp file next to
+    the destination, then fsyncs and publishes it under all of paths.
+
+        with AtomicArtifactWriter([descriptive, canonical], "gzip") as f:
+            json.dump(payload, f)
+
+    The file object is text, or bytes with binary=True (msgpack).
+    On error the temp file is removed and existing files are left untouched.
+    """
+
+    def __init__(self, paths, compress: str = "none", binary: bool = False):
+        if compress not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compress!r}")
+        self.paths = list(paths)
+        self.compress = compress
+        self.binary = binary
+        self._raw = None
+        self._text = None
+        self._stream = None
+        self._tmp_path = None
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.paths[0]))
+        fd, self._tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=".artifact.", suffix=".tmp"
+        )
+        self._raw = os.fdopen(fd, "wb")
+
+        if self.compress == "gzip":
+            stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compress == "zstd":
+            zstandard = _require_zstandard()
+            stream = zstandard.ZstdCompressor().stream_writer(
+                self._raw, closefd=False
+            )
+        else:
+            stream = self._raw
+
+        if self.binary:
+            self._stream = stream
+            return stream
+        self._text = io.TextIOWrapper(stream, encoding="utf-8")
+        return self._text
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            # Detach instead of close so the raw file stays open for fsync;
+            # closing the compressor writes its trailer but not the file.
+            if self._text is not None:
+                self._text.flush()
+                stream = self._text.detach()
+            else:
+                stream = self._stream
+            if stream is not self._raw:
+                stream.close()
+            self._raw.flush()
+            if exc_type is None:
+                os.fsync(self._raw.fileno())
+        finally:
+            self._raw.close()
+
+        if exc_type is not None:
+            os.unlink(self._tmp_path)
+            return False
+
+        # Relax mkstemp's 0600 to what a plain open() would have produced
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(self._tmp_path, 0o666 & ~umask)
+
+        publish_artifact(self._tmp_path, self.paths)
+        return False
+
+
+def _dumps_compact(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class JsonlWriter:
+    """
+    Write (payload_key, record) pairs as JSON Lines.
+
+    Each record is serialized and written immediately, so memory use does not
+    depend on the number of records. header=False writes bare record lines,
+    for shards that are later concatenated behind a single header.
+    blobs=True flags the file as holding deduplicated values.
+    """
+
+    def __init__(self, f, header: bool = True, blobs: bool = False):
+        self._f = f
+        if header:
+            header_line = {"format": JSONL_FORMAT, "version": JSONL_VERSION}
+            if blobs:
+                header_line["blobs"] = True
+            self._f.write(_dumps_compact(header_line))
+            self._f.write("\n")
+
+    def write(self, key: str, record: dict) -> None:
+        self._f.write(_dumps_compact({"type": key, "data": record}))
+        self._f.write("\n")
+
+    def close(self) -> None:
+        """Nothing to finish; records are complete lines."""
+
+
+class MsgpackWriter:
+    """
+    Write (payload_key, record) pairs in the msgpack layout to a binary file.
+
+    A section header (type, schema version, field list) is written whenever
+    the payload key or the record's keys change, so consecutive records with
+    the same fields are stored as bare value arrays. Like JsonlWriter, every
+    record is written immediately. blobs=True flags the file as holding
+    deduplicated values.
+    """
+
+    def __init__(self, f, blobs: bool = False):
+        self._msgpack = _require_msgpack()
+        self._f = f
+        self._key = None
+        self._fields = None
+        self._f.write(MSGPACK_MAGIC)
+        header = {"format": MSGPACK_FORMAT, "version": MSGPACK_VERSION}
+        if blobs:
+            header["blobs"] = True
+        self._frame(header)
+
+    def _frame(self, obj) -> None:
+        data = self._msgpack.packb(obj, use_bin_type=True)
+        self._f.write(_FRAME_HEADER.pack(len(data)))
+        self._f.write(data)
+
+    def write(self, key: str, record: dict) -> None:
+        fields = list(record)
+        if key != self._key or fields != self._fields:
+            self._frame({
+                "type": key,
+                "schema_version": MSGPACK_SECTION_SCHEMA,
+                "fields": fields,
+            })
+            self._key, self._fields = key, fields
+        self._frame([record[name] for name in fields])
+
+    def close(self) -> None:
+        """Nothing to finish; every frame is complete."""
+
+
+# -------------------------------------------------------------------
+# Deduplicated field values ("blobs")
+# -------------------------------------------------------------------
+
+
+class BlobDict(dict):
+    """A field value resolved from a blob; .blob is its content hash."""
+
+
+class BlobList(list):
+    """A field value resolved from a blob; .blob is its content hash."""
+
+
+def blob_of(value):
+    """Return the content hash of a value read from a blob, else None."""
+    if isinstance(value, (BlobDict, BlobList)):
+        return value.blob
+    return None
+
+
+def _is_blob_ref(value) -> bool:
+    return (
+        type(value) is dict
+        and BLOB_KEY in value
+        and isinstance(value[BLOB_KEY], str)
+        and len(value[BLOB_KEY]) == BLOB_DIGEST_LEN
+        and len(value) <= 2
+        and (len(value) == 1 or "value" in value)
+    )
+
+
+class BlobEncoder:
+    """
+    Replace large field values that repeat across records with references
+    to their first occurrence.
+
+    Only top-level field values that are JSON objects or arrays of at least
+    min_bytes are considered. The first occurrence of a value is written as
+    {"$blob": <sha256>, "value": <value>}, later ones as {"$blob": <sha256>},
+    so references always point backwards and streamed output can still be
+    read one record at a time. Values that were read from blobs keep their
+    hash and are not serialized again.
+    """
+
+    def __init__(self, min_bytes: int = BLOB_MIN_BYTES):
+        self.min_bytes = min_bytes
+        self.stored = 0
+        self.referenced = 0
+        self._written = set()
+
+    def _digest(self, value):
+        digest = blob_of(value)
+        if digest is not None:
+            return digest
+        if not isinstance(value, (dict, list)) or not value:
+            return None
+        canonical = json.dumps(
+            value, sort_keys=True, separators=(",", ":"), default=str
+        )
+        # A small value that looks like a reference is wrapped anyway, so
+        # readers cannot mistake it for one
+        if len(canonical) < self.min_bytes and not _is_blob_ref(value):
+            return None
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def encode(self, record: dict) -> dict:
+        """Return record with repeated values replaced (record is not modified)."""
+        encoded = None
+        for name, value in record.items():
+            digest = self._digest(value)
+            if digest is None:
+                continue
+            if encoded is None:
+                encoded = dict(record)
+            if digest in self._written:
+                encoded[name] = {BLOB_KEY: digest}
+                self.referenced += 1
+            else:
+                encoded[name] = {BLOB_KEY: digest, "value": value}
+                self._written.add(digest)
+                self.stored += 1
+        return record if encoded is None else encoded
+
+    def encode_payload(self, payload: dict) -> dict:
+        """
+        encode() every record of a JSON-layout payload, in file order; the
+        result starts with the BLOBS_KEY flag.
+        """
+        encoded = {BLOBS_KEY: True}
+        for key, records in payload.items():
+            if isinstance(records, list):
+                records = [self.encode(record) for record in records]
+            encoded[key] = records
+        return encoded
+
+    def summary(self) -> str:
+        return (
+            f"{self.stored} distinct large values stored once, "
+            f"{self.referenced} repeats written as references"
+        )
+
+
+class BlobResolver:
+    """
+    Resolve BlobEncoder references in records read in file order. Only used
+    for files flagged as holding deduplicated values (see BLOBS_KEY).
+
+    Each distinct value is kept once, as a BlobDict or BlobList carrying its
+    hash, and shared by every record that refers to it. Consumers must not
+    modify field values in place.
+    """
+
+    def __init__(self):
+        self._values = {}
+
+    def _resolve(self, ref):
+        digest = ref[BLOB_KEY]
+        if "value" in ref:
+            value = ref["value"]
+            if isinstance(value, dict):
+                value = BlobDict(value)
+            elif isinstance(value, list):
+                value = BlobList(value)
+            else:
+                return value
+            value.blob = digest
+            self._values[digest] = value
+            return value
+        try:
+            return self._values[digest]
+        except KeyError:
+            raise ValueError(
+                f"Blob {digest} is referenced before its value was stored"
+            )
+
+    def resolve(self, record):
+        """Return record with references replaced (modified in place)."""
+        if not isinstance(record, dict):
+            return record
+        for name, value in record.items():
+            if _is_blob_ref(value):
+                record[name] = self._resolve(value)
+        return record
+
+    def resolve_payload(self, payload: dict) -> dict:
+        """Resolve a JSON-layout payload in place, dropping its BLOBS_KEY flag."""
+        payload.pop(BLOBS_KEY, None)
+        for records in payload.values():
+            if isinstance(records, list):
+                for record in records:
+                    self.resolve(record)
+        return payload
+
+
+class BlobDedupWriter:
+    """Wrap a record writer so records pass through a BlobEncoder first."""
+
+    def __init__(self, writer, encoder=None):
+        self._writer = writer
+        self.encoder = encoder or BlobEncoder()
+
+    def write(self, key: str, record: dict) -> None:
+        self._writer.write(key, self.encoder.encode(record))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def open_writer(f, output_format: str, dedup_blobs: bool = False,
+                **json_options):
+    """
+    Return the record writer for output_format on file f (binary for
+    msgpack, text otherwise). Call close() at the end; JsonPayloadWriter
+    needs it to finish the document. With dedup_blobs=True, repeated large
+    values are written once (see BlobEncoder).
+    """
+    if output_format == "msgpack":
+        writer = MsgpackWriter(f, blobs=dedup_blobs)
+    elif output_format == "jsonl":
+        writer = JsonlWriter(f, blobs=dedup_blobs)
+    else:
+        writer = JsonPayloadWriter(f, blobs=dedup_blobs, **json_options)
+    return BlobDedupWriter(writer) if dedup_blobs else writer
+
+
+class JsonPayloadWriter:
+    """
+    Write (payload_key, record) pairs in the JSON layout, one record at a
+    time. Records of one payload key must arrive together.
+
+    The output is the same as json.dump(payload, indent=2) (or compact, with
+    compact=True) of the equivalent dict, so downstream readers cannot tell
+    the difference. close() ends the document; keys listed in
+    `always_include` that never received a record are written as [].
+    blobs=True starts the document with the BLOBS_KEY flag.
+    """
+
+    def __init__(self, f, compact: bool = False, always_include=(),
+                 blobs: bool = False):
+        self._f = f
+        self._compact = compact
+        self._always_include = list(always_include)
+        self._seen = []
+        self._entries = 0
+        self._in_section = False
+        self._first_record = True
+        self._f.write("{")
+        if blobs:
+            self._write_key(BLOBS_KEY)
+            self._f.write("true")
+
+    def _open_section(self, key: str) -> None:
+        if key in self._seen:
+            raise ValueError(
+                f"Records for {key!r} must be contiguous in the JSON layout"
+            )
+        if self._in_section:
+            self._close_section()
+        self._seen.append(key)
+        self._write_key(key)
+        self._f.write("[")
+        self._in_section = True
+        self._first_record = True
+
+    def _write_key(self, key: str) -> None:
+        if self._entries:
+            self._f.write(",")
+        self._entries += 1
+        if self._compact:
+            self._f.write(json.dumps(key) + ":")
+        else:
+            self._f.write("\n  " + json.dumps(key) + ": ")
+
+    def _close_section(self) -> None:
+        if not self._first_record and not self._compact:
+            self._f.write("\n  ")
+        self._f.write("]")
+        self._in_section = False
+
+    def write(self, key: str, record: dict) -> None:
+        if not self._seen or self._seen[-1] != key:
+            self._open_section(key)
+        if not self._first_record:
+            self._f.write(",")
+        self._first_record = False
+
+        if self._compact:
+            self._f.write(_dumps_compact(record))
+        else:
+            self._f.write("\n    ")
+            self._f.write(json.dumps(record, indent=2).replace("\n", "\n    "))
+
+    def close(self) -> None:
+        for key in self._always_include:
+            if key not in self._seen:
+                self._open_section(key)
+        if self._in_section:
+            self._close_section()
+        self._f.write("}" if self._compact or not self._entries else "\n}")
+
+
+class _JsonStreamReader:
+    """
+    Incremental reader for the JSON layout: yields one list element at a time
+    using json.JSONDecoder.raw_decode over a sliding buffer, so memory is
+    bounded by the largest single record rather than the file size.
+    """
+
+    def __init__(self, f, read_size: int = 1 << 16):
+        self._f = f
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        # Drop consumed text so the buffer only holds what is still needed
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._read_size):
+                raise ValueError("Unexpected end of JSON input")
+
+    def _expect(self, chars: str) -> str:
+        c = self._peek()
+        if c not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} in JSON input, found {c!r}"
+            )
+        self._pos += 1
+        return c
+
+    def _value(self):
+        self._peek()
+        size = self._read_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                value, end = None, None
+            # A value ending exactly at the buffer edge may be truncated
+            # (e.g. a number), so only accept it once more input follows.
+            if end is not None and (end < len(self._buf) or self._eof):
+                self._pos = end
+                return value
+            if not self._fill(size):
+                if end is not None:
+                    self._pos = end
+                    return value
+                raise ValueError("Truncated or invalid JSON input")
+            size *= 2
+
+    def __iter__(self):
+        """
+        Yield (payload_key, record) for every element of every list, and
+        (BLOBS_KEY, flag) where the payload has that entry.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if self._peek() == "[":
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        if self._expect(",]") == "]":
+                            break
+            elif key == BLOBS_KEY:
+                yield key, self._value()
+            else:
+                # Not a record list; nothing to stream
+                self._value()
+            if self._expect(",}") == "}":
+                return
+
+
+def artifact_format(path: str) -> str:
+    """Return "msgpack", "jsonl" or "json" for the (decompressed) contents of path."""
+    magic_len = max(len(MSGPACK_MAGIC), len(JSONL_MAGIC))
+    with open_artifact(path, binary=True) as f:
+        head = f.read(magic_len)
+    if head.startswith(MSGPACK_MAGIC):
+        return "msgpack"
+    if head.startswith(JSONL_MAGIC.encode("utf-8")):
+        return "jsonl"
+    return "json"
+
+
+def is_jsonl(path: str) -> bool:
+    """Return True if path holds the JSONL layout written by JsonlWriter."""
+    return artifact_format(path) == "jsonl"
+
+
+def _read_frame(f):
+    header = f.read(_FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < _FRAME_HEADER.size:
+        raise ValueError("Truncated msgpack artifact (frame header)")
+    (size,) = _FRAME_HEADER.unpack(header)
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError("Truncated msgpack artifact (frame body)")
+    return data
+
+
+def iter_msgpack(f):
+    """
+    Yield (payload_key, record) pairs from an open binary msgpack artifact,
+    preceded by (BLOBS_KEY, True) if it holds deduplicated values.
+    """
+    msgpack = _require_msgpack()
+
+    if f.read(len(MSGPACK_MAGIC)) != MSGPACK_MAGIC:
+        raise ValueError(f"Not a {MSGPACK_FORMAT} file")
+    header = msgpack.unpackb(_read_frame(f) or b"\xc0", raw=False)
+    if not isinstance(header, dict) or header.get("format") != MSGPACK_FORMAT:
+        raise ValueError(f"Not a {MSGPACK_FORMAT} file")
+    if header.get("version") != MSGPACK_VERSION:
+        raise ValueError(
+            f"Unsupported {MSGPACK_FORMAT} version {header.get('version')!r} "
+            f"(expected {MSGPACK_VERSION})"
+        )
+    if header.get("blobs"):
+        yield BLOBS_KEY, True
+
+    key, fields = None, None
+    while True:
+        data = _read_frame(f)
+        if data is None:
+            return
+        frame = msgpack.unpackb(data, raw=False)
+        if isinstance(frame, dict):
+            if frame.get("schema_version") != MSGPACK_SECTION_SCHEMA:
+                raise ValueError(
+                    f"Unsupported section schema version "
+                    f"{frame.get('schema_version')!r} for {frame.get('type')!r}"
+                )
+            key, fields = frame["type"], frame["fields"]
+        elif fields is None:
+            raise ValueError("msgpack record before any section header")
+        else:
+            yield key, dict(zip(fields, frame))
+
+
+def iter_jsonl(f):
+    """
+    Yield (payload_key, record) pairs from an open JSONL artifact, preceded
+    by (BLOBS_KEY, True) if it holds deduplicated values.
+    """
+    header = json.loads(f.readline())
+    if header.get("format") != JSONL_FORMAT:
+        raise ValueError(f"Not a {JSONL_FORMAT} file")
+    if header.get("version") != JSONL_VERSION:
+        raise ValueError(
+            f"Unsupported {JSONL_FORMAT} version {header.get('version')!r} "
+            f"(expected {JSONL_VERSION})"
+        )
+    if header.get("blobs"):
+        yield BLOBS_KEY, True
+
+    for lineno, line in enumerate(f, start=2):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {lineno}: {e}")
+        yield entry["type"], entry["data"]
+
+
+def _iter_raw_payload(path: str):
+    layout = artifact_format(path)
+    if layout == "msgpack":
+        with open_artifact(path, binary=True) as f:
+            yield from iter_msgpack(f)
+        return
+
+    with open_artifact(path) as f:
+        if layout == "jsonl":
+            yield from iter_jsonl(f)
+        else:
+            yield from _JsonStreamReader(f)
+
+
+def iter_payload(path: str):
+    """
+    Yield (payload_key, record) pairs from an artifact in any layout, with
+    memory bounded by a single record plus the distinct deduplicated values.
+    """
+    resolver = None
+    for key, record in _iter_raw_payload(path):
+        if key == BLOBS_KEY:
+            resolver = BlobResolver() if record else None
+        elif resolver is not None:
+            yield key, resolver.resolve(record)
+        else:
+            yield key, record
+
+
+def load_payload(path: str) -> dict:
+    """
+    Load a whole artifact into the JSON layout, whatever its on-disk format
+    or compression.
+    """
+    if artifact_format(path) == "json":
+        with open_artifact(path) as f:
+            payload = json.load(f)
+        if payload.get(BLOBS_KEY):
+            return BlobResolver().resolve_payload(payload)
+        payload.pop(BLOBS_KEY, None)
+        return payload
+
+    payload = {}
+    for key, record in iter_payload(path):
+        payload.setdefault(key, []).append(record)
+    return payload
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+################################################################################
+# migration_metrics.py
+# Optional run metrics shared by extract.py, translate.py, load.py and
+# pipeline.py:
+#
+#   --metrics-out [PATH]  phase and per-model timings, row counts, DB query
+#                         counts/times and peak traced memory, as JSON
+#   --profile             also run cProfile (PATH.prof plus a top-N summary)
+#   --quiet               replace per-record/per-field log lines with counters
+#
+# Without these options nothing is measured and the scripts behave as before.
+# Django is only touched when it is already loaded (for query timing), so
+# this module also works for translate.py --schema.
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+
+# Default directory for metrics files, next to run_in_container.log
+DEFAULT_METRICS_DIR = "./migration/logs"
+
+# Functions listed in the JSON summary of a --profile run
+PROFILE_TOP_N = 30
+
+
+def add_metrics_arguments(parser) -> None:
+    parser.add_argument(
+        "--metrics-out",
+        dest="metrics_out",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="Write timings, row counts, DB query stats and peak memory as "
+             f"JSON to PATH (default: {DEFAULT_METRICS_DIR}/"
+             "<script>_metrics_<timestamp>.json)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Also profile the run with cProfile; stats are written next to "
+             "the metrics file (implies --metrics-out)",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Log per-model summaries instead of one line per record/field",
+    )
+
+
+class Metrics:
+    """
+    Collects metrics for one script run. Created disabled at import time and
+    configured from the parsed arguments in main(), so module-level helpers
+    can record into it unconditionally.
+    """
+
+    def __init__(self, script: str, log):
+        self.script = script
+        self._log = log
+        self.path = None
+        self.profile = False
+        self.quiet = False
+        self.phases = {}
+        self.models = {}
+        self.counters = Counter()
+        self.db = {"queries": 0, "seconds": 0.0}
+        # Worker threads add their queries to self.db too
+        self._db_lock = threading.Lock()
+        self._profiler = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def configure(self, args) -> None:
+        self.quiet = args.quiet
+        self.profile = args.profile
+        if args.metrics_out is None and not args.profile:
+            return
+        path = args.metrics_out
+        if not path:
+            stamp = datetime.now().strftime("%Y-%m-%d-%H%M%S")
+            path = os.path.join(
+                DEFAULT_METRICS_DIR, f"{self.script}_metrics_{stamp}.json"
+            )
+        self.path = path
+
+    # ---------------------------------------------------------------
+    # Recording
+    # ---------------------------------------------------------------
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def model(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self._model_entry(name)
+            entry["seconds"] += time.perf_counter() - started
+
+    def add_model_seconds(self, name: str, seconds: float) -> None:
+        """Time spent on a model elsewhere, e.g. in a worker thread."""
+        self._model_entry(name)["seconds"] += seconds
+
+    def add_rows(self, model_name: str, count: int, key: str = "rows") -> None:
+        entry = self._model_entry(model_name)
+        entry[key] = entry.get(key, 0) + count
+
+    def _model_entry(self, name: str) -> dict:
+        return self.models.setdefault(name, {"seconds": 0.0, "rows": 0})
+
+    def detail(self, counter: str, msg: str) -> None:
+        """A per-record/per-field log line: logged, or only counted with --quiet."""
+        if self.quiet:
+            self.counters[counter] += 1
+        else:
+            self._log(msg)
+
+    def _db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._db_lock:
+                self.db["queries"] += 1
+                self.db["seconds"] += elapsed
+
+    def _instrument_db(self, stack: ExitStack) -> None:
+        # Only if the script uses Django; never import it from here
+        if "django.db" not in sys.modules:
+            return
+        from django.db import connections
+
+        # Django connections are per thread: these are the calling thread's
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self._db_wrapper))
+
+    @contextmanager
+    def thread_db(self):
+        """
+        Count the DB queries of a worker thread. run() only instruments the
+        main thread's connections; a thread that queries the database wraps
+        its work in this. (Worker processes are not counted.)
+        """
+        if not self.enabled:
+            yield
+            return
+        with ExitStack() as stack:
+            self._instrument_db(stack)
+            yield
+
+    # ---------------------------------------------------------------
+    # Run lifecycle
+    # ---------------------------------------------------------------
+
+    @contextmanager
+    def run(self):
+        """Wrap a script's main work; writes the metrics file when enabled."""
+        if not self.enabled:
+            try:
+                yield
+            finally:
+                self._log_counters()
+            return
+
+        status = "failed"
+        started = time.perf_counter()
+        tracemalloc.start()
+        if self.profile:
+            self._profiler = cProfile.Profile()
+        try:
+            with ExitStack() as stack:
+                self._instrument_db(stack)
+                if self._profiler is not None:
+                    self._profiler.enable()
+                try:
+                    yield
+                finally:
+                    if self._profiler is not None:
+                        self._profiler.disable()
+            status = "ok"
+        finally:
+            wall = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._log_counters()
+            self._write(status, wall, peak)
+
+    def _log_counters(self) -> None:
+        if self.counters:
+            counts = sorted(self.counters.items())
+            summary = ", ".join(f"{key}={n}" for key, n in counts)
+            self._log(f"Suppressed detail lines (--quiet): {summary}")
+
+    def _profile_summary(self, prof_path: str) -> list:
+        self._profiler.dump_stats(prof_path)
+        stats = pstats.Stats(self._profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                "function": f"{filename}:{line}({func})",
+                "calls": nc,
+                "total_s": round(tt, 6),
+                "cumulative_s": round(ct, 6),
+            })
+        rows.sort(key=lambda row: row["cumulative_s"], reverse=True)
+        return rows[:PROFILE_TOP_N]
+
+    def _write(self, status: str, wall: float, peak: int) -> None:
+        report = {
+            "script": self.script,
+            "status": status,
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "wall_s": round(wall, 6),
+            "peak_traced_bytes": peak,
+            "phases": {name: round(s, 6) for name, s in self.phases.items()},
+            "models": {
+                name: {**entry, "seconds": round(entry["seconds"], 6)}
+                for name, entry in self.models.items()
+            },
+            "db": {
+                "queries": self.db["queries"],
+                "seconds": round(self.db["seconds"], 6),
+            },
+            "suppressed_log_lines": dict(self.counters),
+        }
+
+        metrics_dir = os.path.dirname(self.path)
+        if metrics_dir:
+            os.makedirs(metrics_dir, exist_ok=True)
+        if self._profiler is not None:
+            prof_path = os.path.splitext(self.path)[0] + ".prof"
+            report["profile"] = {
+                "stats_file": prof_path,
+                "top_cumulative": self._profile_summary(prof_path),
+            }
+
+        with open(self.path, "w") as f:
+            json.dump(report, f, indent=2)
+        self._log(f"Wrote metrics to {self.path}")
@@ -0,0 +1,14 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+PROG="$(basename "$0")"
+
+log() {
+    echo "[$PROG] $1"
+}
+
+log "Starting extract/translate/load pipeline"
+
+PYTHONPATH=. python ./migration/pipeline.py "$@"
+
+log "Completed extract/translate/load pipeline"
@@ -11,14 +11,14 @@ NETWORK="${3:-docker-compose-internal_default}"
 shift 3 || true
 
 if [[ -z "$IMAGE_TAG" || -z "$PHASE" ]]; then
-  echo "Usage: $PROG IMAGE_TAG {extract|translate|load} [NETWORK_NAME] [PHASE_ARGS...]"
+  echo "Usage: $PROG IMAGE_TAG {extract|translate|load|pipeline} [NETWORK_NAME] [PHASE_ARGS...]"
   exit 1
 fi
 
 case "$PHASE" in
-  extract|translate|load) ;;
+  extract|translate|load|pipeline) ;;
   *)
-    echo "$PROG Invalid phase: $PHASE (expected: extract, translate, load)"
+    echo "$PROG Invalid phase: $PHASE (expected: extract, translate, load, pipeline)"
     exit 1
     ;;
 esac
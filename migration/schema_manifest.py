@@ -0,0 +1,399 @@
+#!/usr/bin/env python
+################################################################################
+# schema_manifest.py
+# Versioned snapshot of the current Swirl models' field metadata, so that
+# translate.py can run without importing Django:
+#
+#   # inside the new Swirl image (needs Django):
+#   python ./migration/translate.py --export-schema ./migration/schema_manifest.json
+#
+#   # anywhere, no Django needed:
+#   python ./migration/translate.py --schema ./migration/schema_manifest.json
+#
+# Exporting needs Django model classes; loading and validating against a
+# manifest must NOT import Django.
+
+import copy
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+
+SCHEMA_FORMAT = "swirl-migration-schema"
+SCHEMA_VERSION = 1
+
+# Same as django.core.validators.EMPTY_VALUES
+EMPTY_VALUES = (None, "", [], (), {})
+
+STRING_TYPES = {
+    "CharField",
+    "TextField",
+    "SlugField",
+    "EmailField",
+    "URLField",
+    "GenericIPAddressField",
+    "FilePathField",
+}
+INTEGER_TYPES = {
+    "IntegerField",
+    "BigIntegerField",
+    "SmallIntegerField",
+    "PositiveIntegerField",
+    "PositiveBigIntegerField",
+    "PositiveSmallIntegerField",
+    "AutoField",
+    "BigAutoField",
+    "SmallAutoField",
+}
+
+
+class ValidationError(Exception):
+    """
+    Django-free stand-in for django.core.exceptions.ValidationError, with the
+    attributes translate.py reads (message_dict, messages).
+    """
+
+    def __init__(self, message_dict):
+        self.message_dict = message_dict
+        self.messages = [m for messages in message_dict.values() for m in messages]
+        super().__init__(message_dict)
+
+
+# -------------------------------------------------------------------
+# Export (needs Django model classes)
+# -------------------------------------------------------------------
+
+def _json_value(value):
+    """Return (True, value) if value survives a JSON round trip unchanged."""
+    try:
+        return True, json.loads(json.dumps(value))
+    except (TypeError, ValueError):
+        return False, None
+
+
+def _export_validator(validator) -> dict:
+    name = type(validator).__name__
+    if name in ("MaxLengthValidator", "MinLengthValidator",
+                "MaxValueValidator", "MinValueValidator"):
+        kind = {
+            "MaxLengthValidator": "max_length",
+            "MinLengthValidator": "min_length",
+            "MaxValueValidator": "max_value",
+            "MinValueValidator": "min_value",
+        }[name]
+        limit = validator.limit_value
+        ok, limit = _json_value(limit() if callable(limit) else limit)
+        if ok:
+            return {"type": kind, "limit": limit}
+    elif hasattr(validator, "regex") and hasattr(validator.regex, "pattern"):
+        # RegexValidator and subclasses (URLValidator, slug validators, ...)
+        spec = {
+            "type": "regex",
+            "class": name,
+            "pattern": validator.regex.pattern,
+            "flags": int(validator.regex.flags),
+            "inverse_match": bool(getattr(validator, "inverse_match", False)),
+            "message": str(getattr(validator, "message", "Enter a valid value.")),
+        }
+        schemes = getattr(validator, "schemes", None)
+        if schemes:
+            spec["schemes"] = list(schemes)
+        return spec
+    return {"type": "unsupported", "class": f"{type(validator).__module__}.{name}"}
+
+
+def _export_field(field) -> dict:
+    spec = {
+        "name": field.name,
+        "type": field.get_internal_type(),
+        "null": bool(field.null),
+        "blank": bool(field.blank),
+        "auto_now": bool(getattr(field, "auto_now", False)),
+        "auto_now_add": bool(getattr(field, "auto_now_add", False)),
+        "max_length": getattr(field, "max_length", None),
+        "has_default": field.has_default(),
+    }
+
+    if field.has_default():
+        default = field.default
+        spec["default_callable"] = callable(default)
+        ok, value = _json_value(default() if callable(default) else default)
+        if ok:
+            spec["default"] = value
+        else:
+            spec["default_unsupported"] = repr(default)
+
+    if field.choices:
+        ok, values = _json_value([value for value, _ in field.flatchoices])
+        if ok:
+            spec["choices"] = values
+
+    spec["validators"] = [_export_validator(v) for v in field.validators]
+    return spec
+
+
+def export_schema(models) -> dict:
+    """
+    Build a manifest for the given Django model classes: every concrete,
+    local, non-relational field with its null/blank/default/auto_now
+    metadata and its validators.
+    """
+    import django
+
+    exported = {}
+    for model_cls in models:
+        fields = []
+        for field in model_cls._meta.get_fields():
+            if not getattr(field, "concrete", False):
+                continue
+            if getattr(field, "many_to_many", False):
+                continue
+            if field.is_relation:
+                continue
+            fields.append(_export_field(field))
+        exported[model_cls.__name__] = {"fields": fields}
+
+    fingerprint = hashlib.sha256(
+        json.dumps(exported, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+    return {
+        "format": SCHEMA_FORMAT,
+        "version": SCHEMA_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "django_version": django.get_version(),
+        "fingerprint": fingerprint,
+        "models": exported,
+    }
+
+
+# -------------------------------------------------------------------
+# Load / validate (no Django)
+# -------------------------------------------------------------------
+
+class ManifestField:
+    """
+    Field metadata from a manifest, exposing the attributes translate.py's
+    plan compiler reads from Django fields.
+    """
+
+    concrete = True
+    many_to_many = False
+    is_relation = False
+
+    def __init__(self, model_name: str, spec: dict):
+        self.model_name = model_name
+        self.spec = spec
+        self.name = spec["name"]
+        self.type = spec["type"]
+        self.null = spec["null"]
+        self.blank = spec["blank"]
+        self.auto_now = spec["auto_now"]
+        self.auto_now_add = spec["auto_now_add"]
+        self.max_length = spec.get("max_length")
+        self.choices = spec.get("choices")
+        self._validators = [_compile_validator(v) for v in spec.get("validators", [])]
+
+        if not spec["has_default"]:
+            self.default = None
+        elif "default_unsupported" in spec:
+            self.default = self._unsupported_default
+        elif spec.get("default_callable"):
+            # Fresh copy per record, like calling the original callable
+            self.default = lambda: copy.deepcopy(spec["default"])
+        else:
+            self.default = spec["default"]
+
+    def _unsupported_default(self):
+        raise RuntimeError(
+            f"{self.model_name}.{self.name} has a default that cannot be "
+            f"stored in the schema manifest ({self.spec['default_unsupported']}); "
+            "run translate.py with --full-clean (Django) instead."
+        )
+
+    def has_default(self) -> bool:
+        return self.spec["has_default"]
+
+    def get_default(self):
+        if callable(self.default):
+            return self.default()
+        return self.default
+
+    @property
+    def unsupported_validators(self):
+        return [
+            v["class"] for v in self.spec.get("validators", [])
+            if v["type"] == "unsupported"
+        ]
+
+    def to_python(self, value):
+        if value is None:
+            return value
+        if self.type in STRING_TYPES:
+            return value if isinstance(value, str) else str(value)
+        if self.type in INTEGER_TYPES:
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                raise ValueError(f"'{value}' value must be an integer.")
+            try:
+                return int(value)
+            except ValueError:
+                raise ValueError(f"'{value}' value must be an integer.")
+        if self.type == "FloatField":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"'{value}' value must be a float.")
+        if self.type == "BooleanField":
+            if value in (True, False):
+                return bool(value)
+            if value in ("t", "True", "1"):
+                return True
+            if value in ("f", "False", "0"):
+                return False
+            raise ValueError(f"'{value}' value must be either True or False.")
+        if self.type == "JSONField":
+            try:
+                json.dumps(value)
+            except TypeError:
+                raise ValueError("Value must be valid JSON.")
+        return value
+
+    def clean(self, value):
+        """Mirror django Field.clean(): to_python, validate, run_validators."""
+        value = self.to_python(value)
+
+        if self.choices is not None and value not in EMPTY_VALUES:
+            if value not in self.choices:
+                raise ValueError(f"Value {value!r} is not a valid choice.")
+        if value is None and not self.null:
+            raise ValueError("This field cannot be null.")
+        if not self.blank and value in EMPTY_VALUES:
+            raise ValueError("This field cannot be blank.")
+
+        if value not in EMPTY_VALUES:
+            errors = []
+            for validator in self._validators:
+                message = validator(value)
+                if message:
+                    errors.append(message)
+            if errors:
+                raise ValueError(*errors)
+        return value
+
+
+def _compile_validator(spec: dict):
+    """Return a callable(value) -> error message or None."""
+    kind = spec["type"]
+
+    if kind in ("max_length", "min_length", "max_value", "min_value"):
+        limit = spec["limit"]
+
+        def check(value):
+            measured = len(value) if kind.endswith("length") else value
+            if kind.startswith("max") and measured > limit:
+                if kind == "max_length":
+                    return (
+                        f"Ensure this value has at most {limit} characters "
+                        f"(it has {measured})."
+                    )
+                return f"Ensure this value is less than or equal to {limit}."
+            if kind.startswith("min") and measured < limit:
+                if kind == "min_length":
+                    return (
+                        f"Ensure this value has at least {limit} characters "
+                        f"(it has {measured})."
+                    )
+                return f"Ensure this value is greater than or equal to {limit}."
+            return None
+
+        return check
+
+    if kind == "regex":
+        regex = re.compile(spec["pattern"], spec["flags"])
+        schemes = spec.get("schemes")
+
+        def check(value):
+            text = str(value)
+            if schemes and text.split("://")[0].lower() not in schemes:
+                return spec["message"]
+            matched = regex.search(text) is not None
+            if matched == spec["inverse_match"]:
+                return spec["message"]
+            return None
+
+        return check
+
+    # Unsupported validators are reported once by the caller, not enforced
+    return lambda value: None
+
+
+class ManifestModel:
+    """
+    A model described by a manifest. Stands in for the Django model class in
+    translate.py: has __name__, _meta.get_fields() and a full_clean-like
+    validate().
+    """
+
+    class _Options:
+        def __init__(self, fields):
+            self._fields = fields
+
+        def get_fields(self):
+            return list(self._fields)
+
+    def __init__(self, name: str, spec: dict):
+        self.__name__ = name
+        self.fields = [ManifestField(name, f) for f in spec["fields"]]
+        self._meta = self._Options(self.fields)
+
+    def validate(self, data: dict, exclude=()) -> None:
+        """
+        Field-level equivalent of full_clean(validate_unique=False,
+        validate_constraints=False): values absent from data are checked as
+        their model default, blank values of blank=True fields are skipped.
+        Raises ValidationError with a Django-style message_dict.
+        """
+        errors = {}
+        for field in self.fields:
+            if field.name in exclude:
+                continue
+
+            if field.name in data:
+                value = data[field.name]
+            elif field.has_default() and "default_unsupported" not in field.spec:
+                value = field.get_default()
+            else:
+                value = None
+
+            if field.blank and value in EMPTY_VALUES:
+                continue
+            try:
+                field.clean(value)
+            except ValueError as e:
+                errors[field.name] = [str(arg) for arg in e.args]
+
+        if errors:
+            raise ValidationError(errors)
+
+
+def load_schema(path: str) -> dict:
+    """
+    Read a manifest written by export_schema() and return
+    {model name: ManifestModel}.
+    """
+    with open(path, "r") as f:
+        manifest = json.load(f)
+
+    if manifest.get("format") != SCHEMA_FORMAT:
+        raise SystemExit(f"{path} is not a {SCHEMA_FORMAT} file")
+    if manifest.get("version") != SCHEMA_VERSION:
+        raise SystemExit(
+            f"{path} has schema manifest version {manifest.get('version')!r}; "
+            f"this translate.py expects {SCHEMA_VERSION}. Re-export it with "
+            "--export-schema."
+        )
+
+    return {
+        name: ManifestModel(name, spec)
+        for name, spec in manifest["models"].items()
+    }
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The migration scripts import each other as top-level modules
+MIGRATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if MIGRATION_DIR not in sys.path:
+    sys.path.insert(0, MIGRATION_DIR)
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from migration_io import (
+    BLOB_KEY,
+    FORMATS,
+    AtomicArtifactWriter,
+    blob_of,
+    iter_payload,
+    load_payload,
+    open_writer,
+)
+
+CONFIG = {"query_mappings": "X" * 400, "result_mappings": ["a", "b"] * 50}
+
+
+def records(count=5):
+    return [
+        {"name": f"provider-{i}", "config": dict(CONFIG), "tags": ["t"]}
+        for i in range(count)
+    ]
+
+
+def write_artifact(path, output_format, items, dedup_blobs=False):
+    if output_format == "msgpack":
+        pytest.importorskip("msgpack")
+    with AtomicArtifactWriter(
+        [str(path)], binary=output_format == "msgpack"
+    ) as f:
+        writer = open_writer(f, output_format, dedup_blobs=dedup_blobs)
+        for key, record in items:
+            writer.write(key, record)
+        writer.close()
+    return writer
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_dedup_writer_round_trip(tmp_path, output_format):
+    path = tmp_path / "load.json"
+    items = [("search_providers", record) for record in records()]
+    writer = write_artifact(path, output_format, items, dedup_blobs=True)
+
+    assert writer.encoder.stored == 1
+    assert writer.encoder.referenced == 4
+    read = list(iter_payload(str(path)))
+    assert read == items
+    # Every record shares the one resolved value
+    assert len({blob_of(record["config"]) for _, record in read}) == 1
+    assert load_payload(str(path)) == {"search_providers": [r for _, r in items]}
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_plain_writer_close(tmp_path, output_format):
+    path = tmp_path / "load.json"
+    items = [("authenticators", {"name": "a"}), ("ai_providers", {"name": "b"})]
+    write_artifact(path, output_format, items)
+    assert list(iter_payload(str(path))) == items
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_reference_lookalikes_without_dedup(tmp_path, output_format):
+    # A user value shaped like a reference, in a file written without dedup
+    lookalike = {BLOB_KEY: "0" * 64}
+    defined = {BLOB_KEY: "1" * 64, "value": {"x": 1}}
+    items = [("search_providers", {"name": "p", "a": lookalike, "b": defined})]
+    path = tmp_path / "load.json"
+    write_artifact(path, output_format, items)
+
+    assert list(iter_payload(str(path))) == items
+    assert load_payload(str(path)) == {"search_providers": [items[0][1]]}
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_reference_lookalikes_with_dedup(tmp_path, output_format):
+    lookalike = {BLOB_KEY: "0" * 64}
+    items = [("search_providers", {"name": f"p{i}", "a": lookalike}) for i in range(2)]
+    path = tmp_path / "load.json"
+    write_artifact(path, output_format, items, dedup_blobs=True)
+    assert list(iter_payload(str(path))) == items
+
+
+def test_encode_payload_json_dump(tmp_path):
+    from migration_io import BLOBS_KEY, BlobEncoder
+
+    payload = {"search_providers": records(3), "authenticators": []}
+    encoded = BlobEncoder().encode_payload(payload)
+    assert next(iter(encoded)) == BLOBS_KEY
+    path = tmp_path / "load.json"
+    path.write_text(json.dumps(encoded, indent=2))
+    assert load_payload(str(path)) == payload
+    assert list(iter_payload(str(path))) == [
+        ("search_providers", record) for record in payload["search_providers"]
+    ]
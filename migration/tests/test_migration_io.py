@@ -0,0 +1,216 @@
+import io
+import json
+import os
+
+import pytest
+
+from migration_io import (
+    DELETED_KEY,
+    FORMATS,
+    JSONL_FORMAT,
+    MSGPACK_MAGIC,
+    PAYLOAD_KEYS,
+    AtomicArtifactWriter,
+    JsonPayloadWriter,
+    _JsonStreamReader,
+    artifact_format,
+    iter_payload,
+    load_payload,
+    open_artifact,
+    open_writer,
+)
+
+ITEMS = [
+    ("authenticators", {"name": "Microsoft", "active": True, "client_secret": ""}),
+    ("search_providers", {"name": "Web", "connector": "RequestsGet", "id": 1}),
+    (
+        "search_providers",
+        {
+            "name": "Ünïcode \"quoted\" {brace} [bracket]",
+            "query_mappings": "A=1,B=2",
+            "result_processors": ["MappingResultProcessor"],
+            "tags": [],
+            "score": 1.5e-7,
+            "config": {"nested": {"list": [1, None, False]}},
+        },
+    ),
+    ("ai_providers", {"name": "OpenAI", "model": "gpt", "defaults": ["rag"]}),
+]
+
+
+def requires(output_format, compress="none"):
+    if output_format == "msgpack":
+        pytest.importorskip("msgpack")
+    if compress == "zstd":
+        pytest.importorskip("zstandard")
+
+
+def write_artifact(path, output_format, items, compress="none", **json_options):
+    requires(output_format, compress)
+    with AtomicArtifactWriter(
+        [str(path)], compress=compress, binary=output_format == "msgpack"
+    ) as f:
+        writer = open_writer(f, output_format, **json_options)
+        for key, record in items:
+            writer.write(key, record)
+        writer.close()
+
+
+def as_payload(items):
+    payload = {}
+    for key, record in items:
+        payload.setdefault(key, []).append(record)
+    return payload
+
+
+@pytest.mark.parametrize("compress", ["none", "gzip", "zstd"])
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_round_trip(tmp_path, output_format, compress):
+    path = tmp_path / "load.out"
+    write_artifact(path, output_format, ITEMS, compress)
+
+    assert artifact_format(str(path)) == output_format
+    assert list(iter_payload(str(path))) == ITEMS
+    assert load_payload(str(path)) == as_payload(ITEMS)
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_round_trip_tombstones(tmp_path, output_format):
+    items = ITEMS[:2] + [
+        (DELETED_KEY, {"type": "search_providers", "id": 7, "name": "Gone"}),
+    ]
+    path = tmp_path / "extract.out"
+    write_artifact(path, output_format, items)
+    assert list(iter_payload(str(path))) == items
+
+
+@pytest.mark.parametrize("output_format", FORMATS)
+def test_empty_artifact(tmp_path, output_format):
+    path = tmp_path / "empty.out"
+    write_artifact(path, output_format, [])
+    assert list(iter_payload(str(path))) == []
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_json_writer_matches_json_dump(compact):
+    f = io.StringIO()
+    writer = JsonPayloadWriter(f, compact=compact, always_include=PAYLOAD_KEYS)
+    for key, record in ITEMS[:2]:
+        writer.write(key, record)
+    writer.close()
+
+    expected = as_payload(ITEMS[:2])
+    expected["ai_providers"] = []
+    if compact:
+        assert f.getvalue() == json.dumps(expected, separators=(",", ":"))
+    else:
+        assert f.getvalue() == json.dumps(expected, indent=2)
+
+
+def test_json_writer_rejects_split_sections():
+    writer = JsonPayloadWriter(io.StringIO())
+    writer.write("search_providers", {"name": "a"})
+    writer.write("authenticators", {"name": "b"})
+    with pytest.raises(ValueError):
+        writer.write("search_providers", {"name": "c"})
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64])
+def test_stream_reader_small_reads(read_size):
+    # Numbers and strings that end exactly on a read boundary must not be
+    # cut short
+    payload = {
+        "search_providers": [{"n": 1234567890}, 42, "x" * 10, [1.25, -3]],
+        "not_a_list": {"ignored": True},
+        "authenticators": [],
+        "ai_providers": [0],
+    }
+    text = json.dumps(payload, indent=2)
+    reader = _JsonStreamReader(io.StringIO(text), read_size=read_size)
+    assert list(reader) == [
+        ("search_providers", {"n": 1234567890}),
+        ("search_providers", 42),
+        ("search_providers", "x" * 10),
+        ("search_providers", [1.25, -3]),
+        ("ai_providers", 0),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text", ['{"search_providers": [{"name": "a"}', '{"a": [1,']
+)
+def test_stream_reader_truncated(text):
+    with pytest.raises(ValueError):
+        list(_JsonStreamReader(io.StringIO(text), read_size=4))
+
+
+def test_jsonl_unknown_version(tmp_path):
+    path = tmp_path / "load.jsonl"
+    path.write_text('{"format":"%s","version":99}\n' % JSONL_FORMAT)
+    with pytest.raises(ValueError, match="version"):
+        list(iter_payload(str(path)))
+
+
+def test_jsonl_invalid_line(tmp_path):
+    path = tmp_path / "load.jsonl"
+    write_artifact(path, "jsonl", ITEMS[:1])
+    with open(path, "a") as f:
+        f.write("{not json\n")
+    with pytest.raises(ValueError, match="line 3"):
+        list(iter_payload(str(path)))
+
+
+def test_msgpack_truncated(tmp_path):
+    path = tmp_path / "load.msgpack"
+    write_artifact(path, "msgpack", ITEMS)
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    with pytest.raises(ValueError, match="Truncated"):
+        list(iter_payload(str(path)))
+
+
+def test_artifact_format_sniffs_contents(tmp_path):
+    path = tmp_path / "load.json"
+    path.write_bytes(MSGPACK_MAGIC + b"\x00")
+    assert artifact_format(str(path)) == "msgpack"
+    path.write_text('{"format":"%s","version":1}\n' % JSONL_FORMAT)
+    assert artifact_format(str(path)) == "jsonl"
+    path.write_text("{}")
+    assert artifact_format(str(path)) == "json"
+
+
+@pytest.mark.parametrize("compress", ["gzip", "zstd"])
+def test_open_artifact_decompresses(tmp_path, compress):
+    requires("json", compress)
+    path = tmp_path / "load.json.z"
+    with AtomicArtifactWriter([str(path)], compress=compress) as f:
+        f.write('{"a": []}')
+    assert path.read_bytes()[:1] != b"{"
+    with open_artifact(str(path)) as f:
+        assert f.read() == '{"a": []}'
+
+
+def test_atomic_writer_publishes_every_path(tmp_path):
+    paths = [str(tmp_path / "extract-2024.json"), str(tmp_path / "extract.json")]
+    with AtomicArtifactWriter(paths) as f:
+        f.write("{}")
+    for path in paths:
+        with open(path) as f:
+            assert f.read() == "{}"
+    assert sorted(os.listdir(tmp_path)) == ["extract-2024.json", "extract.json"]
+
+
+def test_atomic_writer_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "load.json"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with AtomicArtifactWriter([str(path)]) as f:
+            f.write("partial")
+            raise RuntimeError("boom")
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["load.json"]
+
+
+def test_atomic_writer_rejects_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        AtomicArtifactWriter([str(tmp_path / "x")], compress="bz2")
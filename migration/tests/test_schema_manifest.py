@@ -0,0 +1,184 @@
+import json
+
+import pytest
+
+from schema_manifest import (
+    SCHEMA_FORMAT,
+    SCHEMA_VERSION,
+    ValidationError,
+    load_schema,
+)
+
+
+def field(name, type_="CharField", **spec):
+    base = {
+        "name": name,
+        "type": type_,
+        "null": False,
+        "blank": False,
+        "auto_now": False,
+        "auto_now_add": False,
+        "max_length": None,
+        "has_default": False,
+        "validators": [],
+    }
+    base.update(spec)
+    return base
+
+
+MANIFEST = {
+    "format": SCHEMA_FORMAT,
+    "version": SCHEMA_VERSION,
+    "fingerprint": "0" * 64,
+    "models": {
+        "SearchProvider": {
+            "fields": [
+                field(
+                    "name",
+                    max_length=10,
+                    validators=[{"type": "max_length", "limit": 10}],
+                ),
+                field("active", "BooleanField", has_default=True, default=True),
+                field("connector", choices=["RequestsGet", "Sqlite3"]),
+                field(
+                    "url",
+                    blank=True,
+                    validators=[{
+                        "type": "regex",
+                        "class": "URLValidator",
+                        "pattern": r"^\S+$",
+                        "flags": 0,
+                        "inverse_match": False,
+                        "message": "Enter a valid URL.",
+                        "schemes": ["http", "https"],
+                    }],
+                ),
+                field(
+                    "results_per_query",
+                    "IntegerField",
+                    has_default=True,
+                    default=10,
+                    validators=[{"type": "min_value", "limit": 1}],
+                ),
+                field(
+                    "tags",
+                    "JSONField",
+                    blank=True,
+                    has_default=True,
+                    default_callable=True,
+                    default=[],
+                ),
+                field(
+                    "credentials",
+                    blank=True,
+                    validators=[{"type": "unsupported", "class": "app.CheckKey"}],
+                ),
+            ],
+        },
+        "Legacy": {
+            "fields": [
+                field(
+                    "created",
+                    "DateTimeField",
+                    has_default=True,
+                    default_callable=True,
+                    default_unsupported="<function now>",
+                ),
+            ],
+        },
+    },
+}
+
+VALID = {"name": "Web", "connector": "RequestsGet", "url": "https://example.com"}
+
+
+@pytest.fixture
+def models(tmp_path):
+    path = tmp_path / "schema_manifest.json"
+    path.write_text(json.dumps(MANIFEST))
+    return load_schema(str(path))
+
+
+def validate(models, **changes):
+    data = {**VALID, **changes}
+    models["SearchProvider"].validate(data)
+
+
+def errors(models, **changes):
+    with pytest.raises(ValidationError) as e:
+        validate(models, **changes)
+    return e.value.message_dict
+
+
+def test_valid_record_uses_defaults(models):
+    validate(models)
+
+
+def test_field_metadata(models):
+    model = models["SearchProvider"]
+    fields = {f.name: f for f in model._meta.get_fields()}
+    assert model.__name__ == "SearchProvider"
+    assert fields["name"].max_length == 10
+    assert fields["results_per_query"].get_default() == 10
+    assert fields["credentials"].unsupported_validators == ["app.CheckKey"]
+    # A callable default gives each record its own copy
+    tags = fields["tags"].get_default()
+    tags.append("x")
+    assert fields["tags"].get_default() == []
+
+
+@pytest.mark.parametrize(
+    "changes, field_name",
+    [
+        ({"name": "x" * 11}, "name"),
+        ({"name": ""}, "name"),
+        ({"name": None}, "name"),
+        ({"connector": "Unknown"}, "connector"),
+        ({"url": "ftp://example.com"}, "url"),
+        ({"url": "https://a b"}, "url"),
+        ({"results_per_query": 0}, "results_per_query"),
+        ({"results_per_query": "ten"}, "results_per_query"),
+        ({"results_per_query": True}, "results_per_query"),
+        ({"active": "maybe"}, "active"),
+        ({"tags": {1, 2}}, "tags"),
+    ],
+)
+def test_invalid_values(models, changes, field_name):
+    assert list(errors(models, **changes)) == [field_name]
+
+
+def test_messages_match_django(models):
+    found = errors(models, name="x" * 12, results_per_query=0)
+    assert found == {
+        "name": ["Ensure this value has at most 10 characters (it has 12)."],
+        "results_per_query": ["Ensure this value is greater than or equal to 1."],
+    }
+
+
+def test_conversions(models):
+    validate(models, results_per_query="5", active="t")
+    validate(models, url="")
+
+
+def test_exclude(models):
+    models["SearchProvider"].validate({**VALID, "name": None}, exclude=("name",))
+
+
+def test_unsupported_default(models):
+    created = models["Legacy"]._meta.get_fields()[0]
+    with pytest.raises(RuntimeError, match="--full-clean"):
+        created.get_default()
+    # Validation checks such a field as missing instead of calling it
+    with pytest.raises(ValidationError):
+        models["Legacy"].validate({})
+
+
+@pytest.mark.parametrize(
+    "changes, message",
+    [({"format": "other"}, "is not a"), ({"version": 99}, "Re-export")],
+)
+def test_rejects_other_manifests(tmp_path, changes, message):
+    path = tmp_path / "schema_manifest.json"
+    path.write_text(json.dumps({**MANIFEST, **changes}))
+    with pytest.raises(SystemExit, match=message):
+        load_schema(str(path))
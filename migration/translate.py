@@ -3,17 +3,85 @@ import argparse
 import json
 import os
 import sys
-
-import django
-from django.core.exceptions import ValidationError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from migration_io import (
+    DELETED_KEY,
+    FORMATS,
+    PAYLOAD_KEYS,
+    AtomicArtifactWriter,
+    BlobEncoder,
+    blob_of,
+    iter_payload,
+    load_payload,
+    open_writer,
+)
+from migration_metrics import Metrics, add_metrics_arguments
+from schema_manifest import ManifestModel, export_schema, load_schema
+from schema_manifest import ValidationError as ManifestValidationError
 
 # -------------------------------------------------------------------
-# Django setup
+# Model backend
 # -------------------------------------------------------------------
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "swirl_server.settings")
-django.setup()
+# Django is only imported by init_backend(), and not at all when a schema
+# manifest is used, so translate can run on a plain host.
+
+# payload key -> model name, label used in log lines
+PAYLOAD_MODEL_NAMES = {
+    "authenticators": ("Authenticator", "authenticator"),
+    "search_providers": ("SearchProvider", "search provider"),
+    "ai_providers": ("AIProvider", "AI provider"),
+}
+
+# Populated by init_backend(): model name -> Django model or ManifestModel
+MODELS_BY_NAME = {}
+
+# payload key -> (model, label used in log lines); populated by init_backend()
+PAYLOAD_MODELS = {}
+
+# Exception raised by validation; Django's when Django models are in use
+ValidationError = ManifestValidationError
+
+
+def setup_django():
+    """Bootstrap Django and return the current Swirl model classes."""
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "swirl_server.settings")
+    django.setup()
+
+    from swirl.models import AIProvider, Authenticator, SearchProvider  # type: ignore
+
+    return [Authenticator, SearchProvider, AIProvider]
+
+
+def init_backend(schema_path=None, full_clean=False):
+    """
+    Select the model backend: the Django models (default, or with
+    --full-clean), or the field metadata from a schema manifest.
+    Also used as the process-pool initializer, so workers match the parent.
+    """
+    global ValidationError
+
+    if schema_path is None or full_clean:
+        models = {m.__name__: m for m in setup_django()}
+
+        from django.core.exceptions import ValidationError as DjangoValidationError
+
+        ValidationError = DjangoValidationError
+    else:
+        models = load_schema(schema_path)
+        ValidationError = ManifestValidationError
+
+    MODELS_BY_NAME.clear()
+    MODELS_BY_NAME.update(models)
+    PAYLOAD_MODELS.clear()
+    for payload_key, (model_name, kind_label) in PAYLOAD_MODEL_NAMES.items():
+        if model_name not in models:
+            raise SystemExit(f"Model {model_name} is missing from the schema")
+        PAYLOAD_MODELS[payload_key] = (models[model_name], kind_label)
 
-from swirl.models import AIProvider, Authenticator, SearchProvider
 
 # -------------------------------------------------------------------
 # Config
@@ -56,6 +124,10 @@ def log(msg: str) -> None:
     print(f"[translate.py] {msg}", file=sys.stderr)
 
 
+# Configured from --metrics-out/--profile/--quiet in main()
+METRICS = Metrics("translate", log)
+
+
 # -------------------------------------------------------------------
 # Helpers
 # -------------------------------------------------------------------
@@ -76,91 +148,129 @@ def concrete_fields_for_model(model_cls):
     return fields
 
 
-def build_field_value(model_name: str, field, src_dict: dict):
+# Per-field actions of a compiled translation plan, applied when the field
+# is NOT taken from the source record
+USE_VALUE = "value"      # fixed value: placeholder, explicit or model default, None
+CALL_DEFAULT = "call"    # callable model default, evaluated per record
+SKIP = "skip"            # leave out of the result (auto_now/auto_now_add)
+FAIL = "fail"            # required field with no way to fill it
+
+# Marker for "no explicit default configured"
+_NO_DEFAULT = object()
+
+# model class -> compiled plan
+_TRANSLATION_PLANS = {}
+
+# (model name, field name, blob hash) of deduplicated values that already
+# passed validation in this process; field checks depend only on the value,
+# so records sharing the blob skip them (see validated_blob_fields)
+_VALIDATED_BLOBS = set()
+
+
+def is_blank(value) -> bool:
+    """Blank source values are treated as missing when an explicit default exists."""
+    return (
+        value is None
+        or value == ""
+        or value == []
+        or value == {}
+        or (isinstance(value, str) and value.strip() == "")
+    )
+
+
+def _model_default_getter(field):
+    def get_default():
+        try:
+            return field.get_default()
+        except TypeError:
+            return field.default() if callable(field.default) else field.default
+
+    return get_default
+
+
+def compile_translation_plan(model_cls):
     """
-    Decide what value to assign to a field:
-      - if present in src_dict and not sensitive:
-          - if non-blank → use that value
-          - if blank and explicit default exists → use explicit default
-      - if sensitive:
-          - if explicit default is configured: use placeholder default
-          - else: skip field entirely (do not set in result)
-      - else if explicit default exists: use that
-      - else if field has default: use default
-      - else if field.null: use None
-      - else if auto_now/auto_now_add: skip (let model fill it)
-      - else: raise, because we cannot guess a valid value
+    Decide, once per model, how each field gets its value.
+
+    Returns an ordered list of (name, copy_from_source, blank_default, action,
+    arg) tuples:
+      - sensitive fields never copy the old value:
+          - with an explicit default: use it as a placeholder
+          - else: not in the plan at all (omitted from the result)
+      - other fields copy the source value when present; a blank source value
+        falls back to the explicit default, if one exists (blank_default)
+      - when absent from the source, `action` decides:
+          - explicit default → USE_VALUE
+          - auto_now/auto_now_add → SKIP (let the model fill it)
+          - model default → USE_VALUE, or CALL_DEFAULT for callables
+          - null=True → USE_VALUE None
+          - else FAIL, because we cannot guess a valid value
     """
-    name = field.name
+    model_name = model_cls.__name__
     sensitive = SENSITIVE_FIELDS.get(model_name, set())
     explicit_defaults = EXPLICIT_FIELD_DEFAULTS.get(model_name, {})
 
-    # Sensitive fields: never copy the old value
-    if name in sensitive:
-        if name in explicit_defaults:
-            value = explicit_defaults[name]
-            log(
+    plan = []
+    for field in concrete_fields_for_model(model_cls):
+        name = field.name
+        explicit = explicit_defaults.get(name, _NO_DEFAULT)
+
+        # Sensitive fields: never copy the old value
+        if name in sensitive:
+            if explicit is _NO_DEFAULT:
+                METRICS.detail(
+                    "field_plan",
+                    f"{model_name}.{name}: sensitive field, skipping "
+                    "(no explicit default)",
+                )
+                continue
+            METRICS.detail(
+                "field_plan",
                 f"{model_name}.{name}: sensitive field, using explicit placeholder "
-                f"default: {value!r}"
+                f"default: {explicit!r}",
             )
-            return value, False  # set this value in result
-        else:
-            log(f"{model_name}.{name}: sensitive field, skipping (no explicit default)")
-            return None, True  # skipped=True → caller omits from result
-
-    # Non-sensitive: use source value if present
-    if name in src_dict:
-        raw_value = src_dict[name]
-
-        # Consider "blank" source values as missing if we have an explicit default
-        is_blank = (
-            raw_value is None
-            or raw_value == ""
-            or raw_value == []
-            or raw_value == {}
-            or (isinstance(raw_value, str) and raw_value.strip() == "")
-        )
+            plan.append((name, False, _NO_DEFAULT, USE_VALUE, explicit))
+            continue
 
-        if is_blank and name in explicit_defaults:
-            value = explicit_defaults[name]
-            log(
-                f"{model_name}.{name}: source value is blank; "
-                f"using explicit default {value!r}"
+        if explicit is not _NO_DEFAULT:
+            METRICS.detail(
+                "field_plan",
+                f"{model_name}.{name}: explicit default when missing: {explicit!r}",
+            )
+            action, arg = USE_VALUE, explicit
+        elif getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+            METRICS.detail(
+                "field_plan",
+                f"{model_name}.{name}: auto_now/auto_now_add field, "
+                "skipping when missing",
+            )
+            action, arg = SKIP, None
+        elif field.has_default():
+            if callable(field.default):
+                action, arg = CALL_DEFAULT, _model_default_getter(field)
+            else:
+                action, arg = USE_VALUE, _model_default_getter(field)()
+        elif getattr(field, "null", False):
+            action, arg = USE_VALUE, None
+        else:
+            action = FAIL
+            arg = (
+                f"{model_name}.{name} is required, has no default, "
+                f"and is missing from extract.json and EXPLICIT_FIELD_DEFAULTS, "
+                "and is not an auto-managed field. "
+                "You may need to handle this field explicitly in translate.py."
             )
-            return value, False
 
-        # Otherwise, use the value as-is
-        return raw_value, False
+        plan.append((name, True, explicit, action, arg))
 
-    # Non-sensitive: explicit default in our mapping
-    if name in explicit_defaults:
-        value = explicit_defaults[name]
-        log(f"{model_name}.{name}: using explicit default: {value!r}")
-        return value, False
+    return plan
 
-    # Auto timestamp / auto-managed fields: let the model handle them at save time
-    if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
-        log(f"{model_name}.{name}: auto_now/auto_now_add field, skipping")
-        return None, True  # skipped → not included in result
 
-    # Not in src: fall back to model defaults / null rules
-    if field.has_default():
-        try:
-            value = field.get_default()
-        except TypeError:
-            value = field.default() if callable(field.default) else field.default
-        return value, False
-
-    if getattr(field, "null", False):
-        return None, False
-
-    # Required, non-null, no default, and missing in source data
-    raise RuntimeError(
-        f"{model_name}.{name} is required, has no default, "
-        f"and is missing from extract.json and EXPLICIT_FIELD_DEFAULTS, "
-        "and is not an auto-managed field. "
-        "You may need to handle this field explicitly in translate.py."
-    )
+def translation_plan(model_cls):
+    plan = _TRANSLATION_PLANS.get(model_cls)
+    if plan is None:
+        plan = _TRANSLATION_PLANS[model_cls] = compile_translation_plan(model_cls)
+    return plan
 
 
 def translate_record(model_cls, src_dict: dict) -> dict:
@@ -173,76 +283,286 @@ def translate_record(model_cls, src_dict: dict) -> dict:
     Also:
       - skips sensitive fields
       - does NOT include pk/id
+
+    All per-field decisions are precompiled (see compile_translation_plan);
+    this is a tight loop over the plan.
     """
-    model_name = model_cls.__name__
     result = {}
 
-    for field in concrete_fields_for_model(model_cls):
-        try:
-            value, skipped = build_field_value(model_name, field, src_dict)
-        except RuntimeError as e:
+    for name, copy_from_source, blank_default, action, arg in translation_plan(model_cls):
+        if copy_from_source and name in src_dict:
+            value = src_dict[name]
+            if blank_default is not _NO_DEFAULT and is_blank(value):
+                METRICS.detail(
+                    "blank_source_value",
+                    f"{model_cls.__name__}.{name}: source value is blank; "
+                    f"using explicit default {blank_default!r}",
+                )
+                value = blank_default
+            result[name] = value
+        elif action == USE_VALUE:
+            result[name] = arg
+        elif action == CALL_DEFAULT:
+            result[name] = arg()
+        elif action == FAIL:
             # Bubble this up so we fail early and loudly
-            log(f"ERROR while translating {model_name} field '{field.name}': {e}")
-            raise
+            log(f"ERROR while translating {model_cls.__name__} field '{name}': {arg}")
+            raise RuntimeError(arg)
+        # SKIP: auto-managed field, not included in result
 
-        if skipped:
-            # Sensitive or auto-managed field: don't put it in the result at all
+    return result
+
+
+def validated_blob_fields(model_cls, data: dict):
+    """
+    Split the fields of data holding deduplicated values into those whose
+    blob was already validated for this field ({name: hash}) and the rest.
+    """
+    done, pending = [], {}
+    for name, value in data.items():
+        digest = blob_of(value)
+        if digest is None:
             continue
+        if (model_cls.__name__, name, digest) in _VALIDATED_BLOBS:
+            done.append(name)
+        else:
+            pending[name] = digest
+    return done, pending
 
-        result[field.name] = value
 
-    return result
+def validate_record(model_cls, data: dict, skip=()) -> None:
+    """
+    Instantiate model_cls(**data) and run full_clean() with:
+      * validate_unique=False
+      * validate_constraints=False
+      * exclude = fields we intentionally set at load time, plus `skip`
+    With a schema manifest, the manifest's field-level checks run instead.
+    Raises ValidationError.
+    """
+    # Figure out which fields to skip during validation
+    exclude_fields = list(VALIDATION_EXCLUDE_FIELDS.get(model_cls.__name__, set()))
+    exclude_fields.extend(skip)
+
+    if isinstance(model_cls, ManifestModel):
+        model_cls.validate(data, exclude=exclude_fields)
+        return
+
+    instance = model_cls(**data)
+
+    try:
+        # Newer Django supports validate_constraints
+        instance.full_clean(
+            validate_unique=False,
+            validate_constraints=False,
+            exclude=exclude_fields,
+        )
+    except TypeError:
+        # Older Django: no validate_constraints
+        instance.full_clean(
+            validate_unique=False,
+            exclude=exclude_fields,
+        )
+
+
+def translate_one(model_cls, src: dict, idx: int, kind_label: str):
+    """
+    Translate and validate one source record.
+    Returns (data, None) on success, or (None, failure) where failure is a
+    JSON-serializable description of what went wrong.
+    """
+    model_name = model_cls.__name__
+    name = src.get("name") or f"<unnamed-{idx}>"
+    METRICS.detail("record", f"Translating {kind_label} {idx}: {name}")
 
+    try:
+        data = translate_record(model_cls, src)
+    except RuntimeError as e:
+        return None, {
+            "model": model_name,
+            "index": idx,
+            "name": name,
+            "stage": "translate",
+            "errors": {"__all__": [str(e)]},
+        }
+
+    validated_blobs, new_blobs = validated_blob_fields(model_cls, data)
+    try:
+        validate_record(model_cls, data, skip=validated_blobs)
+    except ValidationError as ve:
+        errors = getattr(ve, "message_dict", None) or {"__all__": ve.messages}
+        log(f"ValidationError for {model_name} '{name}': {errors}")
+        return None, {
+            "model": model_name,
+            "index": idx,
+            "name": name,
+            "stage": "validate",
+            "errors": errors,
+        }
+
+    _VALIDATED_BLOBS.update(
+        (model_name, name, digest) for name, digest in new_blobs.items()
+    )
+    return data, None
 
-def translate_and_validate(model_cls, records, kind_label: str):
+
+def _translate_chunk(task):
+    """
+    Process-pool entry point: translate one chunk of records in order.
+    A model_name of None marks pass-through records (tombstones).
+    """
+    model_name, kind_label, start, records = task
+    if model_name is None:
+        return [(record, None) for record in records]
+    model_cls = MODELS_BY_NAME[model_name]
+    return [
+        translate_one(model_cls, src, idx, kind_label)
+        for idx, src in enumerate(records, start=start)
+    ]
+
+
+def _translate_chunk_counted(task):
+    """
+    Worker-process variant of _translate_chunk: also returns the --quiet
+    counters the chunk added in this process, for the parent to merge.
+    """
+    METRICS.counters.clear()
+    results = _translate_chunk(task)
+    return results, dict(METRICS.counters)
+
+
+def _merge_counters(counted):
+    results, counters = counted
+    METRICS.counters.update(counters)
+    return results
+
+
+def raise_failure(failure):
+    if failure["stage"] == "translate":
+        raise RuntimeError(failure["errors"]["__all__"][0])
+    raise ValidationError(failure["errors"])
+
+
+def translate_and_validate(model_cls, records, kind_label: str, pool=None,
+                           jobs: int = 1, failures=None):
     """
     Translate a list of source dicts into a list of validated dicts for model_cls.
     For each record:
       - build a translated dict
-      - instantiate model_cls(**data)
-      - run full_clean() with:
-          * validate_unique=False
-          * validate_constraints=False
-          * exclude = fields we intentionally set at load time
+      - validate it with full_clean() (see validate_record)
+
+    pool: optional process pool; records are validated in chunks across
+          `jobs` workers and results are consumed in input order, so the
+          output is the same as a serial run.
+    failures: optional list; when given, failing records are appended to it
+          and skipped instead of raising on the first failure.
     """
-    model_name = model_cls.__name__
+    if pool is None:
+        results = (
+            translate_one(model_cls, src, idx, kind_label)
+            for idx, src in enumerate(records, start=1)
+        )
+    else:
+        # A few chunks per worker balances load without per-record IPC
+        chunk_size = max(1, len(records) // (jobs * 4))
+        tasks = [
+            (model_cls.__name__, kind_label, start + 1, records[start:start + chunk_size])
+            for start in range(0, len(records), chunk_size)
+        ]
+        results = (
+            result
+            for counted in pool.map(_translate_chunk_counted, tasks)
+            for result in _merge_counters(counted)
+        )
+
     output = []
+    for data, failure in results:
+        if failure is None:
+            output.append(data)
+        elif failures is None:
+            raise_failure(failure)
+        else:
+            failures.append(failure)
 
-    for idx, src in enumerate(records, start=1):
-        name = src.get("name") or f"<unnamed-{idx}>"
-        log(f"Translating {kind_label} {idx}: {name}")
+    return output
 
-        data = translate_record(model_cls, src)
 
-        instance = model_cls(**data)
+def _iter_stream_tasks(pairs, chunk_size: int):
+    """
+    Group consecutive (payload_key, record) pairs into _translate_chunk tasks
+    of at most chunk_size records. Yields (payload_key, task).
+    """
+    counters = {}
+    key, chunk, start = None, [], 1
+
+    def make_task():
+        if key == DELETED_KEY:
+            return key, (None, key, start, chunk)
+        model_cls, kind_label = PAYLOAD_MODELS[key]
+        return key, (model_cls.__name__, kind_label, start, chunk)
+
+    for payload_key, record in pairs:
+        if payload_key != DELETED_KEY and payload_key not in PAYLOAD_MODELS:
+            if payload_key not in counters:
+                log(f"Ignoring records of unknown type {payload_key!r}")
+                counters[payload_key] = 0
+            continue
+        if payload_key != key or len(chunk) >= chunk_size:
+            if chunk:
+                yield make_task()
+            key, chunk = payload_key, []
+            start = counters.get(key, 0) + 1
+        chunk.append(record)
+        counters[key] = counters.get(key, 0) + 1
 
-        # Figure out which fields to skip during validation
-        exclude_fields = list(VALIDATION_EXCLUDE_FIELDS.get(model_name, set()))
+    if chunk:
+        yield make_task()
 
-        try:
-            try:
-                # Newer Django supports validate_constraints
-                instance.full_clean(
-                    validate_unique=False,
-                    validate_constraints=False,
-                    exclude=exclude_fields,
-                )
-            except TypeError:
-                # Older Django: no validate_constraints
-                instance.full_clean(
-                    validate_unique=False,
-                    exclude=exclude_fields,
-                )
-        except ValidationError as ve:
-            log(
-                f"ValidationError for {model_name} '{name}': "
-                f"{getattr(ve, 'message_dict', ve)}"
-            )
-            raise
 
-        output.append(data)
+def _ordered_pool_map(pool, fn, keyed_tasks, window: int):
+    """
+    Like pool.map over (key, task) pairs, yielding (key, result) in order,
+    but pulling tasks lazily with at most `window` in flight, so a streamed
+    input is never materialized.
+    """
+    pending = deque()
+    for key, task in keyed_tasks:
+        pending.append((key, pool.submit(fn, task)))
+        if len(pending) >= window:
+            key, future = pending.popleft()
+            yield key, future.result()
+    while pending:
+        key, future = pending.popleft()
+        yield key, future.result()
+
+
+def iter_translated(pairs, pool=None, jobs: int = 1, chunk_size: int = 100,
+                    failures=None):
+    """
+    Translate and validate a stream of (payload_key, record) pairs, yielding
+    (payload_key, data) in input order. Tombstones pass through unchanged.
 
-    return output
+    Serially, one record is held at a time. With a pool, at most
+    2 * jobs chunks of chunk_size records are in flight. `failures` has the
+    same meaning as in translate_and_validate.
+    """
+    if pool is None:
+        tasks = _iter_stream_tasks(pairs, 1)
+        results = ((key, _translate_chunk(task)) for key, task in tasks)
+    else:
+        tasks = _iter_stream_tasks(pairs, chunk_size)
+        counted = _ordered_pool_map(
+            pool, _translate_chunk_counted, tasks, window=jobs * 2
+        )
+        results = ((key, _merge_counters(chunk)) for key, chunk in counted)
+
+    for key, chunk in results:
+        for data, failure in chunk:
+            if failure is None:
+                yield key, data
+            elif failures is None:
+                raise_failure(failure)
+            else:
+                failures.append(failure)
 
 
 # -------------------------------------------------------------------
@@ -270,19 +590,244 @@ def parse_args():
         default="./migration/load.json",
         help="Path to output load JSON (default: ./migration/load.json)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--export-schema",
+        dest="export_schema_path",
+        metavar="PATH",
+        help="Write the current models' field metadata and validators to a "
+             "versioned schema manifest at PATH and exit (needs Django).",
+    )
+    parser.add_argument(
+        "--schema",
+        dest="schema_path",
+        metavar="PATH",
+        help="Translate against a schema manifest from --export-schema "
+             "instead of the Django models; Django is not imported.",
+    )
+    parser.add_argument(
+        "--full-clean",
+        dest="full_clean",
+        action="store_true",
+        help="With --schema: validate with Django's full_clean() anyway "
+             "(bootstraps Django as without --schema).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Validate records in N worker processes (default: 1). "
+             "Output order is the same as a serial run.",
+    )
+    parser.add_argument(
+        "--collect-errors",
+        dest="error_report",
+        metavar="REPORT_PATH",
+        help="Validate every record instead of stopping at the first "
+             "failure, and write all failures to REPORT_PATH as JSON. "
+             "If any record fails, load.json is not written and the exit "
+             "status is 1.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse the input incrementally and write each record as soon as "
+             "it is translated and validated, so memory is bounded by a "
+             "single record (or by the in-flight chunks with --jobs). "
+             "Accepts every input layout (JSON, JSON Lines, msgpack).",
+    )
+    parser.add_argument(
+        "--output-format",
+        dest="output_format",
+        choices=FORMATS,
+        default="json",
+        help="Layout of the output: json, jsonl (JSON Lines) or msgpack "
+             "(binary, needs the 'msgpack' package) (default: json)",
+    )
+    parser.add_argument(
+        "--dedup-blobs",
+        dest="dedup_blobs",
+        action="store_true",
+        help="Store large JSON values that repeat across records once and "
+             "refer to them by hash in the output (load.py resolves them)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        dest="chunk_size",
+        type=int,
+        default=100,
+        help="Records per worker task with --stream --jobs (default: 100)",
+    )
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be a positive integer.")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be a positive integer.")
+    return args
+
+
+def write_error_report(report_path: str, src_path: str, failures) -> None:
+    counts = {}
+    for failure in failures:
+        counts[failure["model"]] = counts.get(failure["model"], 0) + 1
+
+    report_dir = os.path.dirname(report_path)
+    if report_dir:
+        os.makedirs(report_dir, exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(
+            {
+                "input": src_path,
+                "failed": len(failures),
+                "failed_by_model": counts,
+                "failures": failures,
+            },
+            f,
+            indent=2,
+        )
+    log(f"Wrote error report with {len(failures)} failures to {report_path}")
+
+
+def translate_stream(args) -> None:
+    """
+    --stream: read, translate, validate and write one record at a time.
+    The output goes to a temp file that is only published on success.
+    """
+    src_path = args.input_path
+    dst_path = args.output_path
+    failures = [] if args.error_report else None
+    counts = {}
+
+    dst_dir = os.path.dirname(dst_path)
+    if dst_dir:
+        os.makedirs(dst_dir, exist_ok=True)
+
+    pool = make_pool(args)
+    try:
+        binary = args.output_format == "msgpack"
+        with AtomicArtifactWriter([dst_path], binary=binary) as f:
+            writer = open_writer(
+                f,
+                args.output_format,
+                dedup_blobs=args.dedup_blobs,
+                always_include=PAYLOAD_KEYS,
+            )
+
+            for key, data in iter_translated(
+                iter_payload(src_path),
+                pool=pool,
+                jobs=args.jobs,
+                chunk_size=args.chunk_size,
+                failures=failures,
+            ):
+                writer.write(key, data)
+                counts[key] = counts.get(key, 0) + 1
+
+            for key, count in counts.items():
+                if key in PAYLOAD_MODELS:
+                    METRICS.add_rows(PAYLOAD_MODELS[key][0].__name__, count)
+
+            writer.close()
+            if args.dedup_blobs:
+                log(f"Deduplicated: {writer.encoder.summary()}")
+
+            if failures:
+                # Raising inside the writer discards the partial output
+                write_error_report(args.error_report, src_path, failures)
+                raise SystemExit(
+                    f"{len(failures)} records failed translation/validation; "
+                    f"see {args.error_report}. {dst_path} was not written."
+                )
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if failures is not None:
+        write_error_report(args.error_report, src_path, failures)
+
+    summary = ", ".join(f"{count} {key}" for key, count in counts.items())
+    log(f"Streamed {summary or 'no records'} from {src_path}")
+    log(f"Wrote translated, validated data to {dst_path}")
+
+
+def make_pool(args):
+    """Process pool for --jobs; workers initialize the same model backend."""
+    if args.jobs <= 1:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=args.jobs,
+        initializer=_init_worker,
+        initargs=(args.schema_path, args.full_clean, args.quiet),
+    )
+
+
+def _init_worker(schema_path, full_clean, quiet):
+    METRICS.quiet = quiet
+    init_backend(schema_path, full_clean)
+
+
+def write_schema(path: str) -> None:
+    manifest = export_schema(setup_django())
+
+    schema_dir = os.path.dirname(path)
+    if schema_dir:
+        os.makedirs(schema_dir, exist_ok=True)
+    with AtomicArtifactWriter([path]) as f:
+        json.dump(manifest, f, indent=2)
+
+    for model_name, spec in manifest["models"].items():
+        log(f"{model_name}: {len(spec['fields'])} fields")
+    log(f"Wrote schema manifest {manifest['fingerprint'][:12]} to {path}")
+
+
+def report_backend(args) -> None:
+    if args.schema_path is None or args.full_clean:
+        log("Validating with Django models and full_clean().")
+        return
+
+    log(f"Validating against schema manifest {args.schema_path} (no Django).")
+    for model in MODELS_BY_NAME.values():
+        for field in model.fields:
+            unsupported = field.unsupported_validators
+            if unsupported:
+                log(
+                    f"{model.__name__}.{field.name}: validators not checked "
+                    f"without Django: {', '.join(unsupported)} "
+                    "(use --full-clean to enforce them)"
+                )
 
 
 def main():
     args = parse_args()
+    METRICS.configure(args)
+    with METRICS.run():
+        run(args)
+
+
+def run(args):
     src_path = args.input_path
     dst_path = args.output_path
 
+    if args.export_schema_path:
+        write_schema(args.export_schema_path)
+        return
+
+    with METRICS.phase("setup"):
+        init_backend(args.schema_path, args.full_clean)
+    report_backend(args)
+
     if not os.path.exists(src_path):
         raise SystemExit(f"Source file not found: {src_path}")
 
-    with open(src_path, "r") as f:
-        src = json.load(f)
+    if args.stream:
+        with METRICS.phase("stream"):
+            translate_stream(args)
+        return
+
+    # Accepts both the JSON layout and the streamed JSONL layout
+    with METRICS.phase("read"):
+        src = load_payload(src_path)
 
     src_auths = src.get("authenticators", [])
     src_sps = src.get("search_providers", [])
@@ -294,19 +839,65 @@ def main():
         f"{len(src_ais)} AI providers from {src_path}"
     )
 
-    dst_auths = translate_and_validate(Authenticator, src_auths, "authenticator")
-    dst_sps = translate_and_validate(SearchProvider, src_sps, "search provider")
-    dst_ais = translate_and_validate(AIProvider, src_ais, "AI provider")
-
-    dst = {
-        "authenticators": dst_auths,
-        "search_providers": dst_sps,
-        "ai_providers": dst_ais,
-    }
+    failures = [] if args.error_report else None
+    pool = make_pool(args)
+    try:
+        options = {"pool": pool, "jobs": args.jobs, "failures": failures}
+        dst = {}
+        for payload_key, records in (
+            ("authenticators", src_auths),
+            ("search_providers", src_sps),
+            ("ai_providers", src_ais),
+        ):
+            model_cls, kind_label = PAYLOAD_MODELS[payload_key]
+            with METRICS.phase("translate"), METRICS.model(model_cls.__name__):
+                dst[payload_key] = translate_and_validate(
+                    model_cls, records, kind_label, **options
+                )
+            METRICS.add_rows(model_cls.__name__, len(dst[payload_key]))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if failures is not None:
+        write_error_report(args.error_report, src_path, failures)
+        if failures:
+            raise SystemExit(
+                f"{len(failures)} records failed translation/validation; "
+                f"see {args.error_report}. {dst_path} was not written."
+            )
 
-    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-    with open(dst_path, "w") as f:
-        json.dump(dst, f, indent=2)
+    # Tombstones from an incremental extract pass through untouched; load.py
+    # matches them by name.
+    deleted = src.get(DELETED_KEY, [])
+    if deleted:
+        log(f"Passing through {len(deleted)} deletion tombstones")
+        dst[DELETED_KEY] = deleted
+
+    encoder = None
+    if args.dedup_blobs and args.output_format == "json":
+        encoder = BlobEncoder()
+        dst = encoder.encode_payload(dst)
+
+    with METRICS.phase("write"):
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        if args.output_format == "json":
+            with open(dst_path, "w") as f:
+                json.dump(dst, f, indent=2)
+        else:
+            binary = args.output_format == "msgpack"
+            with AtomicArtifactWriter([dst_path], binary=binary) as f:
+                writer = open_writer(
+                    f, args.output_format, dedup_blobs=args.dedup_blobs
+                )
+                for key, records in dst.items():
+                    for record in records:
+                        writer.write(key, record)
+                writer.close()
+            if args.dedup_blobs:
+                encoder = writer.encoder
+    if encoder is not None:
+        log(f"Deduplicated: {encoder.summary()}")
 
     log(f"Wrote translated, validated data to {dst_path}")
 
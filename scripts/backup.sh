@@ -28,6 +28,33 @@ export WORKING_DIR=/tmp/backup.$DATESTAMP
 export SQL_DUMP_ENV_FILE=sql/$SQL_DATABASE-$DATESTAMP.sql
 export TAR_FILE=swirl-backup-$DATESTAMP.tar.gz
 
+# --pipeline options (see usage)
+PIPELINE=false
+JOBS=$(nproc 2>/dev/null || echo 4)
+COMPRESSOR=auto
+# directory-format dump used by --pipeline and --incremental, and the archive
+# being written. The dump goes under BACKUP_DIR, which the archive and the
+# incremental scan leave out, rather than into /tmp.
+export SQL_DUMP_DIR=sql/$SQL_DATABASE-$DATESTAMP.dir
+export DUMP_ROOT=$BACKUP_DIR/.dump.$DATESTAMP
+ARCHIVE_PART=""
+
+# --incremental store: one encrypted object per distinct file content, named
+# by its sha256, and one encrypted manifest per backup listing every entry
+INCREMENTAL=false
+PRUNE_KEEP=""
+export STORE_DIR=$BACKUP_DIR/store
+MANIFEST_HEADER="# swirl-incremental-manifest v1"
+# Manifest names sort in time order, to the second
+MANIFEST_NAME=swirl-backup-$(date +%Y%m%dT%H%M%S).manifest.gpg
+# Known text encrypted with the store's passphrase, to detect a changed one
+STORE_KEY_CHECK=$STORE_DIR/key-check.gpg
+STORE_KEY_TEXT="swirl-incremental-store v1"
+# Held by backups and prunes using the store, for as long as the script runs
+STORE_LOCKED=false
+# find -printf fields: type, mode, uid, gid, mtime, size, symlink target, path
+FIND_FORMAT='%y\t%m\t%U\t%G\t%T@\t%s\t%l\t%p\n'
+
 # ----------------------
 # Functions
 # ----------------------
@@ -41,13 +68,33 @@ function error() {
     exit 1
 }
 
+function usage() {
+    echo "Usage: $0 [--pipeline [--compressor auto|zstd|pigz|gzip] | --incremental] [--jobs N] [--prune KEEP]"
+    echo "  --pipeline     dump the database in parallel and stream it with the file set through"
+    echo "                 tar, a multi-threaded compressor and gpg into $BACKUP_DIR (nothing"
+    echo "                 is written to /tmp)"
+    echo "  --incremental  store only new or changed files (and database dump files) in $STORE_DIR,"
+    echo "                 plus a manifest; restore.sh takes the manifest to restore that backup"
+    echo "  --jobs N       pg_dump, compressor and encryption jobs (default: number of CPUs)"
+    echo "  --compressor   auto picks zstd, then pigz, then gzip (default: auto)"
+    echo "  --prune KEEP   keep the newest KEEP incremental backups and delete objects no other"
+    echo "                 backup uses; without --incremental, only prunes (Swirl keeps running)."
+    echo "                 Waits for a running incremental backup; stops if a manifest cannot be decrypted"
+    echo "Disk space: --pipeline and --incremental need room in $BACKUP_DIR for the database dump"
+    echo "(lightly compressed, about the size of the default mode's dump, deleted afterwards) plus"
+    echo "the archive, or the new and changed files with --incremental."
+}
+
 # Clean up on errors
 function cleanup() {
-    rm -rf $WORKING_DIR
-    if [ -d $WORKING_DIR ]; then
-        error "Failed to clean up working directory $WORKING_DIR"
+    if [ -n "$ARCHIVE_PART" ]; then
+        rm -f "$ARCHIVE_PART"
+    fi
+    rm -rf $WORKING_DIR $DUMP_ROOT
+    if [ -d $WORKING_DIR ] || [ -d $DUMP_ROOT ]; then
+        error "Failed to clean up working directories $WORKING_DIR and $DUMP_ROOT"
     else
-        info "Cleaned up working directory $WORKING_DIR"
+        info "Cleaned up working directories $WORKING_DIR and $DUMP_ROOT"
     fi
 }
 
@@ -78,6 +125,299 @@ function backup_files() {
   rsync -rvlHtogpc --exclude='backups/*' $PARENT_DIR $FILE_BACKUP_DIR
 }
 
+function backup_db_parallel() {
+    # start postgres
+    if [ "$USE_LOCAL_POSTGRES" == "true" ]; then
+        info "Starting local Postgres."
+        pushd $PARENT_DIR
+        COMPOSE_PROFILES=db docker compose up --pull never -d
+        popd
+        info "Started local Postgres."
+        sleep 15
+    fi
+
+    # Lightly compressed, so the dump stays about the size of the -F c dump;
+    # the stream compressor gets little more out of it
+    info "Starting parallel backup ($JOBS jobs) of $SQL_DATABASE to $SQL_DUMP_DIR"
+    docker run --rm \
+      --network=swirl_network \
+      -e PGPASSWORD=$SQL_PASSWORD \
+      -v $DUMP_ROOT/sql:/dump \
+      postgres:15 \
+      pg_dump -h postgres -U postgres -d swirl -F d -j $JOBS -Z 1 -f /dump/$(basename $SQL_DUMP_DIR)
+}
+
+function select_compressor() {
+  if [ "$COMPRESSOR" == "auto" ]; then
+    for candidate in zstd pigz gzip; do
+      if command -v $candidate > /dev/null; then
+        COMPRESSOR=$candidate
+        break
+      fi
+    done
+  fi
+  if ! command -v $COMPRESSOR > /dev/null; then
+    error "Compressor $COMPRESSOR is not installed."
+  fi
+
+  case "$COMPRESSOR" in
+    zstd) COMPRESS_CMD="zstd -q -T$JOBS"; TAR_FILE=swirl-backup-$DATESTAMP.tar.zst ;;
+    pigz) COMPRESS_CMD="pigz -p $JOBS"; TAR_FILE=swirl-backup-$DATESTAMP.tar.gz ;;
+    gzip) COMPRESS_CMD="gzip"; TAR_FILE=swirl-backup-$DATESTAMP.tar.gz ;;
+    *) usage; error "Unknown compressor $COMPRESSOR" ;;
+  esac
+  info "Compressing with: $COMPRESS_CMD"
+}
+
+function package_stream() {
+  # Same archive layout as package_archive (sql/ plus the install path relative
+  # to /), so restore.sh handles both; written once, straight into BACKUP_DIR.
+  local relative_dir=${PARENT_DIR#/}
+  ARCHIVE_PART=$BACKUP_DIR/.$TAR_FILE.gpg.part
+  : ${ENCRYPTION_PASSWORD:="$ADMIN_PASSWORD"}
+
+  info "Streaming $SQL_DUMP_DIR and $PARENT_DIR through tar, $COMPRESSOR and gpg"
+  # The data is on stdin, so gpg reads the passphrase from fd 3
+  set -o pipefail
+  if ! tar -cf - \
+      -C $DUMP_ROOT sql \
+      -C / --exclude="$relative_dir/backups/*" "$relative_dir" \
+    | $COMPRESS_CMD \
+    | gpg --batch --yes --pinentry-mode loopback --passphrase-fd 3 \
+        --symmetric --cipher-algo AES256 --compress-algo none \
+        --output "$ARCHIVE_PART" 3<<< "$ENCRYPTION_PASSWORD"; then
+    set +o pipefail
+    cleanup
+    error "Streaming the backup archive failed"
+  fi
+  set +o pipefail
+
+  mv "$ARCHIVE_PART" $BACKUP_DIR/$TAR_FILE.gpg
+  ARCHIVE_PART=""
+  info "Backup of $SQL_DATABASE and fileset completed successfully"
+  info "   Archive file: $BACKUP_DIR/$TAR_FILE.gpg"
+}
+
+# Backups and prunes must not overlap: a prune would delete objects (and
+# .part files) that a running backup has stored but not yet listed in a manifest
+function lock_store() {
+  if [ "$STORE_LOCKED" == "true" ]; then
+    return 0
+  fi
+  mkdir -p $STORE_DIR
+  exec 9> $STORE_DIR/.lock
+  if ! flock -n 9; then
+    info "Waiting for another backup or prune of $STORE_DIR to finish"
+    flock 9
+  fi
+  STORE_LOCKED=true
+}
+
+# Newest manifest in the store, by name
+function latest_manifest() {
+  ls $STORE_DIR/manifests/*.manifest.gpg 2>/dev/null | sort | tail -n 1
+}
+
+# Objects are reused by content hash alone, so every object and manifest in
+# the store must use the same passphrase. Checked before Swirl is stopped.
+function check_store() {
+  local latest
+  : ${ENCRYPTION_PASSWORD:="$ADMIN_PASSWORD"}
+  lock_store
+  mkdir -p $STORE_DIR/objects $STORE_DIR/manifests
+  if [ -f $STORE_KEY_CHECK ]; then
+    if [ "$(decrypt_file $STORE_KEY_CHECK 2>/dev/null)" != "$STORE_KEY_TEXT" ]; then
+      error "ENCRYPTION_PASSWORD (or ADMIN_PASSWORD) is not the passphrase of the store in $STORE_DIR. Use the original passphrase, or move the store aside to start a new one."
+    fi
+  else
+    # Stores from before the key check: the latest manifest must decrypt
+    latest=$(latest_manifest)
+    if [ -n "$latest" ] && ! decrypt_file "$latest" > /dev/null 2>&1; then
+      error "ENCRYPTION_PASSWORD (or ADMIN_PASSWORD) cannot decrypt $(basename $latest). Use the original passphrase, or move the store aside to start a new one."
+    fi
+    echo "$STORE_KEY_TEXT" \
+      | gpg --batch --yes --pinentry-mode loopback --passphrase-fd 3 \
+          --symmetric --cipher-algo AES256 \
+          --output "$STORE_KEY_CHECK.part" 3<<< "$ENCRYPTION_PASSWORD"
+    mv "$STORE_KEY_CHECK.part" $STORE_KEY_CHECK
+  fi
+  if [ -e $STORE_DIR/manifests/$MANIFEST_NAME ]; then
+    error "Manifest $MANIFEST_NAME already exists; not overwriting it"
+  fi
+}
+
+function decrypt_file() {
+  gpg --batch --yes --quiet --pinentry-mode loopback --passphrase-fd 3 \
+    --decrypt "$1" 3<<< "$ENCRYPTION_PASSWORD"
+}
+
+# Encrypt one file into the store under its content hash, unless it is there
+# already. Runs in parallel under xargs: store_object HASH SOURCE
+function store_object() {
+  local object=$STORE_DIR/objects/${1:0:2}/$1.gpg
+  if [ -f "$object" ]; then
+    return 0
+  fi
+  set -o pipefail
+  mkdir -p "$(dirname "$object")"
+  if ! gzip -c "$2" \
+    | gpg --batch --yes --pinentry-mode loopback --passphrase-fd 3 \
+        --symmetric --cipher-algo AES256 --compress-algo none \
+        --output "$object.part" 3<<< "$ENCRYPTION_PASSWORD"; then
+    rm -f "$object.part"
+    echo "[$(date +%Y-%m-%dT%H:%M:%S) ERROR] Could not store $2" >&2
+    return 1
+  fi
+  mv "$object.part" "$object"
+  echo "$1"
+}
+
+function backup_incremental() {
+  local relative_dir=${PARENT_DIR#/}
+  local previous=$WORKING_DIR/previous.tsv
+  local listing=$WORKING_DIR/listing.tsv
+  local hashes=$WORKING_DIR/hashes.txt
+  local draft=$WORKING_DIR/draft.tsv
+  local manifest_part=$STORE_DIR/manifests/.$MANIFEST_NAME.part
+  : ${ENCRYPTION_PASSWORD:="$ADMIN_PASSWORD"}
+  export ENCRYPTION_PASSWORD
+  export -f store_object
+  check_store
+
+  # Files whose size and mtime match the latest manifest keep their hash unread
+  : > $previous
+  local latest to_hash stored
+  latest=$(latest_manifest)
+  if [ -n "$latest" ]; then
+    info "Comparing with previous backup $(basename $latest)"
+    decrypt_file "$latest" > $previous
+  fi
+
+  # Same layout as the archives: sql/ plus the install path relative to /.
+  # Each line starts with the directory its path is relative to.
+  info "Scanning $PARENT_DIR and $SQL_DUMP_DIR"
+  (cd $DUMP_ROOT && find sql -printf "$DUMP_ROOT\t$FIND_FORMAT") > $listing
+  (cd / && find "$relative_dir" -path "$relative_dir/backups/*" -prune -o -printf "/\t$FIND_FORMAT") >> $listing
+
+  # draft: root, type, mode, uid, gid, mtime, size, hash ("-" = to hash) or link target, path
+  awk -v prev=$previous -v todo=$WORKING_DIR/todo.txt '
+    BEGIN {
+      FS = OFS = "\t"
+      while ((getline line < prev) > 0) {
+        split(line, p, "\t")
+        if (p[1] == "f") known[p[8]] = p[5] FS p[6] FS p[7]
+      }
+    }
+    {
+      root = $1; type = $2; path = $9
+      if (type == "f") {
+        if ((path in known) && split(known[path], k, "\t") && k[1] == $6 && k[2] == $7) {
+          value = k[3]
+        } else {
+          value = "-"
+          print (root == "/" ? "" : root) "/" path > todo
+        }
+      } else if (type == "l") {
+        value = $8
+      } else if (type == "d") {
+        value = "-"
+      } else {
+        next
+      }
+      print root, type, $3, $4, $5, $6, $7, value, path
+    }' $listing > $draft
+  touch $WORKING_DIR/todo.txt
+
+  to_hash=$(wc -l < $WORKING_DIR/todo.txt)
+  info "Hashing $to_hash new or changed files ($(wc -l < $draft) entries)"
+  tr '\n' '\0' < $WORKING_DIR/todo.txt | xargs -0 -r -n 64 -P $JOBS sha256sum > $hashes
+
+  # Final manifest, and one "hash<TAB>source" line per distinct content
+  awk -v hashes=$hashes -v manifest=$WORKING_DIR/manifest.tsv -v sources=$WORKING_DIR/sources.tsv '
+    BEGIN {
+      FS = OFS = "\t"
+      while ((getline line < hashes) > 0) hashed[substr(line, 67)] = substr(line, 1, 64)
+    }
+    {
+      source = ($1 == "/" ? "" : $1) "/" $9
+      if ($2 == "f" && $8 == "-") $8 = hashed[source]
+      if ($2 == "f" && !($8 in seen)) { seen[$8] = 1; print $8, source > sources }
+      print $2, $3, $4, $5, $6, $7, $8, $9 > manifest
+    }' $draft
+  touch $WORKING_DIR/sources.tsv
+
+  info "Encrypting new objects into $STORE_DIR/objects"
+  set -o pipefail
+  stored=$(
+    while IFS=$'\t' read -r hash source; do
+      if [ ! -f "$STORE_DIR/objects/${hash:0:2}/$hash.gpg" ]; then
+        printf '%s\0%s\0' "$hash" "$source"
+      fi
+    done < $WORKING_DIR/sources.tsv \
+      | xargs -0 -r -n 2 -P $JOBS bash -c 'store_object "$1" "$2"' _ \
+      | wc -l
+  )
+  set +o pipefail
+
+  # The manifest goes last, so it never refers to a missing object
+  ARCHIVE_PART=$manifest_part
+  (echo "$MANIFEST_HEADER"; cat $WORKING_DIR/manifest.tsv) \
+    | gpg --batch --yes --pinentry-mode loopback --passphrase-fd 3 \
+        --symmetric --cipher-algo AES256 \
+        --output "$manifest_part" 3<<< "$ENCRYPTION_PASSWORD"
+  # A hard link never replaces an existing manifest
+  ln "$manifest_part" $STORE_DIR/manifests/$MANIFEST_NAME
+  rm -f "$manifest_part"
+  ARCHIVE_PART=""
+
+  info "Incremental backup completed: $stored new objects of $(wc -l < $WORKING_DIR/sources.tsv) distinct files"
+  info "   Manifest: $STORE_DIR/manifests/$MANIFEST_NAME"
+}
+
+function prune_store() {
+  local keep=$1
+  : ${ENCRYPTION_PASSWORD:="$ADMIN_PASSWORD"}
+  if [ ! -d $STORE_DIR/manifests ]; then
+    info "No incremental store at $STORE_DIR; nothing to prune"
+    return 0
+  fi
+  lock_store
+
+  # Objects are shared between backups: only delete those no kept manifest
+  # uses. Every kept manifest must be readable, or its objects would be lost.
+  local manifest kept listing referenced removed
+  kept=$(ls $STORE_DIR/manifests/*.manifest.gpg 2>/dev/null | sort -r | head -n $keep)
+  listing=$(mktemp)
+  referenced=$(mktemp)
+  for manifest in $kept; do
+    if ! decrypt_file "$manifest" > $listing \
+        || [ "$(head -n 1 $listing)" != "$MANIFEST_HEADER" ]; then
+      rm -f $listing $referenced
+      error "Could not read $(basename $manifest) (wrong ENCRYPTION_PASSWORD?); nothing was pruned"
+    fi
+    awk -F '\t' '$1 == "f" { print $7 }' $listing >> $referenced
+  done
+  sort -u -o $referenced $referenced
+  rm -f $listing
+
+  for manifest in $(ls $STORE_DIR/manifests/*.manifest.gpg 2>/dev/null | sort -r | tail -n +$((keep + 1))); do
+    info "Removing backup $(basename $manifest)"
+    rm -f "$manifest"
+  done
+
+  removed=$(
+    find $STORE_DIR/objects -type f -name '*.gpg' -printf '%f\n' | sed 's/\.gpg$//' | sort \
+      | comm -23 - $referenced \
+      | while read -r hash; do
+          rm -f "$STORE_DIR/objects/${hash:0:2}/$hash.gpg"
+          echo "$hash"
+        done | wc -l
+  )
+  find $STORE_DIR -name '*.part' -type f -delete
+  rm -f $referenced
+  info "Pruned $removed unreferenced objects; kept the newest $keep backups"
+}
+
 function package_archive() {
   info "Compressing $WORKING_DIR into $TAR_FILE"
   tar cfz $TAR_FILE *
@@ -105,21 +445,61 @@ function check_environment() {
   # Create directories
   mkdir -p $BACKUP_DIR
   mkdir -p $WORKING_DIR/sql
+  if [ "$PIPELINE" == "true" ] || [ "$INCREMENTAL" == "true" ]; then
+    mkdir -p $DUMP_ROOT/sql
+  fi
 }
 
 # ----------------------
 # Main
 # ----------------------
 
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --pipeline) PIPELINE=true ;;
+    --incremental) INCREMENTAL=true ;;
+    --prune) PRUNE_KEEP="$2"; shift ;;
+    -j|--jobs) JOBS="$2"; shift ;;
+    --compressor) COMPRESSOR="$2"; shift ;;
+    -h|--help) usage; exit 0 ;;
+    *) usage; error "Unknown argument $1" ;;
+  esac
+  shift
+done
+
+if [ "$PIPELINE" == "true" ] && [ "$INCREMENTAL" == "true" ]; then
+  usage
+  error "--pipeline and --incremental cannot be combined"
+fi
+if [ -n "$PRUNE_KEEP" ] && ! [[ "$PRUNE_KEEP" =~ ^[1-9][0-9]*$ ]]; then
+  error "--prune needs the number of backups to keep (at least 1)"
+fi
+if [ "$PIPELINE" == "true" ]; then
+  select_compressor
+fi
+
+# Pruning alone does not need a consistent snapshot, so Swirl keeps running
+if [ -n "$PRUNE_KEEP" ] && [ "$INCREMENTAL" != "true" ]; then
+  prune_store $PRUNE_KEEP
+  exit 0
+fi
+
 # print environment variables
 info "Environment variables:"
 info "  BACKUP_DIR: $BACKUP_DIR"
 info "  DATESTAMP: $DATESTAMP"
 info "  ENV_FILE: $ENV_FILE"
 info "  WORKING_DIR: $WORKING_DIR"
+info "  DUMP_ROOT: $DUMP_ROOT"
 info "  SQL_DUMP_ENV_FILE: $SQL_DUMP_ENV_FILE"
 info "  TAR_FILE: $TAR_FILE"
+info "  PIPELINE: $PIPELINE"
+info "  INCREMENTAL: $INCREMENTAL"
 
+# Store problems must stop the backup before Swirl is stopped
+if [ "$INCREMENTAL" == "true" ]; then
+  check_store
+fi
 
 trap 'cleanup' ERR
 
@@ -128,10 +508,22 @@ trap 'cleanup' ERR
 systemctl stop swirl
 
 check_environment
-backup_db
-backup_files
-package_archive
+if [ "$INCREMENTAL" == "true" ]; then
+  backup_db_parallel
+  backup_incremental
+elif [ "$PIPELINE" == "true" ]; then
+  backup_db_parallel
+  package_stream
+else
+  backup_db
+  backup_files
+  package_archive
+fi
 cleanup
 
 # Restart SWIRL service
-systemctl start swirl
\ No newline at end of file
+systemctl start swirl
+
+if [ -n "$PRUNE_KEEP" ]; then
+  prune_store $PRUNE_KEEP
+fi
\ No newline at end of file
@@ -11,6 +11,9 @@ export PARENT_DIR PARENT_DIR_NAME
 WORKING_DIR=/tmp/backup$(basename "$BACKUP_FILE"| sed 's/\.tar\.gz$//')
 export WORKING_DIR
 
+# pg_restore jobs for directory-format dumps from backup.sh --pipeline
+RESTORE_JOBS=${RESTORE_JOBS:-$(nproc 2>/dev/null || echo 4)}
+
 # ----------------------
 # Functions
 # ----------------------
@@ -45,13 +48,21 @@ restore_db() {
         sleep 15
     fi
 
-  # Locate the latest SQL dump file
-  DUMPFILE=$(ls -rt $WORKING_DIR/sql/swirl*sql|tail -n 1)
+  # Locate the latest SQL dump: a custom-format file, or a directory-format
+  # dump (backup.sh --pipeline)
+  DUMPFILE=$(ls -drt $WORKING_DIR/sql/swirl*sql $WORKING_DIR/sql/swirl*.dir 2>/dev/null|tail -n 1)
   if [ -z "$DUMPFILE" ]; then
     find $WORKING_DIR/sql
     error "No SQL dump file found in $WORKING_DIR/sql"
   fi
 
+  if [ -d "$DUMPFILE" ]; then
+    FORMAT_FLAGS="-F d -j $RESTORE_JOBS"
+    info "Directory-format dump, restoring with $RESTORE_JOBS jobs"
+  else
+    FORMAT_FLAGS=""
+  fi
+
   # Check if the database has user tables
   TABLE_COUNT=$(docker run --rm \
     --network=swirl_network \
@@ -76,7 +87,7 @@ restore_db() {
     -e DUMPFILE=$DUMPFILE \
     -v $WORKING_DIR:/$WORKING_DIR \
     postgres:15 \
-    pg_restore $CLEAN_FLAG -h postgres -U postgres -d swirl -c $DUMPFILE
+    pg_restore $CLEAN_FLAG $FORMAT_FLAGS -h postgres -U postgres -d swirl -c $DUMPFILE
 }
 
 function check_environment() {
@@ -95,14 +106,79 @@ function unpack_archive() {
   : ${ENCRYPTION_PASSWORD:="$ADMIN_PASSWORD"}
 
 
+  # backup.sh --pipeline with zstd writes .tar.zst.gpg; everything else is gzip
+  case "$BACKUP_FILE" in
+    *.tar.zst.gpg) DECOMPRESS_CMD="zstd -d -q" ;;
+    *) DECOMPRESS_CMD="gzip -d" ;;
+  esac
+
   mkdir -p $WORKING_DIR
-  info "Decrypting backup file $BACKUP_FILE in $WORKING_DIR"
+  info "Decrypting and unpacking backup file $BACKUP_FILE in $WORKING_DIR"
+  # Streamed, so no decrypted copy of the archive is written
+  set -o pipefail
   gpg --batch --yes \
     --passphrase "$ENCRYPTION_PASSWORD" \
-    --output $WORKING_DIR/backup.tar.gz --decrypt $BACKUP_FILE
+    --decrypt $BACKUP_FILE \
+    | $DECOMPRESS_CMD \
+    | tar xvf - -C $WORKING_DIR
+  set +o pipefail
   pushd $WORKING_DIR
-  tar xvfz $WORKING_DIR/backup.tar.gz
 }
+# Decrypt one object of the incremental store to a file. Runs in parallel
+# under xargs: restore_object OBJECT TARGET
+function restore_object() {
+  set -o pipefail
+  gpg --batch --yes --quiet --passphrase "$ENCRYPTION_PASSWORD" --decrypt "$1" \
+    | gzip -d > "$2"
+}
+
+# Rebuild the backup described by an incremental manifest (backup.sh
+# --incremental) in the working directory, with the same layout as an archive
+function unpack_manifest() {
+  : ${ENCRYPTION_PASSWORD:="$ADMIN_PASSWORD"}
+  export ENCRYPTION_PASSWORD
+  export -f restore_object
+  local store_dir=$(dirname "$(dirname "$BACKUP_FILE")")
+  local manifest=/tmp/restore-manifest.$$.tsv
+
+  mkdir -p $WORKING_DIR
+  info "Decrypting manifest $BACKUP_FILE"
+  gpg --batch --yes --quiet \
+    --passphrase "$ENCRYPTION_PASSWORD" \
+    --output $manifest --decrypt $BACKUP_FILE
+  if [ "$(head -n 1 $manifest)" != "# swirl-incremental-manifest v1" ]; then
+    rm -f $manifest
+    error "$BACKUP_FILE is not a supported incremental backup manifest"
+  fi
+
+  # Directories and symlinks first, then the files in parallel
+  while IFS=$'\t' read -r type mode uid gid mtime size value path; do
+    case "$type" in
+      d) mkdir -p "$WORKING_DIR/$path" ;;
+      l) mkdir -p "$(dirname "$WORKING_DIR/$path")"; ln -sfn "$value" "$WORKING_DIR/$path" ;;
+    esac
+  done < <(tail -n +2 $manifest)
+
+  info "Restoring files from $store_dir/objects into $WORKING_DIR"
+  set -o pipefail
+  awk -F '\t' -v objects="$store_dir/objects" -v root="$WORKING_DIR" '
+    $1 == "f" { printf "%s/%s/%s.gpg%c%s/%s%c", objects, substr($7, 1, 2), $7, 0, root, $8, 0 }' $manifest \
+    | xargs -0 -r -n 2 -P $RESTORE_JOBS bash -c 'restore_object "$1" "$2"' _
+  set +o pipefail
+
+  # Ownership, modes and times last; directories after their contents
+  while IFS=$'\t' read -r type mode uid gid mtime size value path; do
+    chown -h "$uid:$gid" "$WORKING_DIR/$path"
+    if [ "$type" != "l" ]; then
+      chmod "$mode" "$WORKING_DIR/$path"
+    fi
+    touch -h -d "@$mtime" "$WORKING_DIR/$path"
+  done < <(tail -n +2 $manifest | tac)
+
+  rm -f $manifest
+  pushd $WORKING_DIR
+}
+
 # ----------------------
 # Main
 # ----------------------
@@ -119,7 +195,8 @@ source $ENV_FILE
 
 export BACKUP_FILE=$1
 if [ ! -f "$BACKUP_FILE" ]; then
-    info "Usage: $0 <backup_file>"
+    info "Usage: $0 <backup_file>   (.tar.gz.gpg, .tar.zst.gpg, or a .manifest.gpg from backups/store/manifests;"
+    info "       RESTORE_JOBS=N sets pg_restore and decryption jobs)"
     error "Backup file $BACKUP_FILE not found. Exiting."
 fi
 
@@ -135,7 +212,11 @@ trap 'cleanup' ERR
 # and to prevent auto restart of containers
 systemctl stop swirl
 check_environment
-unpack_archive
+if [[ "$BACKUP_FILE" == *.manifest.gpg ]]; then
+  unpack_manifest
+else
+  unpack_archive
+fi
 restore_db
 
 